@@ -0,0 +1,350 @@
+"""
+Offline benchmark over a recorded screenshot corpus
+
+Runs the ScreenBot lookup APIs (find_text_ocr, locate_text, find_objects_yolo)
+on every screenshot of a corpus with ground-truth targets, then replays the
+corpus through the vertical sequence (or a script file). Reports latency
+distributions, accuracy and iterations/hour, and exits with status 1 when
+results regress past the configured thresholds. CPU only, no display needed.
+
+Corpus layout:
+    corpus/
+        001_story.png, 002_skip.png, ...   screenshots (full screen, sorted = replay order)
+        ground_truth.json
+
+ground_truth.json:
+    {
+        "region": [0, 0, 1000, 1080],         # optional, detection region (default: the bot's)
+        "tolerance": 25,                      # optional, max pixel distance of a correct hit
+        "frames": {
+            "001_story.png": {
+                "text": [{"target": "Skip", "at": [912, 64]}, {"target": "Auto"}],
+                "absent_text": ["Close"],
+                "objects": [{"target": "person", "count": 1}]
+            }
+        }
+    }
+
+thresholds.json (all keys optional):
+    {
+        "find_text_ocr": {"max_p95_ms": 1500, "min_accuracy": 0.95},
+        "locate_text": {"max_p50_ms": 300},
+        "sequence": {"min_iterations_per_hour": 300},
+        "max_slowdown": 0.15,                 # vs --baseline: p50 / iterations per hour
+        "max_accuracy_drop": 0.02             # vs --baseline
+    }
+
+Usage:
+    python benchmark.py corpus/ [--repeat 3] [--output results.json]
+                                [--thresholds thresholds.json] [--baseline previous.json]
+"""
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')  # CPU only, comparable across machines
+
+import argparse
+import json
+import math
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+
+from metrics import Histogram, metrics
+
+GROUND_TRUTH_FILE = 'ground_truth.json'
+DEFAULT_TOLERANCE = 25
+
+# thresholds.json keys understood per benchmark (plus top-level max_slowdown / max_accuracy_drop)
+THRESHOLD_KEYS = ('max_p50_ms', 'max_p95_ms', 'min_accuracy', 'min_iterations_per_hour')
+
+
+def load_corpus(directory: str) -> Tuple[dict, List[Tuple[str, dict]]]:
+    """
+    Read ground_truth.json of a corpus
+
+    Returns:
+        (ground truth dict, [(image path, expectations)] in replay order)
+    """
+    path = os.path.join(directory, GROUND_TRUTH_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No {GROUND_TRUTH_FILE} in '{directory}'")
+    with open(path, 'r') as f:
+        truth = json.load(f)
+    frames = []
+    for name, expected in sorted(truth.get('frames', {}).items()):
+        image_path = os.path.join(directory, name)
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(f"Ground truth lists missing screenshot '{name}'")
+        frames.append((image_path, expected))
+    if not frames:
+        raise ValueError(f"{GROUND_TRUTH_FILE} lists no frames")
+    return truth, frames
+
+
+def _near(point: Tuple[int, int], expected: Optional[List[int]], tolerance: float) -> bool:
+    return expected is None or math.hypot(point[0] - expected[0], point[1] - expected[1]) <= tolerance
+
+
+class ApiResult:
+    """Latency histogram and hit counts of one lookup API"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = Histogram()
+        self.correct = 0
+        self.checks = 0
+
+    def record(self, seconds: float, correct: bool):
+        self.latency.observe(seconds)
+        self.checks += 1
+        self.correct += int(correct)
+
+    def report(self) -> dict:
+        summary = self.latency.summary()
+        summary['accuracy'] = self.correct / self.checks if self.checks else 0.0
+        summary['checks'] = self.checks
+        return summary
+
+
+def _crop(img, region):
+    if region is None:
+        return img
+    x, y, width, height = region
+    return img[y:y + height, x:x + width]
+
+
+def benchmark_lookups(bot, frames: List[Tuple[str, dict]], tolerance: float, repeat: int) -> Dict[str, dict]:
+    """
+    Run every ground-truth target of every frame through the lookup APIs
+
+    Returns:
+        API name -> latency summary (ms) plus accuracy
+    """
+    results = {name: ApiResult(name) for name in ('find_text_ocr', 'locate_text', 'find_objects_yolo')}
+    images = [(path, cv2.imread(path, cv2.IMREAD_COLOR), expected) for path, expected in frames]
+
+    for iteration in range(repeat):
+        print(f"\nLookup pass {iteration + 1}/{repeat}")
+        for path, img, expected in images:
+            if img is None:
+                print(f"  ✗ Could not read {path}")
+                continue
+            view = _crop(img, bot.screen_region)
+
+            for item in expected.get('text', []):
+                start = time.perf_counter()
+                matches = bot.find_text_ocr(item['target'], view)
+                elapsed = time.perf_counter() - start
+                results['find_text_ocr'].record(elapsed, any(_near(m, item.get('at'), tolerance) for m in matches))
+
+                start = time.perf_counter()
+                location = bot.locate_text(item['target'], item.get('index', 0), view)
+                elapsed = time.perf_counter() - start
+                results['locate_text'].record(elapsed, location is not None and _near(location, item.get('at'), tolerance))
+
+            for target in expected.get('absent_text', []):
+                start = time.perf_counter()
+                matches = bot.find_text_ocr(target, view)
+                results['find_text_ocr'].record(time.perf_counter() - start, not matches)
+
+            for item in expected.get('objects', []):
+                start = time.perf_counter()
+                detections = bot.find_objects_yolo(item['target'], view)
+                elapsed = time.perf_counter() - start
+                if 'count' in item:
+                    correct = len(detections) == item['count']
+                else:
+                    correct = any(_near(d[:2], item.get('at'), tolerance) for d in detections)
+                results['find_objects_yolo'].record(elapsed, correct)
+
+    return {name: result.report() for name, result in results.items() if result.checks}
+
+
+def benchmark_sequence(bot, corpus: str, script: Optional[str], max_commands: int) -> dict:
+    """
+    Replay the corpus through the vertical sequence (or a script file), inputs simulated
+
+    Returns:
+        Duration, completed iterations, iterations/hour and command success rate
+    """
+    from interactive_bot import VERTICAL_SEQUENCE, execute_command_file, execute_command_strings
+
+    bot.use_replay_source(corpus)
+    before = metrics.snapshot()['counters']
+    start = time.perf_counter()
+    if script:
+        execute_command_file(bot, script, max_commands=max_commands)
+    else:
+        execute_command_strings(bot, VERTICAL_SEQUENCE, max_commands=max_commands)
+    elapsed = time.perf_counter() - start
+    after = metrics.snapshot()['counters']
+
+    def delta(name):
+        return after.get(name, 0) - before.get(name, 0)
+
+    commands = delta('commands')
+    iterations = delta('script_iterations')
+    return {
+        'script': script or 'vertical',
+        'seconds': elapsed,
+        'commands': commands,
+        'iterations': iterations,
+        'iterations_per_hour': iterations / elapsed * 3600 if elapsed > 0 else 0.0,
+        'success_rate': (commands - delta('command_failures')) / commands if commands else 0.0,
+    }
+
+
+def check_thresholds(results: dict, thresholds: dict, baseline: Optional[dict]) -> List[str]:
+    """
+    Compare results against absolute thresholds and a previous run
+
+    Args:
+        results: This run's results
+        thresholds: {benchmark name: {max_p50_ms, max_p95_ms, min_accuracy, min_iterations_per_hour},
+                     'max_slowdown': 0.15, 'max_accuracy_drop': 0.02}
+        baseline: Results of a previous run (compared by p50 latency and accuracy), or None
+
+    Returns:
+        Human-readable list of regressions (empty = pass)
+    """
+    failures = []
+    current = dict(results.get('lookups', {}))
+    if 'sequence' in results:
+        current['sequence'] = results['sequence']
+
+    for name, limits in thresholds.items():
+        if not isinstance(limits, dict) or name not in current:
+            continue
+        values = current[name]
+        for key, limit in limits.items():
+            if key not in THRESHOLD_KEYS:
+                continue
+            metric = key.split('_', 1)[1]
+            value = values.get(metric)
+            if value is None:
+                continue
+            if key.startswith('max') and value > limit:
+                failures.append(f"{name} {metric} {value:g} > {limit}")
+            elif key.startswith('min') and value < limit:
+                failures.append(f"{name} {metric} {value:g} < {limit}")
+
+    if baseline:
+        max_slowdown = thresholds.get('max_slowdown', 0.15)
+        max_accuracy_drop = thresholds.get('max_accuracy_drop', 0.02)
+        for name, previous in baseline.get('lookups', {}).items():
+            values = current.get(name)
+            if values is None:
+                continue
+            if previous['p50_ms'] > 0 and values['p50_ms'] > previous['p50_ms'] * (1 + max_slowdown):
+                failures.append(f"{name} p50 {values['p50_ms']:.1f}ms is more than {max_slowdown:.0%} slower "
+                                f"than baseline {previous['p50_ms']:.1f}ms")
+            if values['accuracy'] < previous['accuracy'] - max_accuracy_drop:
+                failures.append(f"{name} accuracy {values['accuracy']:.1%} dropped from {previous['accuracy']:.1%}")
+        previous = baseline.get('sequence')
+        if previous and 'sequence' in current and previous.get('iterations_per_hour'):
+            floor = previous['iterations_per_hour'] * (1 - max_slowdown)
+            if current['sequence']['iterations_per_hour'] < floor:
+                failures.append(f"sequence {current['sequence']['iterations_per_hour']:.0f} iterations/hour is "
+                                f"more than {max_slowdown:.0%} below baseline {previous['iterations_per_hour']:.0f}")
+    return failures
+
+
+def print_report(results: dict):
+    print("\n" + "=" * 60)
+    print("Benchmark results")
+    print("=" * 60)
+    for name, summary in results.get('lookups', {}).items():
+        print(f"  {name:<18} n={summary['count']:<5} p50 {summary['p50_ms']:8.1f}ms  p95 {summary['p95_ms']:8.1f}ms  "
+              f"p99 {summary['p99_ms']:8.1f}ms  accuracy {summary['accuracy']:.1%}")
+    sequence = results.get('sequence')
+    if sequence:
+        print(f"  {sequence['script']}: {sequence['iterations']} iterations in {sequence['seconds']:.1f}s "
+              f"({sequence['iterations_per_hour']:.0f}/hour), {sequence['success_rate']:.0%} of "
+              f"{sequence['commands']} commands succeeded")
+    print("\n  Slowest stages (p95):")
+    stages = sorted(results['stages'].items(), key=lambda item: item[1]['p95_ms'], reverse=True)
+    for stage, summary in stages[:8]:
+        print(f"    {stage:<22} p95 {summary['p95_ms']:8.1f}ms  total {summary['total_s']:.1f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark OCR/YOLO lookups and scripts on recorded screenshots")
+    parser.add_argument('corpus', help=f"Folder of screenshots with a {GROUND_TRUTH_FILE}")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over the corpus for the lookup benchmark")
+    parser.add_argument('--script', help="Script file to replay instead of the vertical sequence")
+    parser.add_argument('--max-commands', type=int, default=100, help="Commands to run in the sequence benchmark")
+    parser.add_argument('--skip-sequence', action='store_true', help="Only benchmark the lookup APIs")
+    parser.add_argument('--backend', default='torch', choices=['torch', 'onnx', 'onnx-int8'],
+                        help="Inference backend for the local models")
+    parser.add_argument('--warm-caches', action='store_true',
+                        help="Keep the change gate, OCR cache, button templates and last-seen locations on "
+                             "(default: off, so every lookup runs a full detection)")
+    parser.add_argument('--output', help="Write results as JSON (use as --baseline for the next run)")
+    parser.add_argument('--thresholds', help="JSON file with absolute limits and allowed regressions")
+    parser.add_argument('--baseline', help="Results JSON of a previous run to compare against")
+    args = parser.parse_args(argv)
+
+    try:
+        truth, frames = load_corpus(args.corpus)
+        thresholds = {}
+        if args.thresholds:
+            with open(args.thresholds, 'r') as f:
+                thresholds = json.load(f)
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 2
+
+    from bot import ScreenBot
+    from frame_source import ReplayFrameSource
+
+    bot = ScreenBot(frame_source=ReplayFrameSource(args.corpus), use_daemon=False,
+                    inference_backend=args.backend)
+    if truth.get('region'):
+        bot.set_screen_region(*truth['region'])
+    if not args.warm_caches:
+        bot.set_change_gating(False)
+        bot.set_ocr_cache(False)
+        bot.use_templates = False
+        bot.use_location_priors = False
+    tolerance = truth.get('tolerance', DEFAULT_TOLERANCE)
+
+    # Model loading is reported by 'startup', not counted as lookup latency
+    wants_yolo = any(expected.get('objects') for _, expected in frames)
+    bot.load_engines(ocr=True, yolo=wants_yolo)
+    metrics.reset()
+
+    results = {
+        'corpus': os.path.abspath(args.corpus),
+        'frames': len(frames),
+        'backend': args.backend,
+        'device': bot.device,
+        'lookups': benchmark_lookups(bot, frames, tolerance, max(1, args.repeat)),
+    }
+    if not args.skip_sequence:
+        results['sequence'] = benchmark_sequence(bot, args.corpus, args.script, args.max_commands)
+    results['stages'] = metrics.snapshot()['stages']
+
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.output}")
+
+    failures = check_thresholds(results, thresholds, baseline)
+    if failures:
+        print("\n✗ Regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\n✓ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,65 +1,410 @@
 import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
-import pyautogui
+import time
+_MODULE_IMPORT_START = time.perf_counter()
+
+try:
+    import pyautogui
+except Exception:  # No display available (e.g. replaying recordings on a headless box)
+    pyautogui = None
 import numpy as np
 from PIL import Image
 import cv2
-import time
-from typing import List, Tuple, Optional
-import easyocr
-from ultralytics import YOLO
-import torch
+import atexit
+import importlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Optional, Set
+from capture import create_capture_backend, benchmark_backends
+from frame_source import FrameSource, LiveFrameSource, ReplayFrameSource
+from frame_buffer import FrameRingBuffer, CaptureThread
+from detection_pipeline import DetectionPipeline
+from metrics import metrics
+from change_detector import FrameChangeDetector, ResultGate
+from ocr_tiles import IncrementalOCR
+from ocr_cache import OCRResultCache
+from template_matcher import TemplateLibrary
+from inference_daemon import DaemonClient, RemoteOCRReader, RemoteYOLO
+from yolo_engine import DEFAULT_WEIGHTS, YoloEngine
+
+# Smallest canonical long side: below this OCR can no longer read typical UI text
+MIN_CANONICAL_SIDE = 160
+
+# Seconds spent in each startup stage (module imports, engine loads, ...)
+STARTUP_TIMINGS: Dict[str, float] = {'bot module imports': time.perf_counter() - _MODULE_IMPORT_START}
+
+
+def _timed_import(module_name: str):
+    """Import a heavy module on first use and record how long it took"""
+    label = f"import {module_name}"
+    if label in STARTUP_TIMINGS:
+        return importlib.import_module(module_name)
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    STARTUP_TIMINGS[label] = time.perf_counter() - start
+    return module
+
 
 class ScreenBot:
-    def __init__(self, confidence_threshold: float = 0.5):
+    def __init__(self, confidence_threshold: float = 0.5, capture_backend: Optional[str] = None,
+                 frame_source: Optional[FrameSource] = None, preload: Optional[Set[str]] = None,
+                 use_daemon: bool = True, inference_backend: str = 'torch',
+                 yolo_weights: str = DEFAULT_WEIGHTS, yolo_imgsz: int = 640):
         """
-        Initialize the bot with OCR and YOLO models
+        Initialize the bot; OCR and YOLO models are loaded on first use
         
         Args:
             confidence_threshold: Minimum confidence for YOLO detections
+            capture_backend: Screen capture backend ('mss', 'pyautogui'); None picks the fastest available
+            frame_source: Optional frame source (e.g. ReplayFrameSource); defaults to the live screen
+            preload: Engines to load right away ({'ocr', 'yolo'}); others load lazily
+            use_daemon: Send inference to the local inference daemon if one is running
+            inference_backend: 'torch', 'onnx' or 'onnx-int8' (ONNX Runtime on CPU) for local models
+            yolo_weights: YOLO weights file (e.g. a model fine-tuned on game UI)
+            yolo_imgsz: Square size every frame is letterboxed to before YOLO
         """
+        init_start = time.perf_counter()
         self.confidence_threshold = confidence_threshold
         
-        # Detect and configure GPU device
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        self.use_gpu = torch.cuda.is_available()
+        # Engines are created lazily by the ocr_reader / yolo_model properties
+        self._device = None
+        self._ocr_reader = None
+        self._yolo_model = None
+        self._yolo_failed = False
+        self._engine_lock = threading.RLock()
+        # One detection at a time per engine: the preview, visualization stream, lookahead and
+        # script threads share the reader/model, the result gates and the incremental OCR state
+        self._ocr_lock = threading.RLock()
+        self._yolo_lock = threading.RLock()
+        self.inference_backend = inference_backend
+        self.yolo_weights = yolo_weights
+        self.yolo_imgsz = yolo_imgsz
         
-        if self.use_gpu:
-            gpu_name = torch.cuda.get_device_name(0)
-            gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3
-            print(f"🚀 GPU detected: {gpu_name} ({gpu_memory:.1f} GB)")
-            print(f"   Using device: {self.device}")
-        else:
-            print("⚠️  No GPU detected. Using CPU (will be slower)")
-            print(f"   Using device: {self.device}")
+        # Warm models in a running inference daemon replace local ones
+        self.daemon = DaemonClient.connect_if_running() if use_daemon else None
+        if self.daemon is not None:
+            print(f"Using inference daemon (pid {self.daemon.info['pid']}, {self.daemon.info['device']})")
+        
+        # Safety: Fail-safe corner; pauses between actions come from action_delays instead of a global PAUSE
+        if pyautogui is not None:
+            pyautogui.PAUSE = 0
+            pyautogui.FAILSAFE = True
+        
+        # Screen region of interest (x, y, width, height) - None means full screen
+        self.screen_region = (0, 0, 1000, 1080)  # Default region to exclude right menu
+        print(f"Default screen region set: x=0, y=0, width=1000, height=1080")
+        
+        # Screen capture backend (grabs only the region rectangle)
+        try:
+            self.capture = create_capture_backend(capture_backend)
+            print(f"Capture backend: {self.capture.name}")
+        except Exception as e:
+            if frame_source is None:
+                raise
+            print(f"Warning: No screen capture available, replay only: {e}")
+            self.capture = None
+        
+        # Where frames come from - live screen by default, recordings for offline runs
+        self.frame_source = frame_source if frame_source is not None else LiveFrameSource(self.capture)
+        print(f"Frame source: {self.frame_source.describe()}")
+        
+        # Shared capture thread + ring buffer (off until start_capture_thread)
+        self.frame_buffer = None
+        self.capture_thread = None
+        self.frame_max_age = 0.25  # Buffered frames older than this trigger a fresh grab
+        
+        # Reuse OCR/YOLO results while the screen is unchanged
+        self.change_detector = FrameChangeDetector()
+        self.ocr_gate = ResultGate(self.change_detector)
+        self.yolo_gate = ResultGate(self.change_detector)
+        
+        # Dirty-tile incremental OCR (off until set_incremental_ocr)
+        self.incremental_ocr = None
+        
+        # Worker processes reading tiles of large regions in parallel (off until set_parallel_ocr)
+        self.parallel_ocr = None
+        
+        # Persistent cache of recognized text boxes (survives restarts)
+        self.ocr_cache = OCRResultCache()
+        atexit.register(self.ocr_cache.save)
+        print(f"OCR cache: {self.ocr_cache.stats()['entries']} entries loaded")
+        
+        # Last-seen boxes per (target, index) - searched first before the full region
+        self.location_priors = {}
+        self.use_location_priors = True
+        self.prior_padding = 40
+        self.prior_min_confidence = 0.6
+        self.prior_hits = 0
+        self.prior_misses = 0
+        
+        # Button templates harvested from OCR hits, matched before running OCR
+        self.templates = TemplateLibrary()
+        atexit.register(self.templates.save)  # Keeps per-template use counts across restarts
+        self.use_templates = True
+        self.template_harvest_confidence = 0.8
+        
+        # Event-driven waits (waitfor): poll rate, forced re-check period
+        self.wait_poll_interval = 0.05
+        self.wait_recheck_interval = 1.0
+        self.last_wait = None
+        
+        # Run waitfor detection in a capture -> inference pipeline instead of one frame at a time
+        self.pipelined_waits = False
+        self.last_pipeline = None
+        
+        # wait stable: sample rate, how long the screen must stay still, max mean difference while still
+        self.stable_sample_interval = 0.03
+        self.stable_settle_time = 0.3
+        self.stable_threshold = 1.0
+        
+        # Input actions: minimum pause after each kind of action, and whether clicks/key presses
+        # wait (up to reaction_timeout) for the screen around them to visibly change
+        self.action_delays = {'click': 0.05, 'press': 0.05, 'type': 0.05, 'move': 0.02}
+        self.verify_actions = True
+        self.reaction_timeout = 0.7
+        self.reaction_radius = 150  # Half size of the box watched around a click
+        self.last_action = None
+        self.actions_verified = 0
+        self.actions_reacted = 0
+        self.reaction_time = 0.0
+        
+        # Rescale the region so its long side has this many pixels before OCR/YOLO (None = native)
+        self.canonical_long_side = None
+        
+        STARTUP_TIMINGS['ScreenBot init'] = time.perf_counter() - init_start
+        if preload:
+            self.load_engines(ocr='ocr' in preload, yolo='yolo' in preload)
+    
+    @property
+    def device(self) -> str:
+        """Inference device ('cuda' or 'cpu'), detected on first use"""
+        if self.daemon is not None:
+            return self.daemon.info['device']
+        if self._device is None:
+            with self._engine_lock:
+                if self._device is None:
+                    torch = _timed_import('torch')
+                    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+                    if device == 'cuda':
+                        gpu_name = torch.cuda.get_device_name(0)
+                        gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3
+                        print(f"🚀 GPU detected: {gpu_name} ({gpu_memory:.1f} GB)")
+                    else:
+                        print("⚠️  No GPU detected. Using CPU (will be slower)")
+                    print(f"   Using device: {device}")
+                    self._device = device
+        return self._device
+    
+    @property
+    def use_gpu(self) -> bool:
+        return self.device == 'cuda'
+    
+    @property
+    def ocr_reader(self):
+        """EasyOCR reader (or daemon proxy), loaded on first use"""
+        if self._ocr_reader is None:
+            with self._engine_lock:
+                if self._ocr_reader is None:
+                    if self.daemon is not None:
+                        self._ocr_reader = RemoteOCRReader(self.daemon, self._on_daemon_lost_ocr)
+                    else:
+                        self._ocr_reader = self._load_local_ocr()
+        return self._ocr_reader
+    
+    @property
+    def yolo_model(self):
+        """YOLO model (or daemon proxy), loaded on first use (None if it could not be loaded)"""
+        if self._yolo_model is None and not self._yolo_failed:
+            with self._engine_lock:
+                if self._yolo_model is None and not self._yolo_failed:
+                    if self.daemon is not None and self.daemon.info.get('yolo') \
+                            and (self.yolo_weights, self.yolo_imgsz) == (DEFAULT_WEIGHTS, 640):
+                        self._yolo_model = RemoteYOLO(self.daemon, self._on_daemon_lost_yolo)
+                    else:
+                        self._yolo_model = self._load_local_yolo()
+                        self._yolo_failed = self._yolo_model is None
+        return self._yolo_model
+    
+    def _load_local_ocr(self):
+        """Create the EasyOCR reader in this process"""
+        use_gpu = self.use_gpu
+        easyocr = _timed_import('easyocr')
         
         # Initialize OCR reader (supports multiple languages)
-        print(f"Loading OCR model on {self.device}...")
-        self.ocr_reader = easyocr.Reader(['en'], gpu=self.use_gpu)
+        start = time.perf_counter()
+        if self.inference_backend == 'torch':
+            print(f"Loading OCR model on {self.device}...")
+            reader = easyocr.Reader(['en'], gpu=use_gpu)
+        else:
+            print(f"Loading OCR model ({self.inference_backend}, ONNX Runtime CPU)...")
+            reader = _timed_import('onnx_backend').attach_to_reader(
+                easyocr.Reader(['en'], gpu=False), quantized=self.inference_backend == 'onnx-int8')
+        STARTUP_TIMINGS['load OCR model'] = time.perf_counter() - start
         print("OCR model loaded!")
+        return reader
+    
+    def _load_local_yolo(self):
+        """Create the YOLO model in this process (None if it could not be loaded)"""
+        use_gpu = self.use_gpu
         
         # Initialize YOLO model (using YOLOv8)
         print(f"Loading YOLO model on {self.device}...")
+        start = time.perf_counter()
         try:
-            self.yolo_model = YOLO('yolov8n.pt')  # nano model for speed
-            
-            # Explicitly move YOLO model to GPU if available
-            if self.use_gpu:
-                self.yolo_model.to(self.device)
+            _timed_import('ultralytics')
+            if self.inference_backend == 'torch':
+                # Explicitly move YOLO model to GPU if available
+                engine = YoloEngine(self.yolo_weights, device=self.device if use_gpu else 'cpu',
+                                    imgsz=self.yolo_imgsz)
+            else:
+                model = _timed_import('onnx_backend').load_yolo(
+                    self.yolo_weights, quantized=self.inference_backend == 'onnx-int8', imgsz=self.yolo_imgsz)
+                engine = YoloEngine(self.yolo_weights, imgsz=self.yolo_imgsz, model=model)
             
-            print("YOLO model loaded!")
+            STARTUP_TIMINGS['load YOLO model'] = time.perf_counter() - start
+            print(f"YOLO model loaded! ({engine.describe()}, warmup {engine.warmup_ms:.0f} ms)")
+            return engine
         except Exception as e:
             print(f"Warning: Could not load YOLO model. Object detection will be unavailable: {e}")
-            self.yolo_model = None
+            return None
+    
+    def set_inference_backend(self, backend: str):
+        """
+        Switch the backend used for local models (reloaded on next use)
         
-        # Safety: Fail-safe pause
-        pyautogui.PAUSE = 0.5
-        pyautogui.FAILSAFE = True
+        Args:
+            backend: 'torch', 'onnx' or 'onnx-int8'
+        """
+        if backend not in ('torch', 'onnx', 'onnx-int8'):
+            raise ValueError(f"Unknown inference backend '{backend}'. Use torch, onnx or onnx-int8")
+        with self._engine_lock:
+            self.inference_backend = backend
+            if self.daemon is None:
+                self._ocr_reader = None
+                self._yolo_model = None
+                self._yolo_failed = False
+        if self.parallel_ocr is not None:
+            self.set_parallel_ocr(True, self.parallel_ocr.workers, self.parallel_ocr.tile_size)
+        self.ocr_gate.clear()
+        self.yolo_gate.clear()
+        print(f"Inference backend set: {backend}" + (" (ignored while using the inference daemon)" if self.daemon else ""))
+    
+    def set_yolo_model(self, weights: Optional[str] = None, imgsz: Optional[int] = None):
+        """
+        Use different YOLO weights and/or input size (reloaded on next use)
         
-        # Screen region of interest (x, y, width, height) - None means full screen
-        self.screen_region = (0, 0, 1000, 1080)  # Default region to exclude right menu
-        print(f"Default screen region set: x=0, y=0, width=1000, height=1080")
+        Custom weights are always run in this process, not in the inference daemon.
+        
+        Args:
+            weights: Path to YOLO weights (.pt)
+            imgsz: Square input size frames are letterboxed to (multiple of 32)
+        """
+        if imgsz is not None and (imgsz <= 0 or imgsz % 32):
+            raise ValueError("YOLO input size must be a positive multiple of 32")
+        with self._engine_lock:
+            if weights is not None:
+                self.yolo_weights = weights
+            if imgsz is not None:
+                self.yolo_imgsz = imgsz
+            self._yolo_model = None
+            self._yolo_failed = False
+        self.yolo_gate.clear()
+        print(f"YOLO model set: {self.yolo_weights} @ {self.yolo_imgsz}px")
+    
+    def _forget_daemon(self):
+        if self.daemon is not None:
+            self.daemon.close()
+            self.daemon = None
+    
+    def _on_daemon_lost_ocr(self):
+        self._forget_daemon()
+        return self._load_local_ocr()
+    
+    def _on_daemon_lost_yolo(self):
+        self._forget_daemon()
+        return self._load_local_yolo()
+    
+    def load_engines(self, ocr: bool = True, yolo: bool = True):
+        """
+        Load the requested engines now instead of on first use
+        
+        Args:
+            ocr: Load the EasyOCR reader
+            yolo: Load the YOLO model
+        """
+        if ocr:
+            self.ocr_reader
+        if yolo:
+            self.yolo_model
+    
+    def engines_loaded(self) -> Dict[str, bool]:
+        """Which engines are currently loaded"""
+        return {'ocr': self._ocr_reader is not None, 'yolo': self._yolo_model is not None}
+    
+    def startup_report(self) -> Dict[str, float]:
+        """Seconds spent in each startup stage so far (imports, init, model loads)"""
+        return dict(STARTUP_TIMINGS)
+    
+    def set_capture_backend(self, name: str):
+        """
+        Switch the screen capture backend
+        
+        Args:
+            name: Backend name ('mss', 'pyautogui' or 'auto')
+        """
+        new_capture = create_capture_backend(name)
+        old_capture = self.capture
+        self.capture = new_capture
+        if self.frame_source.is_live:
+            self.frame_source = LiveFrameSource(self.capture)
+        if old_capture is not None:
+            old_capture.close()
+        print(f"Capture backend set: {self.capture.name}")
+    
+    def capture_stats(self) -> dict:
+        """Return per-grab latency statistics of the current capture backend"""
+        if self.capture is None:
+            return {'backend': 'none', 'grabs': 0, 'last_ms': 0.0, 'avg_ms': 0.0, 'min_ms': 0.0, 'max_ms': 0.0}
+        return self.capture.stats()
+    
+    def set_frame_source(self, frame_source: FrameSource):
+        """Replace the frame source used by take_screenshot"""
+        old_source = self.frame_source
+        self.frame_source = frame_source
+        if old_source is not frame_source:
+            old_source.close()
+        print(f"Frame source set: {self.frame_source.describe()}")
+        if not self.frame_source.is_live:
+            print("Input actions are simulated while replaying")
+    
+    def use_live_source(self):
+        """Read frames from the real screen"""
+        if self.capture is None:
+            self.capture = create_capture_backend()
+        self.set_frame_source(LiveFrameSource(self.capture))
+    
+    def use_replay_source(self, path: str, fps: Optional[float] = None, loop: bool = True):
+        """
+        Read frames from recorded screenshots or a video instead of the screen
+        
+        Args:
+            path: Folder of PNG/JPG screenshots or a video file
+            fps: Playback rate; None advances one frame per screenshot taken
+            loop: Restart from the beginning after the last frame
+        """
+        self.set_frame_source(ReplayFrameSource(path, fps=fps, loop=loop))
+    
+    def _input_enabled(self, action: str) -> bool:
+        """Check whether real mouse/keyboard input may be sent, logging simulated actions"""
+        if pyautogui is not None and self.frame_source.is_live:
+            return True
+        print(f"  (simulated) {action}")
+        return False
+    
+    def benchmark_capture(self, grabs: int = 20) -> List[dict]:
+        """Compare grab latency of all available capture backends on the current region"""
+        return benchmark_backends(self.screen_region, grabs)
     
     def set_screen_region(self, x: int, y: int, width: int, height: int):
         """
@@ -86,6 +431,58 @@ class ScreenBot:
         region_x, region_y, _, _ = self.screen_region
         return (x + region_x, y + region_y)
     
+    def start_capture_thread(self, fps: float = 15.0, slots: int = 4):
+        """
+        Start a background thread that captures the region into a shared ring buffer
+        
+        Lookups, the GUI preview and visualizers then borrow the latest frame instead
+        of grabbing their own.
+        
+        Args:
+            fps: Capture rate
+            slots: Number of preallocated frames in the ring buffer
+        """
+        self.stop_capture_thread()
+        self.frame_buffer = FrameRingBuffer(slots)
+        
+        def read_frame():
+            region = self.screen_region
+            return self.frame_source.read(region), region
+        
+        self.capture_thread = CaptureThread(read_frame, self.frame_buffer, fps)
+        self.capture_thread.start()
+        print(f"Capture thread started ({fps} fps, {slots} slots)")
+    
+    def stop_capture_thread(self):
+        """Stop the background capture thread"""
+        if self.capture_thread is not None:
+            self.capture_thread.stop()
+            self.capture_thread = None
+            self.frame_buffer = None
+            print("Capture thread stopped")
+    
+    @contextmanager
+    def borrow_frame(self, full_screen: bool = False, max_age: Optional[float] = None):
+        """
+        Borrow the latest frame of the current region
+        
+        Yields a zero-copy read-only view from the capture thread's ring buffer when a
+        fresh frame of the right region is available, otherwise a new screenshot.
+        Do not keep references to the frame after the with block.
+        
+        Args:
+            full_screen: Borrow a full screen frame instead of the region
+            max_age: Maximum acceptable frame age in seconds (defaults to frame_max_age)
+        """
+        buffer = self.frame_buffer
+        if buffer is not None:
+            wanted_region = None if full_screen else self.screen_region
+            with buffer.borrow_latest(self.frame_max_age if max_age is None else max_age) as frame:
+                if frame is not None and frame.region == wanted_region:
+                    yield frame.image
+                    return
+        yield self.take_screenshot(full_screen=full_screen)
+    
     def take_screenshot(self, full_screen: bool = False) -> np.ndarray:
         """
         Take a screenshot and return as numpy array
@@ -94,15 +491,291 @@ class ScreenBot:
             full_screen: If True, always return full screen (ignores region). 
                         If False, crops to region if set.
         """
-        screenshot = pyautogui.screenshot()
-        img = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
+        # Grab only the region rectangle if set and not requesting full screen
+        with metrics.timer('capture'):
+            if self.screen_region is not None and not full_screen:
+                return self.frame_source.read(self.screen_region)
+            
+            return self.frame_source.read()
+    
+    def _read_text(self, screen_img: np.ndarray, rgb_img: Optional[np.ndarray] = None) -> List[Tuple]:
+        """
+        Run OCR on a region image, reusing the previous result if the frame is unchanged
+        
+        Args:
+            screen_img: BGR region image
+            rgb_img: The same image already converted to RGB (converted here if None)
+        
+        Returns:
+            Raw EasyOCR results [(bbox, text, confidence)] in image coordinates
+        """
+        with self._ocr_lock:
+            key = ('ocr', self.screen_region)
+            cached, sig = self.ocr_gate.lookup(key, screen_img)
+            if cached is not None:
+                return cached
+            
+            # Convert to RGB for OCR
+            if rgb_img is None:
+                with metrics.timer('color_convert'):
+                    rgb_img = cv2.cvtColor(screen_img, cv2.COLOR_BGR2RGB)
+            
+            # Perform OCR (only on changed tiles in incremental mode)
+            scale = self._inference_scale(screen_img)
+            if self.incremental_ocr is not None:
+                results = self.incremental_ocr.read(rgb_img, key=(self.screen_region, scale),
+                                                    read_fn=lambda img: self._run_ocr(img, scale))
+            else:
+                results = self._run_ocr(rgb_img, scale)
+            
+            self.ocr_gate.store(key, screen_img, sig, results)
+            return results
+    
+    def _inference_scale(self, screen_img: np.ndarray) -> float:
+        """Scale factor that brings a region image to the canonical long side"""
+        if not self.canonical_long_side:
+            return 1.0
+        long_side = max(screen_img.shape[:2])
+        return self.canonical_long_side / float(long_side) if long_side else 1.0
+    
+    @staticmethod
+    def _rescale(img: np.ndarray, scale: float) -> np.ndarray:
+        """Resize an image by scale (area interpolation when shrinking)"""
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        width = max(1, int(round(img.shape[1] * scale)))
+        height = max(1, int(round(img.shape[0] * scale)))
+        return cv2.resize(img, (width, height), interpolation=interpolation)
+    
+    def _run_ocr(self, rgb_img: np.ndarray, scale: float = 1.0) -> List[Tuple]:
+        """
+        Run OCR on an RGB image, optionally rescaled by scale first
+        
+        Returns:
+            EasyOCR results with boxes mapped back to rgb_img coordinates
+        """
+        with self._ocr_lock:
+            if abs(scale - 1.0) < 1e-3:
+                return self._recognize_any(rgb_img)
+            results = self._recognize_any(self._rescale(rgb_img, scale))
+            return [([[p[0] / scale, p[1] / scale] for p in bbox], text, confidence)
+                    for bbox, text, confidence in results]
+    
+    def _recognize_any(self, rgb_img: np.ndarray) -> List[Tuple]:
+        """Use the worker pool for images spanning several tiles, the local reader otherwise"""
+        if self.parallel_ocr is not None and self.parallel_ocr.worth_splitting(rgb_img.shape):
+            with metrics.timer('ocr_parallel'):
+                return self.parallel_ocr.read(rgb_img)
+        return self._recognize(rgb_img)
+    
+    def _recognize(self, rgb_img: np.ndarray) -> List[Tuple]:
+        """
+        Run the OCR engine on an RGB image
         
-        # Crop to region if set and not requesting full screen
-        if self.screen_region is not None and not full_screen:
-            x, y, width, height = self.screen_region
-            img = img[y:y+height, x:x+width]
+        With the OCR cache enabled, text boxes are detected first and only boxes whose
+        pixels are not in the cache go through recognition (inside the daemon when one
+        is used).
+        """
+        if self.ocr_cache is None:
+            with metrics.timer('ocr_readtext'):
+                return self.ocr_reader.readtext(rgb_img)
+        
+        reader = self.ocr_reader
+        if isinstance(reader, RemoteOCRReader):
+            # One round trip: the daemon keeps its own cache and runs detect + recognize itself
+            with metrics.timer('ocr_readtext'):
+                return reader.readtext_cached(rgb_img, self.ocr_cache, metrics.observe)
+        return self.ocr_cache.readtext(reader, rgb_img, metrics.observe)
+    
+    def set_ocr_cache(self, enabled: bool):
+        """Enable or disable the persistent OCR result cache"""
+        if enabled and self.ocr_cache is None:
+            self.ocr_cache = OCRResultCache()
+            atexit.register(self.ocr_cache.save)
+        elif not enabled and self.ocr_cache is not None:
+            self.ocr_cache.save()
+            self.ocr_cache = None
+        print(f"OCR cache {'enabled' if enabled else 'disabled'}")
+    
+    def set_canonical_size(self, long_side: Optional[int]):
+        """
+        Rescale the region to a canonical size before OCR
         
-        return img
+        Results are mapped back to screen coordinates, so latency no longer depends on
+        the monitor resolution/DPI. (YOLO always letterboxes to its own fixed input size.)
+        
+        Args:
+            long_side: Target length of the region's long side in pixels (None = native resolution)
+        """
+        if long_side is not None and long_side < MIN_CANONICAL_SIDE:
+            raise ValueError(f"Canonical long side must be at least {MIN_CANONICAL_SIDE}px (or None for native)")
+        self.canonical_long_side = long_side
+        self.ocr_gate.clear()
+        print(f"Canonical size: {'long side ' + str(long_side) + 'px' if long_side else 'native resolution'}")
+    
+    def benchmark_normalization(self, screen_img: Optional[np.ndarray] = None,
+                                long_sides: Tuple[Optional[int], ...] = (None, 1080, 960, 720, 540, 360),
+                                repeats: int = 3, tolerance: int = 15) -> List[dict]:
+        """
+        Measure OCR latency and accuracy of the canonical sizes on one frame
+        
+        Accuracy is the fraction of texts found at native resolution that are found again
+        (same text, center within tolerance pixels) at each size. Caches are bypassed.
+        
+        Args:
+            screen_img: Region image (defaults to the current frame)
+            long_sides: Canonical sizes to try (None = native)
+            repeats: OCR runs per size (median latency is reported)
+            tolerance: Maximum center distance in pixels for a text to count as found
+        
+        Returns:
+            List of {'long_side', 'scale', 'median_ms', 'texts', 'accuracy'} dicts
+        """
+        if screen_img is None:
+            with self.borrow_frame() as screen_img:
+                return self.benchmark_normalization(screen_img.copy(), long_sides, repeats, tolerance)
+        
+        rgb_img = cv2.cvtColor(screen_img, cv2.COLOR_BGR2RGB)
+        long_side = max(rgb_img.shape[:2])
+        
+        def centers(results):
+            return [(text.lower(), sum(p[0] for p in bbox) / len(bbox), sum(p[1] for p in bbox) / len(bbox))
+                    for bbox, text, _ in results]
+        
+        rows = []
+        reference = None
+        for target in long_sides:
+            scale = target / float(long_side) if target else 1.0
+            model_img = rgb_img if abs(scale - 1.0) < 1e-3 else self._rescale(rgb_img, scale)
+            timings = []
+            for _ in range(max(1, repeats)):
+                with self._ocr_lock:
+                    start = time.perf_counter()
+                    results = self.ocr_reader.readtext(model_img)
+                    timings.append(time.perf_counter() - start)
+            found = [(t, x / scale, y / scale) for t, x, y in centers(results)]
+            if reference is None:
+                reference = found
+            matched = sum(1 for t, x, y in reference
+                          if any(t == ft and abs(x - fx) <= tolerance and abs(y - fy) <= tolerance
+                                 for ft, fx, fy in found))
+            rows.append({
+                'long_side': target or long_side,
+                'scale': scale,
+                'median_ms': sorted(timings)[len(timings) // 2] * 1000,
+                'texts': len(found),
+                'accuracy': matched / len(reference) if reference else 1.0,
+            })
+        return rows
+    
+    def set_incremental_ocr(self, enabled: bool, tile_size: Tuple[int, int] = (160, 96)):
+        """
+        Enable or disable dirty-tile incremental OCR
+        
+        When enabled, only tiles that changed since the previous OCR pass are re-read
+        and results for unchanged tiles are reused.
+        
+        Args:
+            enabled: Turn incremental OCR on or off
+            tile_size: (width, height) of the diff tiles
+        """
+        with self._ocr_lock:
+            self.incremental_ocr = IncrementalOCR(self._run_ocr, tile_size=tile_size) if enabled else None
+            self.ocr_gate.clear()
+        print(f"Incremental OCR {'enabled' if enabled else 'disabled'}" + (f" (tiles {tile_size[0]}x{tile_size[1]})" if enabled else ""))
+    
+    def set_parallel_ocr(self, enabled: bool, workers: Optional[int] = None,
+                         tile_size: Optional[Tuple[int, int]] = None):
+        """
+        Enable or disable tile-parallel OCR in a pool of worker processes
+        
+        Images larger than one tile are split into overlapping tiles that are read by
+        separate processes (each with its own CPU reader); smaller crops still use the
+        local reader and the OCR cache.
+        
+        Args:
+            enabled: Turn parallel OCR on or off
+            workers: Number of worker processes (default: half the CPU cores)
+            tile_size: (width, height) of a tile (default: derived from the region and worker count)
+        """
+        if self.parallel_ocr is not None:
+            atexit.unregister(self.parallel_ocr.close)
+            self.parallel_ocr.close()
+            self.parallel_ocr = None
+        if enabled:
+            self.parallel_ocr = _timed_import('parallel_ocr').ParallelOCR(
+                workers=workers, tile_size=tile_size, inference_backend=self.inference_backend)
+            print(f"Starting {self.parallel_ocr.workers} OCR worker process(es)...")
+            self.parallel_ocr.warmup()
+            atexit.register(self.parallel_ocr.close)
+        self.ocr_gate.clear()
+        if self.incremental_ocr is not None:
+            self.incremental_ocr.reset()
+        print(f"Parallel OCR {'enabled' if enabled else 'disabled'}")
+    
+    def _detect_objects(self, screen_img: np.ndarray, classes: Optional[List[int]] = None) -> List[Tuple]:
+        """
+        Run YOLO on a region image, reusing the previous result if the frame is unchanged
+        
+        The engine letterboxes every frame to its fixed input size, so no canonical
+        rescale is applied here.
+        
+        Args:
+            screen_img: BGR region image
+            classes: Only detect these class indices (None = all classes)
+        
+        Returns:
+            Raw detections [(x1, y1, x2, y2, confidence, class_id)] in image coordinates
+        """
+        with self._yolo_lock:
+            if classes is not None and not classes:
+                return []
+            key = ('yolo', self.screen_region, self.confidence_threshold, tuple(classes) if classes is not None else None)
+            cached, sig = self.yolo_gate.lookup(key, screen_img)
+            if cached is not None:
+                return cached
+            
+            raw = [(float(x1), float(y1), float(x2), float(y2), float(confidence), int(cls_id))
+                   for x1, y1, x2, y2, confidence, cls_id in self._yolo_infer(screen_img, classes).tolist()]
+            
+            self.yolo_gate.store(key, screen_img, sig, raw)
+            return raw
+    
+    def _yolo_infer(self, img: np.ndarray, classes: Optional[List[int]] = None) -> np.ndarray:
+        """Run YOLO locally or in the daemon, returning an (N, 6) array of (x1, y1, x2, y2, confidence, class_id)"""
+        model = self.yolo_model
+        with metrics.timer('yolo_inference'):
+            if isinstance(model, RemoteYOLO):
+                return model.infer_raw(img, self.confidence_threshold, self._yolo_infer_local, classes=classes)
+            return self._yolo_infer_local(model, img, classes)
+    
+    def _yolo_infer_local(self, engine: Optional[YoloEngine], img: np.ndarray,
+                          classes: Optional[List[int]] = None) -> np.ndarray:
+        if engine is None:
+            return np.zeros((0, 6), dtype=np.float32)
+        return engine.infer(img, conf=self.confidence_threshold, classes=classes)
+    
+    def set_change_threshold(self, threshold: float):
+        """
+        Set how much a frame must change (mean gray-level difference) before OCR/YOLO re-run
+        
+        Args:
+            threshold: Threshold in gray levels (0 = any change triggers a new detection)
+        """
+        self.change_detector.threshold = threshold
+        print(f"Change threshold set: {threshold}")
+    
+    def set_change_gating(self, enabled: bool):
+        """Enable or disable reusing detection results for unchanged frames"""
+        self.ocr_gate.enabled = enabled
+        self.yolo_gate.enabled = enabled
+        if not enabled:
+            self.ocr_gate.clear()
+            self.yolo_gate.clear()
+        print(f"Change gating {'enabled' if enabled else 'disabled'}")
+    
+    def change_gate_stats(self) -> dict:
+        """Return hit/miss counters of the OCR and YOLO change gates"""
+        return {'ocr': self.ocr_gate.stats(), 'yolo': self.yolo_gate.stats()}
     
     def find_text_ocr(self, text_to_find: str, screen_img: Optional[np.ndarray] = None, return_bbox: bool = False) -> List[Tuple[int, int]]:
         """
@@ -118,14 +791,12 @@ class ScreenBot:
             OR List of (x, y, bbox, text, confidence) if return_bbox=True
         """
         if screen_img is None:
-            screen_img = self.take_screenshot()
-        
-        # Convert to RGB for OCR
-        rgb_img = cv2.cvtColor(screen_img, cv2.COLOR_BGR2RGB)
+            with self.borrow_frame() as screen_img:
+                return self.find_text_ocr(text_to_find, screen_img, return_bbox)
         
-        # Perform OCR
-        results = self.ocr_reader.readtext(rgb_img)
+        results = self._read_text(screen_img)
         
+        post_start = time.perf_counter()
         matches = []
         text_lower = text_to_find.lower()
         
@@ -148,19 +819,405 @@ class ScreenBot:
                     matches.append((screen_x, screen_y))
                 print(f"Found '{text}' at ({screen_x}, {screen_y}) with confidence {confidence:.2f}")
         
+        metrics.observe('postprocess', time.perf_counter() - post_start)
         return matches
     
-    def get_all_ocr_text(self, screen_img: Optional[np.ndarray] = None) -> List[Tuple]:
-        """Get all text detected by OCR on screen with bounding boxes"""
+    def _find_text_in_roi(self, text_to_find: str, screen_img: np.ndarray, roi_bbox: Tuple[int, int, int, int]) -> Optional[Tuple]:
+        """
+        OCR only a padded box (screen coordinates) of the region image
+        
+        Returns:
+            (center_x, center_y, bbox) of the most confident match in screen coordinates, or None
+        """
+        offset_x, offset_y = self._to_screen_coords(0, 0)
+        height, width = screen_img.shape[:2]
+        pad = self.prior_padding
+        x1 = max(0, roi_bbox[0] - offset_x - pad)
+        y1 = max(0, roi_bbox[1] - offset_y - pad)
+        x2 = min(width, roi_bbox[2] - offset_x + pad)
+        y2 = min(height, roi_bbox[3] - offset_y + pad)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        
+        rgb_roi = cv2.cvtColor(screen_img[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+        best = None
+        text_lower = text_to_find.lower()
+        # Same scale as a full-region pass so text size matches what the models expect
+        for bbox, text, confidence in self._run_ocr(rgb_roi, self._inference_scale(screen_img)):
+            if text_lower in text.lower() and confidence >= self.prior_min_confidence:
+                if best is None or confidence > best[2]:
+                    best = (bbox, text, confidence)
+        if best is None:
+            return None
+        
+        bbox, text, confidence = best
+        screen_bbox = [self._to_screen_coords(int(p[0]) + x1, int(p[1]) + y1) for p in bbox]
+        center_x = int(sum(p[0] for p in screen_bbox) / len(screen_bbox))
+        center_y = int(sum(p[1] for p in screen_bbox) / len(screen_bbox))
+        print(f"Found '{text}' at ({center_x}, {center_y}) with confidence {confidence:.2f} (last-seen location)")
+        return (center_x, center_y, screen_bbox)
+    
+    def locate_text(self, text: str, index: int = 0, screen_img: Optional[np.ndarray] = None,
+                    learn: bool = True) -> Optional[Tuple[int, int]]:
+        """
+        Find the screen position of the nth occurrence of text
+        
+        Looks around the last-seen position of (text, index) first and only scans the
+        whole region when the text is not found there.
+        
+        Args:
+            text: Text to find
+            index: Which occurrence to use if multiple found (0 = first)
+            screen_img: Optional pre-captured screenshot of the region
+            learn: Remember where the text was found, harvest its template and count the
+                   lookup in the prior/template stats (off for speculative lookups whose
+                   result may be discarded)
+            
+        Returns:
+            (x, y) screen coordinates, or None if not found
+        """
         if screen_img is None:
-            screen_img = self.take_screenshot()
+            with self.borrow_frame() as screen_img:
+                return self.locate_text(text, index, screen_img, learn)
         
-        # Convert to RGB for OCR
-        rgb_img = cv2.cvtColor(screen_img, cv2.COLOR_BGR2RGB)
+        key = (text.lower(), index)
+        prior = self.location_priors.get(key) if self.use_location_priors else None
+        
+        # Fastest: template match near the last-seen location (or anywhere for the first occurrence)
+        if self.use_templates and self.templates.has(text) and (prior is not None or index == 0):
+            location = self._find_text_by_template(text, screen_img, prior, learn)
+            if location is not None:
+                return location
+        
+        if prior is not None:
+            match = self._find_text_in_roi(text, screen_img, prior)
+            if match is not None:
+                if learn:
+                    self.prior_hits += 1
+                return (match[0], match[1])
+            if learn:
+                self.prior_misses += 1
+        
+        matches = self.find_text_ocr(text, screen_img, return_bbox=True)
+        if not matches:
+            return None
+        
+        if index >= len(matches):
+            print(f"Index {index} out of range. Found {len(matches)} occurrence(s). Using index {len(matches)-1} instead.")
+            index = len(matches) - 1
+        
+        x, y, bbox, _, confidence = matches[index]
+        if not learn:
+            return (x, y)
+        xs = [p[0] for p in bbox]
+        ys = [p[1] for p in bbox]
+        self.location_priors[key] = (min(xs), min(ys), max(xs), max(ys))
+        
+        # Harvest the button image so the next lookup can skip OCR
+        if self.use_templates and confidence >= self.template_harvest_confidence and not self.templates.has(text):
+            offset_x, offset_y = self._to_screen_coords(0, 0)
+            self.templates.harvest(text, screen_img, (min(xs) - offset_x, min(ys) - offset_y,
+                                                      max(xs) - offset_x, max(ys) - offset_y))
+        return (x, y)
+    
+    def _find_text_by_template(self, text: str, screen_img: np.ndarray, prior: Optional[Tuple[int, int, int, int]],
+                               learn: bool = True) -> Optional[Tuple[int, int]]:
+        """
+        Look for the stored template of text, validating marginal matches with OCR
+        
+        Args:
+            text: Target text
+            screen_img: Region image
+            prior: Last-seen box in screen coordinates to search around, or None for the whole region
+            learn: Update the template stats and use counts
+        
+        Returns:
+            (x, y) screen coordinates of the match, or None
+        """
+        offset_x, offset_y = self._to_screen_coords(0, 0)
+        search_rect = None
+        if prior is not None:
+            pad_x = max(self.prior_padding, prior[2] - prior[0])
+            pad_y = max(self.prior_padding, prior[3] - prior[1])
+            search_rect = (prior[0] - offset_x - pad_x, prior[1] - offset_y - pad_y,
+                           prior[2] - offset_x + pad_x, prior[3] - offset_y + pad_y)
+        
+        found = self.templates.match(text, screen_img, search_rect)
+        if found is None:
+            return None
+        (x1, y1, x2, y2), score = found
+        screen_rect = (x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y)
+        center_x = (screen_rect[0] + screen_rect[2]) // 2
+        center_y = (screen_rect[1] + screen_rect[3]) // 2
+        
+        if score >= self.templates.accept_score:
+            if learn:
+                self.templates.accepted += 1
+                self.templates.record_use(text)
+            print(f"Found '{text}' at ({center_x}, {center_y}) by template (score {score:.2f})")
+            return (center_x, center_y)
+        
+        if score >= self.templates.marginal_score:
+            match = self._find_text_in_roi(text, screen_img, screen_rect)
+            if match is not None:
+                if learn:
+                    self.templates.validated += 1
+                    self.templates.record_use(text)
+                return (match[0], match[1])
+        
+        if learn:
+            self.templates.rejected += 1
+        return None
+    
+    def add_template(self, text: str, index: int = 0) -> bool:
+        """
+        Find text with a full OCR scan and store its image as a template
+        
+        Args:
+            text: Target text
+            index: Which occurrence to use if multiple found
+        
+        Returns:
+            True if the template was stored
+        """
+        with self.borrow_frame() as screen_img:
+            matches = self.find_text_ocr(text, screen_img, return_bbox=True)
+            if not matches:
+                print(f"Text '{text}' not found on screen")
+                return False
+            _, _, bbox, _, _ = matches[min(index, len(matches) - 1)]
+            offset_x, offset_y = self._to_screen_coords(0, 0)
+            xs = [p[0] - offset_x for p in bbox]
+            ys = [p[1] - offset_y for p in bbox]
+            return self.templates.harvest(text, screen_img, (min(xs), min(ys), max(xs), max(ys)))
+    
+    def location_prior_stats(self) -> dict:
+        """Return how often the last-seen location fast path found the target"""
+        lookups = self.prior_hits + self.prior_misses
+        return {
+            'enabled': self.use_location_priors,
+            'targets': len(self.location_priors),
+            'hits': self.prior_hits,
+            'misses': self.prior_misses,
+            'hit_rate': self.prior_hits / lookups if lookups else 0.0,
+        }
+    
+    def clear_location_priors(self):
+        """Forget all last-seen locations"""
+        self.location_priors = {}
+        print("Last-seen locations cleared")
+    
+    def _poll_until(self, probe, timeout: float, description: str):
+        """
+        Run probe(frame) on fresh frames until it returns a result or timeout seconds pass
+        
+        The probe only runs when the screen visibly changed since the last probed frame
+        (or every wait_recheck_interval seconds), so waiting on a static screen costs
+        one downsampled frame comparison per poll. With pipelined_waits, frames are
+        captured and compared on a separate thread while the probe runs.
+        
+        Returns:
+            The probe's result, or None on timeout
+        """
+        start = time.perf_counter()
+        last_sig, last_probe = None, 0.0
+        checks = probes = 0
+        result = None
+        
+        if self.pipelined_waits:
+            result, checks, probes = self._poll_pipelined(probe, timeout)
+        else:
+            while True:
+                with self.borrow_frame(max_age=self.wait_poll_interval) as screen_img:
+                    checks += 1
+                    sig = self.change_detector.signature(screen_img)
+                    now = time.perf_counter()
+                    if last_sig is None or now - last_probe >= self.wait_recheck_interval \
+                            or self.change_detector.changed(last_sig, sig):
+                        probes += 1
+                        last_sig, last_probe = sig, now
+                        result = probe(screen_img)
+                
+                if result or time.perf_counter() - start >= timeout:
+                    break
+                time.sleep(self.wait_poll_interval)
+        elapsed = time.perf_counter() - start
+        
+        metrics.observe('waitfor', elapsed)
+        self.last_wait = {'target': description, 'found': bool(result), 'elapsed': elapsed,
+                          'checks': checks, 'probes': probes}
+        if result:
+            print(f"✓ {description} appeared after {elapsed:.2f}s ({checks} checks, {probes} detection passes)")
+        else:
+            print(f"✗ {description} did not appear within {timeout:g}s ({checks} checks, {probes} detection passes)")
+        return result or None
+    
+    def _poll_pipelined(self, probe, timeout: float) -> Tuple[object, int, int]:
+        """
+        _poll_until on a detection pipeline: the next frame is captured and compared
+        while the probe runs on the current one
+        
+        Returns:
+            (probe result or None, frames checked, probe runs)
+        """
+        start = time.perf_counter()
+        state = {'sig': None, 'probed': 0.0, 'checks': 0}
+        
+        def prepare(frame):
+            # Capture thread: forward only visibly changed frames (or one per recheck interval)
+            state['checks'] += 1
+            sig = self.change_detector.signature(frame)
+            now = time.perf_counter()
+            if state['sig'] is None or now - state['probed'] >= self.wait_recheck_interval \
+                    or self.change_detector.changed(state['sig'], sig):
+                state['sig'], state['probed'] = sig, now
+                return sig
+            return None
+        
+        stream = DetectionPipeline(lambda: self._pipeline_frame(self.wait_poll_interval),
+                                   lambda frame, _: probe(frame), prepare,
+                                   fps=1.0 / self.wait_poll_interval, depth=1)
+        self.last_pipeline = stream
+        result = None
+        with stream:
+            while not result:
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    break
+                detection = stream.next(timeout=remaining)
+                if detection is not None:
+                    result = detection.result
+        return result, state['checks'], stream.detected
+    
+    def _pipeline_frame(self, max_age: float) -> Tuple[np.ndarray, Optional[Tuple[int, int, int, int]]]:
+        """Latest region frame as an array the pipeline may keep (borrowed views are copied)"""
+        region = self.screen_region
+        with self.borrow_frame(max_age=max_age) as screen_img:
+            frame = screen_img if screen_img.flags.writeable else screen_img.copy()
+        return frame, region
+    
+    def detection_stream(self, kind: str = 'text', fps: float = 15.0, depth: int = 2) -> DetectionPipeline:
+        """
+        Start pipelined detection on the current region
+        
+        Capturing and color-converting the next frame overlaps OCR/YOLO on the current
+        one. Frames and results that the next stage is too slow for are dropped, the
+        oldest first.
         
-        # Perform OCR
-        results = self.ocr_reader.readtext(rgb_img)
+        Args:
+            kind: 'text' (results as get_all_ocr_text) or 'objects' (as find_objects_yolo with return_bbox=True)
+            fps: Maximum capture rate
+            depth: Detections kept for a slow consumer
+            
+        Returns:
+            Running DetectionPipeline - iterate it (or call next()/latest()) and stop() it when done,
+            or use it as a context manager
+        """
+        if kind == 'text':
+            prepare = lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            detect = lambda frame, rgb_img: self.get_all_ocr_text(frame, rgb_img)
+        elif kind == 'objects':
+            prepare = None
+            detect = lambda frame, _: self.find_objects_yolo(None, frame, return_bbox=True)
+        else:
+            raise ValueError(f"Unknown detection kind '{kind}'. Use text or objects")
+        stream = DetectionPipeline(lambda: self._pipeline_frame(1.0 / fps), detect, prepare, fps=fps, depth=depth)
+        self.last_pipeline = stream
+        return stream.start()
+    
+    def wait_for_text(self, text: str, timeout: float = 10.0, index: int = 0) -> Optional[Tuple[int, int]]:
+        """
+        Wait until text is visible, returning as soon as it appears
+        
+        Each detection pass uses the template / last-seen location fast paths before
+        scanning the whole region.
+        
+        Args:
+            text: Text to wait for
+            timeout: Maximum time to wait in seconds
+            index: Which occurrence to return if multiple found
+            
+        Returns:
+            (x, y) screen coordinates, or None if it did not appear in time
+        """
+        return self._poll_until(lambda screen_img: self.locate_text(text, index, screen_img),
+                                timeout, f"Text '{text}'")
+    
+    def wait_for_object(self, object_class: str, timeout: float = 10.0) -> Optional[List[Tuple]]:
+        """
+        Wait until an object class is detected, returning as soon as it appears
+        
+        Args:
+            object_class: Class name to wait for
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            Detections as returned by find_objects_yolo, or None if none appeared in time
+        """
+        return self._poll_until(lambda screen_img: self.find_objects_yolo(object_class, screen_img),
+                                timeout, f"Object '{object_class}'")
+    
+    def wait_until_stable(self, region: Optional[Tuple[int, int, int, int]] = None, max_seconds: float = 5.0,
+                          settle_time: Optional[float] = None, threshold: Optional[float] = None) -> bool:
+        """
+        Wait until the screen stops animating (fades, slides)
+        
+        Samples downscaled frames at a high rate and returns once consecutive frames have
+        differed by less than threshold for settle_time seconds.
+        
+        Args:
+            region: Screen region (x, y, width, height) to watch; defaults to the current region
+            max_seconds: Give up after this many seconds
+            settle_time: How long the screen must stay still (defaults to stable_settle_time)
+            threshold: Mean gray-level difference between samples that still counts as still
+                       (defaults to stable_threshold)
+            
+        Returns:
+            True if the screen settled, False if it was still changing after max_seconds
+        """
+        settle_time = self.stable_settle_time if settle_time is None else settle_time
+        threshold = self.stable_threshold if threshold is None else threshold
+        start = time.perf_counter()
+        previous, still_since = None, None
+        samples = 0
+        
+        while True:
+            if region is None:
+                with self.borrow_frame(max_age=self.stable_sample_interval) as screen_img:
+                    sig = self.change_detector.signature(screen_img)
+            else:
+                sig = self.change_detector.signature(self.frame_source.read(region))
+            samples += 1
+            now = time.perf_counter()
+            
+            if previous is not None and previous.shape == sig.shape \
+                    and self.change_detector.difference(previous, sig) <= threshold:
+                if still_since is None:
+                    still_since = now
+                if now - still_since >= settle_time:
+                    metrics.observe('wait_stable', now - start)
+                    print(f"✓ Screen stable after {now - start:.2f}s ({samples} samples)")
+                    return True
+            else:
+                still_since = None
+            previous = sig
+            
+            if now - start >= max_seconds:
+                metrics.observe('wait_stable', now - start)
+                print(f"✗ Screen still changing after {max_seconds:g}s ({samples} samples)")
+                return False
+            time.sleep(self.stable_sample_interval)
+    
+    def get_all_ocr_text(self, screen_img: Optional[np.ndarray] = None,
+                         rgb_img: Optional[np.ndarray] = None) -> List[Tuple]:
+        """Get all text detected by OCR on screen with bounding boxes (rgb_img: screen_img already in RGB)"""
+        if screen_img is None:
+            with self.borrow_frame() as screen_img:
+                return self.get_all_ocr_text(screen_img)
         
+        results = self._read_text(screen_img, rgb_img)
+        
+        post_start = time.perf_counter()
         all_text = []
         for (bbox, text, confidence) in results:
             x_coords = [point[0] for point in bbox]
@@ -174,6 +1231,7 @@ class ScreenBot:
             adjusted_bbox = [self._to_screen_coords(int(p[0]), int(p[1])) for p in bbox]
             all_text.append((screen_x, screen_y, adjusted_bbox, text, confidence))
         
+        metrics.observe('postprocess', time.perf_counter() - post_start)
         return all_text
     
     def find_objects_yolo(self, object_class: Optional[str] = None, screen_img: Optional[np.ndarray] = None, return_bbox: bool = False) -> List[Tuple]:
@@ -195,67 +1253,176 @@ class ScreenBot:
             return []
         
         if screen_img is None:
-            screen_img = self.take_screenshot()
+            with self.borrow_frame() as screen_img:
+                return self.find_objects_yolo(object_class, screen_img, return_bbox)
         
-        # Run YOLO detection with explicit device specification
-        results = self.yolo_model(screen_img, conf=self.confidence_threshold, device=self.device)
+        # Filter by class inside inference (class indices are resolved once per name)
+        classes = self.yolo_model.class_indices(object_class) if object_class is not None else None
         
+        rows = self._detect_objects(screen_img, classes)
+        post_start = time.perf_counter()
         detections = []
         
-        for result in results:
-            boxes = result.boxes
-            for box in boxes:
-                cls_id = int(box.cls[0])
-                class_name = self.yolo_model.names[cls_id]
-                confidence = float(box.conf[0])
-                
-                # Filter by class if specified
-                if object_class is None or object_class.lower() in class_name.lower():
-                    # Get bounding box (relative to cropped region)
-                    x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                    center_x = int((x1 + x2) / 2)
-                    center_y = int((y1 + y2) / 2)
-                    
-                    # Convert to screen coordinates
-                    screen_x, screen_y = self._to_screen_coords(center_x, center_y)
-                    
-                    if return_bbox:
-                        # Convert bbox to screen coordinates
-                        screen_x1, screen_y1 = self._to_screen_coords(int(x1), int(y1))
-                        screen_x2, screen_y2 = self._to_screen_coords(int(x2), int(y2))
-                        detections.append((screen_x, screen_y, class_name, confidence, (screen_x1, screen_y1, screen_x2, screen_y2)))
-                    else:
-                        detections.append((screen_x, screen_y, class_name, confidence))
-                    print(f"Found '{class_name}' at ({screen_x}, {screen_y}) with confidence {confidence:.2f}")
+        for x1, y1, x2, y2, confidence, cls_id in rows:
+            class_name = self.yolo_model.names[cls_id]
+            # Bounding box is relative to cropped region
+            center_x = int((x1 + x2) / 2)
+            center_y = int((y1 + y2) / 2)
+            
+            # Convert to screen coordinates
+            screen_x, screen_y = self._to_screen_coords(center_x, center_y)
+            
+            if return_bbox:
+                # Convert bbox to screen coordinates
+                screen_x1, screen_y1 = self._to_screen_coords(int(x1), int(y1))
+                screen_x2, screen_y2 = self._to_screen_coords(int(x2), int(y2))
+                detections.append((screen_x, screen_y, class_name, confidence, (screen_x1, screen_y1, screen_x2, screen_y2)))
+            else:
+                detections.append((screen_x, screen_y, class_name, confidence))
+            print(f"Found '{class_name}' at ({screen_x}, {screen_y}) with confidence {confidence:.2f}")
         
+        metrics.observe('postprocess', time.perf_counter() - post_start)
         return detections
     
-    def click(self, x: int, y: int, button: str = 'left', clicks: int = 1):
-        """Click at specified coordinates"""
+    def _reaction_region(self, x: int, y: int) -> Tuple[int, int, int, int]:
+        """Box of reaction_radius around a screen point, clipped to the current region"""
+        r = self.reaction_radius
+        x1, y1, x2, y2 = max(0, x - r), max(0, y - r), x + r, y + r
+        if self.screen_region is not None:
+            rx, ry, rw, rh = self.screen_region
+            x1, y1 = max(x1, rx), max(y1, ry)
+            x2, y2 = min(x2, rx + rw), min(y2, ry + rh)
+        if x2 <= x1 or y2 <= y1:
+            return self.screen_region
+        return (x1, y1, x2 - x1, y2 - y1)
+    
+    def _perform(self, action: str, description: str, send, region: Optional[Tuple[int, int, int, int]] = None,
+                 verify: bool = False) -> Optional[bool]:
+        """
+        Send one input action, pause for its minimum delay and optionally wait for a reaction
+        
+        With verify, the watched region is sampled before the input and then polled until
+        it visibly changes or reaction_timeout passes, so an action costs as long as the
+        game takes to respond instead of a fixed sleep.
+        
+        Args:
+            action: Kind of action ('click', 'press', 'type', 'move') - selects the minimum delay
+            description: Text for the log
+            send: Callable that sends the input
+            region: Screen region (x, y, width, height) expected to change (None = current region)
+            verify: Wait for a visible change after the input
+            
+        Returns:
+            True if the screen reacted, False if it did not within reaction_timeout,
+            None if the reaction was not checked (or the input was simulated)
+        """
+        if not self._input_enabled(description):
+            return None
+        region = self.screen_region if region is None else region
+        before = self.change_detector.signature(self.frame_source.read(region)) if verify else None
+        start = time.perf_counter()
+        send()
+        metrics.observe(f'input_{action}', time.perf_counter() - start)
+        with metrics.timer('action_delay'):
+            time.sleep(self.action_delays.get(action, 0.0))
+        if before is None:
+            return None
+        
+        samples = 0
+        while True:
+            sig = self.change_detector.signature(self.frame_source.read(region))
+            samples += 1
+            elapsed = time.perf_counter() - start
+            reacted = self.change_detector.changed(before, sig)
+            if reacted or elapsed >= self.reaction_timeout:
+                break
+            time.sleep(self.wait_poll_interval)
+        
+        self.actions_verified += 1
+        metrics.observe('reaction_wait', elapsed)
+        if not reacted:
+            metrics.count('reaction_timeouts')
+        self.last_action = {'action': description, 'reacted': reacted, 'elapsed': elapsed, 'samples': samples}
+        if reacted:
+            self.actions_reacted += 1
+            self.reaction_time += elapsed
+            print(f"  ✓ Screen reacted after {elapsed:.2f}s")
+        else:
+            print(f"  ⏳ No visible reaction within {self.reaction_timeout:g}s - continuing")
+        return reacted
+    
+    def action_stats(self) -> dict:
+        """Return how many verified actions got a visible reaction and how fast"""
+        return {
+            'verify': self.verify_actions,
+            'timeout': self.reaction_timeout,
+            'verified': self.actions_verified,
+            'reacted': self.actions_reacted,
+            'timeouts': self.actions_verified - self.actions_reacted,
+            'avg_reaction_ms': self.reaction_time * 1000 / self.actions_reacted if self.actions_reacted else 0.0,
+        }
+    
+    def click(self, x: int, y: int, button: str = 'left', clicks: int = 1,
+              wait_for_reaction: Optional[bool] = None) -> Optional[bool]:
+        """
+        Click at specified coordinates
+        
+        Args:
+            x, y: Screen coordinates
+            button: 'left' or 'right'
+            clicks: Number of clicks
+            wait_for_reaction: Wait for the area around the click to change (defaults to verify_actions)
+            
+        Returns:
+            Whether the screen reacted (None if not checked)
+        """
         print(f"Clicking at ({x}, {y}) with {button} button, {clicks} times")
-        pyautogui.click(x, y, button=button, clicks=clicks)
-        time.sleep(0.2)  # Small delay after clicking
+        verify = self.verify_actions if wait_for_reaction is None else wait_for_reaction
+        return self._perform('click', f"click at ({x}, {y})",
+                             lambda: pyautogui.click(x, y, button=button, clicks=clicks),
+                             region=self._reaction_region(x, y), verify=verify)
     
-    def click_current(self, button: str = 'left', clicks: int = 1):
-        """Click at current cursor position"""
+    def click_current(self, button: str = 'left', clicks: int = 1,
+                      wait_for_reaction: Optional[bool] = None) -> Optional[bool]:
+        """Click at current cursor position (see click)"""
         print(f"Clicking at current position with {button} button, {clicks} times")
-        pyautogui.click(button=button, clicks=clicks)
-        time.sleep(0.2)  # Small delay after clicking
+        verify = self.verify_actions if wait_for_reaction is None else wait_for_reaction
+        region = self._reaction_region(*pyautogui.position()) if verify and pyautogui is not None else None
+        return self._perform('click', "click at current position",
+                             lambda: pyautogui.click(button=button, clicks=clicks),
+                             region=region, verify=verify)
     
     def move_rel(self, x_offset: int, y_offset: int):
         """Move mouse cursor relative to current position"""
         print(f"Moving cursor by ({x_offset}, {y_offset})")
-        pyautogui.moveRel(x_offset, y_offset)
+        self._perform('move', "relative move", lambda: pyautogui.moveRel(x_offset, y_offset))
     
-    def press_key(self, key: str, presses: int = 1):
-        """Press a keyboard key"""
+    def move_to(self, x: int, y: int):
+        """Move mouse cursor to screen coordinates"""
+        print(f"Moving cursor to ({x}, {y})")
+        self._perform('move', f"move to ({x}, {y})", lambda: pyautogui.moveTo(x, y))
+    
+    def press_key(self, key: str, presses: int = 1, wait_for_reaction: Optional[bool] = None) -> Optional[bool]:
+        """
+        Press a keyboard key
+        
+        Args:
+            key: Key name (e.g. 'enter', 'space')
+            presses: Number of presses
+            wait_for_reaction: Wait for the region to change (defaults to verify_actions)
+            
+        Returns:
+            Whether the screen reacted (None if not checked)
+        """
         print(f"Pressing '{key}' {presses} times")
-        pyautogui.press(key, presses=presses)
+        verify = self.verify_actions if wait_for_reaction is None else wait_for_reaction
+        return self._perform('press', f"key press '{key}'", lambda: pyautogui.press(key, presses=presses),
+                             verify=verify)
     
     def type_text(self, text: str, interval: float = 0.05):
         """Type text"""
         print(f"Typing: {text}")
-        pyautogui.write(text, interval=interval)
+        self._perform('type', "typing", lambda: pyautogui.write(text, interval=interval))
     
     def find_and_click_text(self, text: str, index: int = 0) -> bool:
         """
@@ -269,17 +1436,13 @@ class ScreenBot:
             True if found and clicked, False otherwise
         """
         print(f"Searching for text: '{text}'...")
-        matches = self.find_text_ocr(text)
+        location = self.locate_text(text, index)
         
-        if not matches:
+        if location is None:
             print(f"Text '{text}' not found on screen")
             return False
         
-        if index >= len(matches):
-            print(f"Index {index} out of range. Found {len(matches)} occurrence(s). Using index {len(matches)-1} instead.")
-            index = len(matches) - 1
-        
-        x, y = matches[index]
+        x, y = location
         self.click(x, y)
         return True
     
@@ -295,19 +1458,14 @@ class ScreenBot:
             True if found and pointed, False otherwise
         """
         print(f"Searching for text: '{text}'...")
-        matches = self.find_text_ocr(text)
+        location = self.locate_text(text, index)
         
-        if not matches:
+        if location is None:
             print(f"Text '{text}' not found on screen")
             return False
         
-        if index >= len(matches):
-            print(f"Index {index} out of range. Found {len(matches)} occurrence(s). Using index {len(matches)-1} instead.")
-            index = len(matches) - 1
-        
-        x, y = matches[index]
-        print(f"Moving cursor to ({x}, {y})")
-        pyautogui.moveTo(x, y)
+        x, y = location
+        self.move_to(x, y)
         return True
     
     def find_and_click_object(self, object_class: str, index: int = 0) -> bool:
@@ -359,8 +1517,7 @@ class ScreenBot:
             index = len(detections) - 1
         
         x, y, class_name, confidence = detections[index]
-        print(f"Moving cursor to ({x}, {y})")
-        pyautogui.moveTo(x, y)
+        self.move_to(x, y)
         return True
     
     def list_available_objects(self, screen_img: Optional[np.ndarray] = None):
@@ -8,6 +8,7 @@ import queue
 import sys
 from io import StringIO
 from bot import ScreenBot
+from frame_buffer import LatestFrameMailbox
 import time
 import cv2
 import numpy as np
@@ -89,8 +90,15 @@ class BotGUI:
         
         # Preview variables
         self.preview_active = False
-        self.preview_thread = None
+        self.preview_threads = []
+        self.preview_overlay = None  # (all_text, timestamp, region, ocr_ms) from the detection worker
+        self.preview_detect_interval = 2.0
         self.preview_image = None
+        self.preview_item = None
+        self.preview_after = None
+        self.preview_size = (800, 600)
+        self.preview_mailbox = LatestFrameMailbox()
+        self.preview_paint_times = []
     
     def setup_controls_tab(self, parent):
         """Setup the controls tab"""
@@ -193,14 +201,20 @@ class BotGUI:
                                       command=self.toggle_preview, state="disabled")
         self.preview_btn.grid(row=0, column=0, padx=(0, 10))
         
-        ttk.Label(control_frame, text="Update Interval (sec):").grid(row=0, column=1, padx=(0, 5))
+        ttk.Label(control_frame, text="Detection Interval (sec):").grid(row=0, column=1, padx=(0, 5))
         self.preview_interval = ttk.Entry(control_frame, width=5)
         self.preview_interval.grid(row=0, column=2, padx=(0, 10))
         self.preview_interval.insert(0, "2")
         
+        ttk.Label(control_frame, text="Display FPS:").grid(row=0, column=3, padx=(0, 5))
+        self.preview_fps = ttk.Entry(control_frame, width=5)
+        self.preview_fps.grid(row=0, column=4, padx=(0, 10))
+        self.preview_fps.insert(0, "20")
+        
         # Preview canvas
         self.preview_canvas = tk.Canvas(parent, bg="gray", width=800, height=600)
         self.preview_canvas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.preview_canvas.bind("<Configure>", self.on_preview_resize)
         parent.columnconfigure(0, weight=1)
         parent.rowconfigure(1, weight=1)
         
@@ -212,9 +226,14 @@ class BotGUI:
         """Initialize bot in background thread"""
         def init_in_thread():
             try:
+                start = time.perf_counter()
                 self.bot = ScreenBot()
-                self.log("✓ Bot initialized successfully!")
-                self.log(f"✓ GPU: {'Enabled' if self.bot.use_gpu else 'Disabled (using CPU)'}")
+                self.log(f"✓ Bot initialized successfully in {time.perf_counter() - start:.2f}s!")
+                # Don't touch bot.device here - probing CUDA imports torch
+                if self.bot.daemon is not None:
+                    self.log(f"✓ Using inference daemon on {self.bot.daemon.info['device']}")
+                else:
+                    self.log("  Models load on first use (device is reported then)")
                 self.update_status("Ready", "green")
                 self.bot_initializing = False
                 
@@ -476,6 +495,60 @@ click text cancel 1
         else:
             self.start_preview()
     
+    def on_preview_resize(self, event):
+        """Remember the canvas size so the worker can downscale frames to it"""
+        if event.width > 1 and event.height > 1:
+            self.preview_size = (event.width, event.height)
+    
+    def render_preview(self, screen_img, overlay):
+        """
+        Downscale a region frame to the canvas size and draw the latest detections on it
+        
+        Runs on the display worker; returns an RGB image ready for PhotoImage.
+        
+        Args:
+            screen_img: Region frame (BGR)
+            overlay: (all_text, timestamp, region, ocr_ms) of the latest detection pass, or None
+        """
+        height, width = screen_img.shape[:2]
+        canvas_width, canvas_height = self.preview_size
+        scale = min(canvas_width / float(width), canvas_height / float(height), 1.0)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        vis_img = cv2.resize(screen_img, size, interpolation=cv2.INTER_AREA)
+        
+        # Boxes from an older frame are only valid while the region hasn't changed
+        if overlay is None or overlay[2] != self.bot.screen_region:
+            return cv2.cvtColor(vis_img, cv2.COLOR_BGR2RGB)
+        all_text, timestamp, region, _ = overlay
+        
+        # Green while the detection is fresh, orange once it is older than two detection intervals
+        age = time.perf_counter() - timestamp
+        color = (0, 255, 0) if age <= 2 * self.preview_detect_interval else (0, 165, 255)
+        
+        # Results are in screen coordinates - shift to the region, then scale to the preview
+        region_x, region_y = region[:2] if region else (0, 0)
+        for center_x, center_y, bbox, text, confidence in all_text:
+            points = [((p[0] - region_x) * scale, (p[1] - region_y) * scale) for p in bbox]
+            
+            # Draw bounding box polygon
+            cv2.polylines(vis_img, [np.array(points, dtype=np.int32)], True, color, 2)
+            
+            # Draw center point
+            center = (int((center_x - region_x) * scale), int((center_y - region_y) * scale))
+            cv2.circle(vis_img, center, 3, (0, 0, 255), -1)
+            
+            # Draw text label
+            label = f"{text} ({confidence:.2f})"
+            label_pos = (int(points[0][0]), int(points[0][1]) - 5)
+            cv2.putText(vis_img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        
+        # Age of the boxes, top-left
+        age_label = f"detections {age:.1f}s old"
+        cv2.putText(vis_img, age_label, (8, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 3)
+        cv2.putText(vis_img, age_label, (8, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        
+        return cv2.cvtColor(vis_img, cv2.COLOR_BGR2RGB)
+    
     def start_preview(self):
         """Start live preview"""
         if not self.bot:
@@ -484,89 +557,111 @@ click text cancel 1
         
         try:
             interval = float(self.preview_interval.get())
-            if interval < 0.5:
-                interval = 0.5
+            if interval < 0.2:
+                interval = 0.2
         except ValueError:
             interval = 2.0
+        try:
+            fps = min(max(float(self.preview_fps.get()), 1.0), 60.0)
+        except ValueError:
+            fps = 20.0
+        self.preview_detect_interval = interval
         
         self.preview_active = True
         self.preview_btn.config(text="⏹ Stop Live Preview")
         self.preview_status.config(text="Preview active")
-        
-        def preview_loop():
+        self.preview_mailbox = LatestFrameMailbox()
+        self.preview_paint_times = []
+        self.preview_overlay = None
+        
+        # Share one capture stream between the preview display, detection and the executor
+        self.bot.start_capture_thread(fps=fps)
+        
+        def detect_loop():
+            # Detection worker: pipelined OCR at its own (lower) rate - the next frame is captured
+            # and converted while OCR runs - with the newest result shared with the display worker
+            errors_seen = 0
+            with self.bot.detection_stream('text', fps=1.0 / interval, depth=1) as stream:
+                while self.preview_active and self.bot:
+                    detection = stream.next(timeout=0.2)
+                    if detection is not None:
+                        self.preview_overlay = (detection.result, detection.timestamp, detection.region,
+                                                detection.infer_ms)
+                    if stream.errors > errors_seen:
+                        errors_seen = stream.errors
+                        self.log(f"Preview error: {stream.last_error}")
+        
+        def display_loop():
+            # Display worker: newest captured frame + latest detections, downscaled; never touches Tk
+            period = 1.0 / fps
             while self.preview_active and self.bot:
+                start = time.perf_counter()
                 try:
-                    # Take screenshot
-                    screen_img = self.bot.take_screenshot()
-                    
-                    # Get OCR results
-                    all_text = self.bot.get_all_ocr_text(screen_img)
-                    
-                    # Create visualization
-                    vis_img = screen_img.copy()
-                    
-                    # Draw bounding boxes and labels
-                    for center_x, center_y, bbox, text, confidence in all_text:
-                        # Adjust bbox to region coordinates
-                        if self.bot.screen_region:
-                            region_x, region_y, _, _ = self.bot.screen_region
-                            adjusted_bbox = [(p[0] - region_x, p[1] - region_y) for p in bbox]
-                        else:
-                            adjusted_bbox = bbox
-                        
-                        # Draw bounding box polygon
-                        bbox_points = np.array(adjusted_bbox, dtype=np.int32)
-                        cv2.polylines(vis_img, [bbox_points], True, (0, 255, 0), 2)
-                        
-                        # Draw center point
-                        cv2.circle(vis_img, (center_x if not self.bot.screen_region else center_x - self.bot.screen_region[0], 
-                                            center_y if not self.bot.screen_region else center_y - self.bot.screen_region[1]), 
-                                 3, (0, 0, 255), -1)
-                        
-                        # Draw text label
-                        label = f"{text} ({confidence:.2f})"
-                        if adjusted_bbox:
-                            label_pos = (int(adjusted_bbox[0][0]), int(adjusted_bbox[0][1]) - 5)
-                            cv2.putText(vis_img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-                    
-                    # Convert to PIL Image
-                    vis_img_rgb = cv2.cvtColor(vis_img, cv2.COLOR_BGR2RGB)
-                    pil_img = Image.fromarray(vis_img_rgb)
-                    
-                    # Resize to fit canvas
-                    canvas_width = self.preview_canvas.winfo_width()
-                    canvas_height = self.preview_canvas.winfo_height()
-                    if canvas_width > 1 and canvas_height > 1:
-                        pil_img.thumbnail((canvas_width, canvas_height), Image.LANCZOS)
-                    
-                    # Convert to PhotoImage
-                    self.preview_image = ImageTk.PhotoImage(pil_img)
-                    
-                    # Update canvas
-                    self.preview_canvas.delete("all")
-                    self.preview_canvas.create_image(0, 0, anchor=tk.NW, image=self.preview_image)
-                    
-                    # Update status
-                    self.root.after(0, lambda: self.preview_status.config(text=f"Preview active - {len(all_text)} texts detected"))
+                    with self.bot.borrow_frame() as screen_img:
+                        captured = time.perf_counter()
+                        rgb_img = self.render_preview(screen_img, self.preview_overlay)
+                    rendered = time.perf_counter()
                     
+                    overlay = self.preview_overlay
+                    self.preview_mailbox.put({
+                        'image': rgb_img,
+                        'texts': len(overlay[0]) if overlay else 0,
+                        'capture_ms': (captured - start) * 1000,
+                        'ocr_ms': overlay[3] if overlay else 0.0,
+                        'render_ms': (rendered - captured) * 1000,
+                    })
                 except Exception as e:
                     self.log(f"Preview error: {e}")
                 
-                # Wait for next update
-                time.sleep(interval)
+                time.sleep(max(0.0, period - (time.perf_counter() - start)))
+        
+        self.preview_threads = [threading.Thread(target=detect_loop, daemon=True),
+                                threading.Thread(target=display_loop, daemon=True)]
+        for thread in self.preview_threads:
+            thread.start()
+        self.paint_preview()
+    
+    def paint_preview(self):
+        """Paint the newest preview frame (Tk main loop only); older frames were dropped"""
+        self.preview_after = None
+        frame = self.preview_mailbox.take()
+        if frame is not None:
+            start = time.perf_counter()
+            self.preview_image = ImageTk.PhotoImage(Image.fromarray(frame['image']))
+            if self.preview_item is None or not self.preview_canvas.find_withtag(self.preview_item):
+                self.preview_canvas.delete("all")
+                self.preview_item = self.preview_canvas.create_image(0, 0, anchor=tk.NW, image=self.preview_image)
+            else:
+                self.preview_canvas.itemconfig(self.preview_item, image=self.preview_image)
+            paint_ms = (time.perf_counter() - start) * 1000
+            
+            # Achieved FPS over the last few seconds of painted frames
+            now = time.perf_counter()
+            self.preview_paint_times = [t for t in self.preview_paint_times if now - t < 3.0] + [now]
+            span = now - self.preview_paint_times[0]
+            fps = (len(self.preview_paint_times) - 1) / span if span > 0 else 0.0
             
-            # Reset when stopped
-            self.root.after(0, lambda: self.preview_btn.config(text="▶ Start Live Preview"))
-            self.root.after(0, lambda: self.preview_status.config(text="Preview stopped"))
+            self.preview_status.config(
+                text=f"Preview active - {fps:.1f} FPS - {frame['texts']} texts - "
+                     f"capture {frame['capture_ms']:.0f} ms, OCR {frame['ocr_ms']:.0f} ms every {self.preview_detect_interval:g}s, "
+                     f"resize {frame['render_ms']:.0f} ms, paint {paint_ms:.0f} ms - "
+                     f"{self.preview_mailbox.dropped} dropped")
         
-        self.preview_thread = threading.Thread(target=preview_loop, daemon=True)
-        self.preview_thread.start()
+        self.preview_after = self.root.after(15, self.paint_preview)
     
     def stop_preview(self):
         """Stop live preview"""
         self.preview_active = False
-        if self.preview_thread:
-            self.preview_thread.join(timeout=1)
+        if self.preview_after is not None:
+            self.root.after_cancel(self.preview_after)
+            self.preview_after = None
+        for thread in self.preview_threads:
+            thread.join(timeout=1)
+        self.preview_threads = []
+        if self.bot:
+            self.bot.stop_capture_thread()
+        self.preview_btn.config(text="▶ Start Live Preview")
+        self.preview_status.config(text="Preview stopped")
     
     def on_closing(self):
         """Handle window close event"""
@@ -0,0 +1,240 @@
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+try:
+    import pyautogui
+except Exception:  # No display available (e.g. headless Linux)
+    pyautogui = None
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+Region = Tuple[int, int, int, int]
+
+
+class CaptureBackend:
+    """
+    Base class for screen capture backends
+
+    Subclasses implement _grab() and _screen_size(). Every backend grabs only the
+    requested rectangle and returns a contiguous BGR uint8 array.
+    """
+    name = 'base'
+
+    def __init__(self):
+        self.grab_count = 0
+        self.total_time = 0.0
+        self.last_latency = 0.0
+        self.min_latency = None
+        self.max_latency = 0.0
+        self._stats_lock = threading.Lock()
+
+    def grab(self, region: Optional[Region] = None) -> np.ndarray:
+        """
+        Capture a rectangle of the screen
+
+        Args:
+            region: (x, y, width, height) in screen coordinates, or None for the primary screen
+
+        Returns:
+            Contiguous BGR image of the requested rectangle
+        """
+        if region is not None:
+            region = self._clip(region)
+
+        start = time.perf_counter()
+        img = self._grab(region)
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.grab_count += 1
+            self.total_time += elapsed
+            self.last_latency = elapsed
+            self.min_latency = elapsed if self.min_latency is None else min(self.min_latency, elapsed)
+            self.max_latency = max(self.max_latency, elapsed)
+
+        return img
+
+    def _clip(self, region: Region) -> Region:
+        """Clip region width/height so it does not extend past the screen edges"""
+        x, y, width, height = region
+        screen_w, screen_h = self._screen_size()
+        width = max(1, min(width, screen_w - x))
+        height = max(1, min(height, screen_h - y))
+        return (x, y, width, height)
+
+    def _grab(self, region: Optional[Region]) -> np.ndarray:
+        raise NotImplementedError
+
+    def _screen_size(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, float]:
+        """Return grab latency statistics in milliseconds"""
+        with self._stats_lock:
+            avg = self.total_time / self.grab_count if self.grab_count else 0.0
+            return {
+                'backend': self.name,
+                'grabs': self.grab_count,
+                'last_ms': self.last_latency * 1000,
+                'avg_ms': avg * 1000,
+                'min_ms': (self.min_latency or 0.0) * 1000,
+                'max_ms': self.max_latency * 1000,
+            }
+
+    def reset_stats(self):
+        """Reset latency statistics"""
+        with self._stats_lock:
+            self.grab_count = 0
+            self.total_time = 0.0
+            self.last_latency = 0.0
+            self.min_latency = None
+            self.max_latency = 0.0
+
+    def close(self):
+        """Release any native resources held by the backend"""
+        pass
+
+
+class PyAutoGUIBackend(CaptureBackend):
+    """Fallback backend using pyautogui.screenshot (works everywhere pyautogui does)"""
+    name = 'pyautogui'
+
+    def __init__(self):
+        super().__init__()
+        if pyautogui is None:
+            raise RuntimeError("pyautogui is not available (no display?)")
+
+    def _grab(self, region: Optional[Region]) -> np.ndarray:
+        screenshot = pyautogui.screenshot(region=region) if region is not None else pyautogui.screenshot()
+        img = np.asarray(screenshot)
+        if img.shape[2] == 4:
+            return cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
+        return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+    def _screen_size(self) -> Tuple[int, int]:
+        width, height = pyautogui.size()
+        return (width, height)
+
+
+class MSSBackend(CaptureBackend):
+    """
+    Region-only capture through mss (XGetImage on X11, BitBlt on Windows,
+    CoreGraphics on macOS). Much cheaper than a full-desktop grab when the
+    detection region is smaller than the screen.
+    """
+    name = 'mss'
+
+    def __init__(self):
+        super().__init__()
+        if mss is None:
+            raise RuntimeError("mss is not installed (pip install mss)")
+        # mss handles are bound to the thread that created them, and the GUI
+        # captures from several worker threads, so keep one instance per thread
+        self._local = threading.local()
+        self._instances: List = []
+        self._instances_lock = threading.Lock()
+        self._sct()
+
+    def _sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._instances_lock:
+                self._instances.append(sct)
+        return sct
+
+    def _grab(self, region: Optional[Region]) -> np.ndarray:
+        sct = self._sct()
+        if region is None:
+            monitor = sct.monitors[1]
+        else:
+            x, y, width, height = region
+            monitor = {'left': x, 'top': y, 'width': width, 'height': height}
+        shot = sct.grab(monitor)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+
+    def _screen_size(self) -> Tuple[int, int]:
+        monitor = self._sct().monitors[0]
+        return (monitor['left'] + monitor['width'], monitor['top'] + monitor['height'])
+
+    def close(self):
+        with self._instances_lock:
+            for sct in self._instances:
+                try:
+                    sct.close()
+                except Exception:
+                    pass
+            self._instances = []
+        self._local = threading.local()
+
+
+# Ordered by preference - the first one that initializes wins in auto mode
+CAPTURE_BACKENDS = {
+    'mss': MSSBackend,
+    'pyautogui': PyAutoGUIBackend,
+}
+
+
+def create_capture_backend(name: Optional[str] = None) -> CaptureBackend:
+    """
+    Create a capture backend by name
+
+    Args:
+        name: Backend name ('mss', 'pyautogui') or None/'auto' to pick the fastest available
+
+    Returns:
+        Initialized CaptureBackend
+    """
+    if name is not None and name != 'auto':
+        if name not in CAPTURE_BACKENDS:
+            raise ValueError(f"Unknown capture backend '{name}'. Available: {', '.join(CAPTURE_BACKENDS)}")
+        candidates = [name]
+    else:
+        candidates = list(CAPTURE_BACKENDS)
+
+    errors = []
+    for candidate in candidates:
+        try:
+            return CAPTURE_BACKENDS[candidate]()
+        except Exception as e:
+            errors.append(f"{candidate}: {e}")
+
+    raise RuntimeError("No capture backend available (" + "; ".join(errors) + ")")
+
+
+def benchmark_backends(region: Optional[Region], grabs: int = 20) -> List[Dict[str, float]]:
+    """
+    Grab the same region repeatedly with every available backend
+
+    Args:
+        region: (x, y, width, height) to grab, or None for the full screen
+        grabs: Number of grabs per backend
+
+    Returns:
+        List of stats dicts, one per backend that could be initialized
+    """
+    results = []
+    for name in CAPTURE_BACKENDS:
+        try:
+            backend = create_capture_backend(name)
+        except Exception as e:
+            print(f"  {name}: unavailable ({e})")
+            continue
+        try:
+            backend.grab(region)  # warm-up
+            backend.reset_stats()
+            for _ in range(grabs):
+                backend.grab(region)
+            results.append(backend.stats())
+        finally:
+            backend.close()
+    return results
@@ -0,0 +1,96 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import cv2
+
+
+class FrameChangeDetector:
+    """
+    Cheap "did the screen change?" check on downsampled grayscale frames
+
+    A frame is reduced to a small grayscale signature; two frames count as
+    unchanged when the mean absolute difference of their signatures is below
+    the threshold and no single signature pixel changed by more than the pixel
+    threshold (in 0-255 gray levels). The per-pixel test catches small local
+    changes, such as a button appearing, that barely move the mean.
+    """
+
+    def __init__(self, threshold: float = 1.5, size: Tuple[int, int] = (96, 96), pixel_threshold: int = 24):
+        """
+        Args:
+            threshold: Mean absolute gray-level difference above which a frame counts as changed
+            size: (width, height) of the signature
+            pixel_threshold: Gray-level difference of any one signature pixel above which
+                             a frame counts as changed
+        """
+        self.threshold = threshold
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+
+    def signature(self, img: np.ndarray) -> np.ndarray:
+        """Downsampled grayscale signature of a BGR (or gray) frame"""
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+
+    def difference(self, sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Mean absolute difference between two signatures"""
+        return float(cv2.absdiff(sig_a, sig_b).mean())
+
+    def changed(self, sig_a: Optional[np.ndarray], sig_b: Optional[np.ndarray]) -> bool:
+        """True if the signatures differ by more than either threshold (or one is missing)"""
+        if sig_a is None or sig_b is None or sig_a.shape != sig_b.shape:
+            return True
+        diff = cv2.absdiff(sig_a, sig_b)
+        return float(diff.mean()) > self.threshold or int(diff.max()) > self.pixel_threshold
+
+
+class ResultGate:
+    """
+    Remembers the last detection result per key and reuses it while the frame is unchanged
+    """
+
+    def __init__(self, detector: FrameChangeDetector):
+        self.detector = detector
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+    def lookup(self, key, img: np.ndarray):
+        """
+        Args:
+            key: Cache key (e.g. engine name + region + settings)
+            img: Frame about to be analysed
+
+        Returns:
+            (cached_result or None, signature of img)
+        """
+        sig = self.detector.signature(img)
+        if self.enabled:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0].shape == sig.shape and img.shape == entry[1] \
+                    and not self.detector.changed(entry[0], sig):
+                self.hits += 1
+                return entry[2], sig
+        self.misses += 1
+        return None, sig
+
+    def store(self, key, img: np.ndarray, sig: np.ndarray, result):
+        self._entries[key] = (sig, img.shape, result)
+
+    def clear(self):
+        self._entries = {}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'threshold': self.detector.threshold,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
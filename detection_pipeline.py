@@ -0,0 +1,231 @@
+"""
+Pipelined detection: capture/preprocessing of frame N+1 overlaps inference on frame N
+
+A capture stage grabs and prepares frames, an inference stage runs detection on
+them, and results come out of a streaming iterator. Both hand-offs are small
+bounded queues that drop the oldest item when full, so a slow consumer or slow
+inference never works on stale frames and memory stays bounded.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from capture import Region
+
+
+class DropOldestQueue:
+    """Bounded FIFO whose put() discards the oldest item instead of blocking when full"""
+
+    def __init__(self, maxsize: int = 2):
+        if maxsize < 1:
+            raise ValueError("Queue needs room for at least one item")
+        self._items = deque()
+        self.maxsize = maxsize
+        self._cond = threading.Condition()
+        self._closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None):
+        """Oldest waiting item, or None on timeout or once the queue is closed and empty"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout=timeout)
+            if not self._items:
+                return None
+            self._cond.notify_all()  # Wake a producer waiting for space
+            return self._items.popleft()
+
+    def wait_for_space(self, timeout: Optional[float] = None) -> bool:
+        """Block until there is a free slot (backpressure); False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed, timeout=timeout)
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class Detection:
+    """Result of one pipelined detection pass plus the timing of each stage"""
+
+    def __init__(self, seq: int, timestamp: float, region: Optional[Region], frame: np.ndarray, result: Any,
+                 capture_ms: float, prepare_ms: float, infer_ms: float):
+        self.seq = seq
+        self.timestamp = timestamp  # perf_counter() time the frame was captured
+        self.region = region
+        self.frame = frame
+        self.result = result
+        self.capture_ms = capture_ms
+        self.prepare_ms = prepare_ms
+        self.infer_ms = infer_ms
+
+    @property
+    def age(self) -> float:
+        return time.perf_counter() - self.timestamp
+
+
+class DetectionPipeline:
+    """
+    Two-stage capture -> inference pipeline exposed as an iterator of Detections
+
+    Usage:
+        with DetectionPipeline(read_frame, detect) as stream:
+            for detection in stream:
+                ...
+    """
+
+    def __init__(self, read_frame: Callable[[], Tuple[np.ndarray, Optional[Region]]],
+                 detect: Callable[[np.ndarray, Any], Any],
+                 prepare: Optional[Callable[[np.ndarray], Any]] = None,
+                 fps: float = 15.0, depth: int = 2):
+        """
+        Args:
+            read_frame: Callable returning (frame, region it was captured from)
+            detect: detect(frame, prepared) -> result, run on the inference thread
+            prepare: prepare(frame) -> prepared input, run on the capture thread (e.g. color
+                     conversion); returning None skips the frame (e.g. unchanged screen)
+            fps: Maximum capture rate
+            depth: Capacity of the result queue (the frame queue holds one frame, so
+                   inference always starts on the newest one)
+        """
+        self.read_frame = read_frame
+        self.detect = detect
+        self.prepare = prepare
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.frames = DropOldestQueue(1)
+        self.results = DropOldestQueue(depth)
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._next_seq = 1
+        self.captured = 0
+        self.skipped = 0
+        self.detected = 0
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+        self.capture_time = 0.0
+        self.infer_time = 0.0
+
+    def start(self) -> "DetectionPipeline":
+        if not self._threads:
+            self._threads = [threading.Thread(target=self._capture_stage, daemon=True, name="PipelineCapture"),
+                             threading.Thread(target=self._inference_stage, daemon=True, name="PipelineInference")]
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def _capture_stage(self):
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            # Backpressure: don't grab frames the inference stage has no room for yet, but
+            # after one interval grab anyway so the waiting frame is never older than that
+            self.frames.wait_for_space(timeout=self.interval or None)
+            if self._stop_event.is_set():
+                break
+            try:
+                grab_start = time.perf_counter()
+                frame, region = self.read_frame()
+                captured = time.perf_counter()
+                prepared = self.prepare(frame) if self.prepare is not None else frame
+                prepare_ms = (time.perf_counter() - captured) * 1000
+                if prepared is None:
+                    self.skipped += 1
+                else:
+                    self.frames.put((self._next_seq, grab_start, region, frame, prepared,
+                                     (captured - grab_start) * 1000, prepare_ms))
+                    self._next_seq += 1
+                    self.captured += 1
+                    self.capture_time += captured - grab_start
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+            self._stop_event.wait(max(0.0, self.interval - (time.perf_counter() - start)))
+        self.frames.close()
+
+    def _inference_stage(self):
+        while not self._stop_event.is_set():
+            item = self.frames.get(timeout=0.1)
+            if item is None:
+                continue
+            seq, timestamp, region, frame, prepared, capture_ms, prepare_ms = item
+            start = time.perf_counter()
+            try:
+                result = self.detect(frame, prepared)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                continue
+            elapsed = time.perf_counter() - start
+            self.infer_time += elapsed
+            self.detected += 1
+            self.results.put(Detection(seq, timestamp, region, frame, result, capture_ms, prepare_ms, elapsed * 1000))
+        self.results.close()
+
+    def next(self, timeout: Optional[float] = None) -> Optional[Detection]:
+        """Next detection in order (oldest kept first), or None on timeout / after stop()"""
+        return self.results.get(timeout=timeout)
+
+    def latest(self) -> Optional[Detection]:
+        """Newest finished detection without blocking (older waiting ones are discarded)"""
+        detection = None
+        while True:
+            item = self.results.get_nowait()
+            if item is None:
+                return detection
+            detection = item
+
+    def __iter__(self) -> Iterator[Detection]:
+        while not self._stop_event.is_set():
+            detection = self.next(timeout=0.1)
+            if detection is not None:
+                yield detection
+
+    def stop(self):
+        """Stop both stages (an inference pass in progress is allowed to finish)"""
+        self._stop_event.set()
+        self.frames.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.results.close()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads) and not self._stop_event.is_set()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        return {
+            'captured': self.captured,
+            'skipped': self.skipped,
+            'detected': self.detected,
+            'frames_dropped': self.frames.dropped,
+            'results_dropped': self.results.dropped,
+            'errors': self.errors,
+            'avg_capture_ms': self.capture_time * 1000 / self.captured if self.captured else 0.0,
+            'avg_infer_ms': self.infer_time * 1000 / self.detected if self.detected else 0.0,
+        }
@@ -0,0 +1,209 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from capture import Region
+
+
+class _Slot:
+    """One preallocated frame in the ring buffer"""
+
+    def __init__(self, shape: Tuple[int, ...], dtype):
+        self.array = np.empty(shape, dtype=dtype)
+        self.seq = 0
+        self.timestamp = 0.0
+        self.region: Optional[Region] = None
+        self.pins = 0
+
+
+class BorrowedFrame:
+    """Read-only view of a ring buffer slot plus its metadata"""
+
+    def __init__(self, image: np.ndarray, seq: int, timestamp: float, region: Optional[Region]):
+        self.image = image
+        self.seq = seq
+        self.timestamp = timestamp
+        self.region = region
+
+    @property
+    def age(self) -> float:
+        return time.perf_counter() - self.timestamp
+
+
+class FrameRingBuffer:
+    """
+    Fixed-size ring of preallocated frames written by a single producer
+
+    Consumers borrow the latest frame as a zero-copy read-only view. A borrowed
+    slot is pinned and the producer skips it until it is released, so a view
+    never changes underneath a long OCR pass.
+    """
+
+    def __init__(self, slots: int = 4):
+        if slots < 2:
+            raise ValueError("Ring buffer needs at least 2 slots")
+        self.slot_count = slots
+        self._slots: List[_Slot] = []
+        self._latest: Optional[_Slot] = None
+        self._next_seq = 1
+        self._write_pos = 0
+        self._cond = threading.Condition()
+        self.written = 0
+        self.dropped = 0
+
+    def _allocate(self, shape: Tuple[int, ...], dtype):
+        self._slots = [_Slot(shape, dtype) for _ in range(self.slot_count)]
+        self._latest = None
+        self._write_pos = 0
+
+    def _free_slot(self) -> Optional[_Slot]:
+        for offset in range(self.slot_count):
+            index = (self._write_pos + offset) % self.slot_count
+            slot = self._slots[index]
+            if slot is not self._latest and slot.pins == 0:
+                self._write_pos = (index + 1) % self.slot_count
+                return slot
+        return None
+
+    def write(self, frame: np.ndarray, region: Optional[Region] = None, timestamp: Optional[float] = None) -> int:
+        """
+        Copy a frame into the next free slot
+
+        Args:
+            frame: Captured image
+            region: Screen region the frame was captured from (None = full screen)
+            timestamp: perf_counter() time of the capture (defaults to now)
+
+        Returns:
+            Sequence number of the stored frame, or 0 if every slot was busy and the frame was dropped
+        """
+        with self._cond:
+            if not self._slots or self._slots[0].array.shape != frame.shape or self._slots[0].array.dtype != frame.dtype:
+                # Region changed - pinned old slots stay alive through their borrowers
+                self._allocate(frame.shape, frame.dtype)
+            slot = self._free_slot()
+            if slot is None:
+                self.dropped += 1
+                return 0
+
+        # Only the producer touches a slot that is neither latest nor pinned
+        np.copyto(slot.array, frame)
+
+        with self._cond:
+            slot.seq = self._next_seq
+            slot.timestamp = timestamp if timestamp is not None else time.perf_counter()
+            slot.region = region
+            self._next_seq += 1
+            self._latest = slot
+            self.written += 1
+            self._cond.notify_all()
+            return slot.seq
+
+    @property
+    def latest_seq(self) -> int:
+        with self._cond:
+            return self._latest.seq if self._latest is not None else 0
+
+    @contextmanager
+    def borrow_latest(self, max_age: Optional[float] = None) -> Iterator[Optional[BorrowedFrame]]:
+        """
+        Borrow the most recent frame without copying it
+
+        Args:
+            max_age: Yield None instead if the latest frame is older than this (seconds)
+
+        Yields:
+            BorrowedFrame with a read-only view, or None if no suitable frame exists
+        """
+        with self._cond:
+            slot = self._latest
+            if slot is None or (max_age is not None and time.perf_counter() - slot.timestamp > max_age):
+                slot = None
+            else:
+                slot.pins += 1
+                view = slot.array.view()
+                view.flags.writeable = False
+                borrowed = BorrowedFrame(view, slot.seq, slot.timestamp, slot.region)
+
+        if slot is None:
+            yield None
+            return
+        try:
+            yield borrowed
+        finally:
+            with self._cond:
+                slot.pins -= 1
+
+    def wait_for_newer(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Block until a frame newer than seq has been written"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._latest is not None and self._latest.seq > seq, timeout=timeout)
+
+
+class LatestFrameMailbox:
+    """
+    Single-slot hand-off from a producer thread to a consumer
+
+    put() replaces whatever is still waiting, so the consumer only ever sees the
+    newest item; items it was too slow to pick up are dropped and counted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._item = None
+        self.posted = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._lock:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self.posted += 1
+
+    def take(self):
+        """Return the waiting item (None if nothing new) and empty the slot"""
+        with self._lock:
+            item, self._item = self._item, None
+            return item
+
+
+class CaptureThread(threading.Thread):
+    """Background producer that keeps a FrameRingBuffer filled at a fixed rate"""
+
+    def __init__(self, read_frame: Callable[[], Tuple[np.ndarray, Optional[Region]]],
+                 buffer: FrameRingBuffer, fps: float = 15.0):
+        """
+        Args:
+            read_frame: Callable returning (frame, region it was captured from)
+            buffer: Ring buffer to write into
+            fps: Target capture rate
+        """
+        super().__init__(daemon=True, name="CaptureThread")
+        self.read_frame = read_frame
+        self.buffer = buffer
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                frame, region = self.read_frame()
+                self.buffer.write(frame, region, timestamp=start)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+            remaining = self.interval - (time.perf_counter() - start)
+            if remaining > 0:
+                self._stop_event.wait(remaining)
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        self.join(timeout=timeout)
@@ -0,0 +1,171 @@
+import os
+import time
+import threading
+from typing import List, Optional
+
+import numpy as np
+import cv2
+
+from capture import CaptureBackend, Region
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class FrameSource:
+    """
+    Base class for everything ScreenBot reads frames from
+
+    read() returns a BGR image of the requested region (screen coordinates),
+    or of the whole screen when region is None.
+    """
+    name = 'base'
+    is_live = True
+
+    def read(self, region: Optional[Region] = None) -> np.ndarray:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.name
+
+    def close(self):
+        pass
+
+
+class LiveFrameSource(FrameSource):
+    """Frames grabbed from the real screen through a capture backend"""
+    name = 'live'
+    is_live = True
+
+    def __init__(self, capture: CaptureBackend):
+        self.capture = capture
+
+    def read(self, region: Optional[Region] = None) -> np.ndarray:
+        return self.capture.grab(region)
+
+    def describe(self) -> str:
+        return f"live ({self.capture.name})"
+
+
+class ReplayFrameSource(FrameSource):
+    """
+    Frames replayed from a folder of screenshots or a video file
+
+    Recorded frames are treated as full-screen captures, so regions are cropped
+    with the same screen coordinates the live source would use.
+    """
+    name = 'replay'
+    is_live = False
+
+    def __init__(self, path: str, fps: Optional[float] = None, loop: bool = True):
+        """
+        Args:
+            path: Folder of PNG/JPG screenshots (played in sorted order) or a video file
+            fps: Playback rate in frames per second (wall clock). If None, every
+                 read() advances exactly one frame, which makes runs deterministic.
+            loop: Restart from the first frame after the last one
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Replay source '{path}' not found")
+
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._start_time = None
+        self._reads = 0
+        self._index = -1
+        self._frame = None
+
+        self._files: List[str] = []
+        self._video = None
+        if os.path.isdir(path):
+            self._files = sorted(
+                os.path.join(path, f) for f in os.listdir(path)
+                if f.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            if not self._files:
+                raise ValueError(f"No images found in '{path}'")
+            self.frame_count = len(self._files)
+        else:
+            self._video = cv2.VideoCapture(path)
+            if not self._video.isOpened():
+                raise ValueError(f"Could not open video '{path}'")
+            self.frame_count = int(self._video.get(cv2.CAP_PROP_FRAME_COUNT)) or None
+            self._video_pos = 0
+
+    def _target_index(self) -> int:
+        """Frame index that should be shown now"""
+        if self.fps is None:
+            index = self._reads
+            self._reads += 1
+        else:
+            now = time.perf_counter()
+            if self._start_time is None:
+                self._start_time = now
+            index = int((now - self._start_time) * self.fps)
+
+        if self.frame_count:
+            if self.loop:
+                index %= self.frame_count
+            else:
+                index = min(index, self.frame_count - 1)
+        return index
+
+    def _load_image(self, index: int) -> np.ndarray:
+        img = cv2.imread(self._files[index], cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError(f"Could not read frame '{self._files[index]}'")
+        return img
+
+    def _load_video(self, index: int) -> np.ndarray:
+        # Sequential reads are much cheaper than seeking, so only seek backwards
+        if index < self._video_pos:
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self._video_pos = index
+        while self._video_pos < index:
+            self._video.grab()
+            self._video_pos += 1
+        ok, img = self._video.read()
+        if not ok:
+            if self.loop and index > 0:
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                self._video_pos = 0
+                return self._load_video(0)
+            if self._frame is not None:
+                return self._frame
+            raise ValueError(f"Could not read frame {index} from '{self.path}'")
+        self._video_pos += 1
+        return img
+
+    def current_frame(self) -> np.ndarray:
+        """Return the full frame that should be shown now"""
+        with self._lock:
+            index = self._target_index()
+            if index != self._index or self._frame is None:
+                self._frame = self._load_image(index) if self._files else self._load_video(index)
+                self._frame.flags.writeable = False
+                self._index = index
+            return self._frame
+
+    def read(self, region: Optional[Region] = None) -> np.ndarray:
+        frame = self.current_frame()
+        if region is None:
+            return frame.copy()
+        x, y, width, height = region
+        return frame[y:y+height, x:x+width].copy()
+
+    def rewind(self):
+        """Restart playback from the first frame"""
+        with self._lock:
+            self._start_time = None
+            self._reads = 0
+            self._index = -1
+
+    def describe(self) -> str:
+        rate = f"{self.fps} fps" if self.fps is not None else "one frame per read"
+        return f"replay '{self.path}' ({self.frame_count or '?'} frames, {rate})"
+
+    def close(self):
+        if self._video is not None:
+            self._video.release()
+            self._video = None
@@ -0,0 +1,455 @@
+"""
+Local inference daemon that keeps the EasyOCR and YOLO models warm
+
+Run it once (python inference_daemon.py, or from the launcher) and every
+ScreenBot started afterwards - GUI, CLI, scripts - sends its frames to it
+through shared memory instead of loading its own models. Inference runs in
+this process, so it never competes with the Tk GUI for the GIL.
+"""
+import os
+os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+
+import sys
+import stat
+import time
+import getpass
+import secrets
+import threading
+import tempfile
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ocr_cache import OCRResultCache
+from yolo_engine import YoloEngine, resolve_classes
+
+# Socket and auth key live in a directory only the current user can access
+if sys.platform == 'win32':
+    RUNTIME_DIR = os.path.join(os.environ.get('LOCALAPPDATA') or tempfile.gettempdir(), 'umamusume-bot')
+    DEFAULT_ADDRESS = rf'\\.\pipe\umamusume-bot-inference-{getpass.getuser()}'
+    ADDRESS_FAMILY = 'AF_PIPE'
+else:
+    RUNTIME_DIR = os.path.join(os.environ['XDG_RUNTIME_DIR'], 'umamusume-bot') \
+        if os.path.isdir(os.environ.get('XDG_RUNTIME_DIR', '')) \
+        else os.path.join(tempfile.gettempdir(), f'umamusume-bot-{os.getuid()}')
+    DEFAULT_ADDRESS = os.path.join(RUNTIME_DIR, 'inference.sock')
+    ADDRESS_FAMILY = 'AF_UNIX'
+KEY_PATH = os.path.join(RUNTIME_DIR, 'inference.key')
+
+
+class DaemonError(Exception):
+    """The daemon is unreachable or returned an error"""
+
+
+def _private_dir(create: bool = False) -> str:
+    """
+    RUNTIME_DIR, checked to be owned by this user and closed to everyone else
+
+    Args:
+        create: Create it (mode 0700) if it doesn't exist yet
+    """
+    if create:
+        os.makedirs(RUNTIME_DIR, mode=0o700, exist_ok=True)
+    if sys.platform != 'win32':
+        try:
+            st = os.lstat(RUNTIME_DIR)
+        except FileNotFoundError:
+            raise DaemonError(f"No daemon runtime directory at {RUNTIME_DIR}")
+        if st.st_uid != os.getuid() or not stat.S_ISDIR(st.st_mode) or st.st_mode & 0o077:
+            raise DaemonError(f"{RUNTIME_DIR} must be a directory owned by you with mode 0700")
+    return RUNTIME_DIR
+
+
+def _write_authkey() -> bytes:
+    """Generate a new random auth key and store it where only this user can read it"""
+    _private_dir(create=True)
+    authkey = secrets.token_bytes(32)
+    tmp_path = KEY_PATH + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(authkey)
+    os.replace(tmp_path, KEY_PATH)
+    return authkey
+
+
+def _read_authkey() -> bytes:
+    _private_dir()
+    try:
+        with open(KEY_PATH, 'rb') as f:
+            return f.read()
+    except OSError as e:
+        raise DaemonError(f"Could not read daemon key: {e}")
+
+
+def _remove_runtime_files(address: str):
+    for path in ([address] if ADDRESS_FAMILY == 'AF_UNIX' else []) + [KEY_PATH]:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name)
+    # The client owns the segment - don't let this process' resource tracker unlink it
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+# ---------------------------------------------------------------- client side
+
+class DaemonClient:
+    """Connection to a running inference daemon; frames are passed through shared memory"""
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 0.5, call_timeout: float = 30.0):
+        """
+        Args:
+            address: Daemon socket / pipe
+            timeout: Seconds to wait for the connection handshake and the first ping
+            call_timeout: Seconds to wait for an inference result before giving up on the daemon
+        """
+        if ADDRESS_FAMILY == 'AF_UNIX' and not os.path.exists(address):
+            raise DaemonError(f"No daemon socket at {address}")
+        self.address = address
+        self.timeout = timeout
+        self.call_timeout = call_timeout
+        self._conn = self._connect(_read_authkey())
+        self._lock = threading.Lock()
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self.info = self.call('ping')
+
+    def _connect(self, authkey: bytes):
+        """Client() with a timeout, so a hung daemon can't block the bot"""
+        result = {}
+
+        def run():
+            try:
+                result['conn'] = Client(self.address, family=ADDRESS_FAMILY, authkey=authkey)
+            except Exception as e:
+                result['error'] = e
+                return
+            if 'abandoned' in result:
+                result['conn'].close()
+
+        thread = threading.Thread(target=run, daemon=True, name="DaemonConnect")
+        thread.start()
+        thread.join(self.timeout)
+        if thread.is_alive():
+            result['abandoned'] = True
+            raise DaemonError(f"Daemon did not answer within {self.timeout}s")
+        if 'error' in result:
+            raise DaemonError(f"Could not connect to daemon: {result['error']}")
+        return result['conn']
+
+    @classmethod
+    def connect_if_running(cls, address: str = DEFAULT_ADDRESS) -> Optional['DaemonClient']:
+        """Return a client if a daemon is listening, None otherwise"""
+        try:
+            return cls(address)
+        except DaemonError:
+            return None
+
+    def _share(self, img: np.ndarray) -> dict:
+        img = np.ascontiguousarray(img)
+        if self._shm is None or self._shm.size < img.nbytes:
+            self._release_shm()
+            self._shm = shared_memory.SharedMemory(create=True, size=max(img.nbytes, 1))
+        np.ndarray(img.shape, dtype=img.dtype, buffer=self._shm.buf)[...] = img
+        return {'shm': self._shm.name, 'shape': img.shape, 'dtype': img.dtype.str}
+
+    def call(self, op: str, img: Optional[np.ndarray] = None, **kwargs):
+        """
+        Run an operation on the daemon
+
+        Args:
+            op: 'ping', 'readtext', 'readtext_cached', 'detect', 'recognize', 'yolo' or 'shutdown'
+            img: Image argument (sent through shared memory)
+            **kwargs: Extra keyword arguments for the operation
+
+        Returns:
+            The operation's result
+        """
+        with self._lock:
+            request = {'op': op, 'kwargs': kwargs}
+            if img is not None:
+                request['image'] = self._share(img)
+            timeout = self.timeout if op == 'ping' else self.call_timeout
+            try:
+                self._conn.send(request)
+                if not self._conn.poll(timeout):
+                    # A late answer would be taken for the next request's - drop the connection
+                    self._conn.close()
+                    raise DaemonError(f"Daemon did not answer '{op}' within {timeout}s")
+                ok, payload = self._conn.recv()
+            except (EOFError, OSError) as e:
+                raise DaemonError(f"Lost connection to daemon: {e}")
+        if not ok:
+            raise DaemonError(payload)
+        return payload
+
+    def _release_shm(self):
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._shm = None
+
+    def close(self):
+        with self._lock:
+            self._release_shm()
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+
+
+class _RemoteEngine:
+    """Base for proxies that fall back to a local engine if the daemon goes away"""
+
+    def __init__(self, client: DaemonClient, fallback: Callable[[], object]):
+        self.client = client
+        self._fallback = fallback
+        self._local = None
+
+    def _call(self, op: str, local_call: Callable, img: np.ndarray, **kwargs):
+        if self._local is None:
+            try:
+                return self.client.call(op, img, **kwargs)
+            except DaemonError as e:
+                print(f"Warning: Inference daemon unavailable, loading local model: {e}")
+                self._local = self._fallback()
+        return local_call(self._local)
+
+
+class RemoteOCRReader(_RemoteEngine):
+    """Stands in for easyocr.Reader (readtext / detect / recognize)"""
+
+    def readtext(self, image: np.ndarray, **kwargs):
+        return self._call('readtext', lambda reader: reader.readtext(image, **kwargs), image, **kwargs)
+
+    def detect(self, img: np.ndarray, **kwargs):
+        return self._call('detect', lambda reader: reader.detect(img, **kwargs), img, **kwargs)
+
+    def readtext_cached(self, image: np.ndarray, cache: OCRResultCache,
+                        observe: Optional[Callable[[str, float], None]] = None):
+        """
+        Cache-aware readtext in a single request, using the daemon's OCR cache
+
+        Args:
+            cache: Local cache used instead once the daemon is gone
+            observe: Stage timing callback for the local fallback
+        """
+        return self._call('readtext_cached', lambda reader: cache.readtext(reader, image, observe), image)
+
+    def recognize(self, img_cv_grey: np.ndarray, horizontal_list=None, free_list=None, **kwargs):
+        return self._call('recognize',
+                          lambda reader: reader.recognize(img_cv_grey, horizontal_list=horizontal_list,
+                                                          free_list=free_list, **kwargs),
+                          img_cv_grey, horizontal_list=horizontal_list, free_list=free_list, **kwargs)
+
+
+class RemoteYOLO(_RemoteEngine):
+    """YOLO proxy returning raw (N, 6) [x1, y1, x2, y2, conf, cls] arrays"""
+
+    def __init__(self, client: DaemonClient, fallback: Callable[[], object]):
+        super().__init__(client, fallback)
+        self.names = {int(k): v for k, v in client.info.get('names', {}).items()}
+        self._class_cache: Dict[str, List[int]] = {}
+
+    def class_indices(self, query: str) -> List[int]:
+        """Class indices matching query, resolved once per query"""
+        key = query.lower()
+        if key not in self._class_cache:
+            self._class_cache[key] = resolve_classes(self.names, key)
+        return self._class_cache[key]
+
+    def infer_raw(self, img: np.ndarray, conf: float, local_infer: Callable,
+                  classes: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Args:
+            img: BGR image
+            conf: Confidence threshold
+            local_infer: Callable(engine, img, classes) used once the daemon is gone
+            classes: Only detect these class indices (None = all classes)
+        """
+        result = self._call('yolo', lambda engine: local_infer(engine, img, classes), img,
+                            conf=conf, classes=classes)
+        if self._local is not None:
+            self.names = self._local.names
+        return result
+
+
+# ---------------------------------------------------------------- server side
+
+class _Engines:
+    """Warm models held by the daemon"""
+
+    def __init__(self, load_yolo: bool = True):
+        import torch
+        import easyocr
+
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        print(f"Loading OCR model on {self.device}...")
+        self.ocr_reader = easyocr.Reader(['en'], gpu=self.device == 'cuda')
+        print("OCR model loaded!")
+
+        self.yolo_model = None
+        if load_yolo:
+            print(f"Loading YOLO model on {self.device}...")
+            try:
+                self.yolo_model = YoloEngine(device=self.device)
+                print(f"YOLO model loaded! ({self.yolo_model.describe()})")
+            except Exception as e:
+                print(f"Warning: Could not load YOLO model: {e}")
+
+        # Shared by all clients, so text read for one is cached for every other
+        self.ocr_cache = OCRResultCache()
+        print(f"OCR cache: {self.ocr_cache.stats()['entries']} entries loaded")
+
+        # Models are not thread-safe - one inference at a time
+        self.lock = threading.Lock()
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+
+    def image(self, spec: dict) -> np.ndarray:
+        shm = self._segments.get(spec['shm'])
+        if shm is None:
+            shm = _attach(spec['shm'])
+            self._segments[spec['shm']] = shm
+        return np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+
+    def info(self) -> dict:
+        return {
+            'device': self.device,
+            'pid': os.getpid(),
+            'yolo': self.yolo_model is not None,
+            'names': dict(self.yolo_model.names) if self.yolo_model is not None else {},
+        }
+
+    def handle(self, request: dict):
+        op = request['op']
+        kwargs = request.get('kwargs', {})
+        if op == 'ping':
+            return self.info()
+
+        with self.lock:
+            img = self.image(request['image']) if 'image' in request else None
+            if op == 'readtext':
+                return self.ocr_reader.readtext(img, **kwargs)
+            if op == 'readtext_cached':
+                return self.ocr_cache.readtext(self.ocr_reader, img)
+            if op == 'detect':
+                return self.ocr_reader.detect(img, **kwargs)
+            if op == 'recognize':
+                return self.ocr_reader.recognize(img, **kwargs)
+            if op == 'yolo':
+                if self.yolo_model is None:
+                    raise RuntimeError("YOLO model not available in daemon")
+                return self.yolo_model.infer(img, conf=kwargs.get('conf', 0.5), classes=kwargs.get('classes'))
+        raise ValueError(f"Unknown operation '{op}'")
+
+    def forget_segment(self, name: str):
+        shm = self._segments.pop(name, None)
+        if shm is not None:
+            shm.close()
+
+
+def _serve_connection(conn, engines: _Engines, listener: Listener):
+    segments = set()
+    try:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                break
+            if request.get('op') == 'shutdown':
+                conn.send((True, None))
+                print("Shutdown requested")
+                engines.ocr_cache.save()
+                listener.close()
+                _remove_runtime_files(listener.address)
+                os._exit(0)
+            if 'image' in request:
+                segments.add(request['image']['shm'])
+            try:
+                conn.send((True, engines.handle(request)))
+            except Exception as e:
+                conn.send((False, f"{type(e).__name__}: {e}"))
+    finally:
+        for name in segments:
+            engines.forget_segment(name)
+        conn.close()
+
+
+def serve(address: str = DEFAULT_ADDRESS, load_yolo: bool = True):
+    """Load the models and serve inference requests until shut down"""
+    existing = DaemonClient.connect_if_running(address)
+    if existing is not None:
+        print(f"Inference daemon already running (pid {existing.info['pid']})")
+        existing.close()
+        return
+    try:
+        _private_dir(create=True)
+    except DaemonError as e:
+        print(f"✗ {e}")
+        return
+    if ADDRESS_FAMILY == 'AF_UNIX' and os.path.exists(address):
+        os.remove(address)  # Stale socket from a crashed daemon
+
+    start = time.perf_counter()
+    engines = _Engines(load_yolo=load_yolo)
+    # New random key on every start; clients read it from the private key file
+    listener = Listener(address, family=ADDRESS_FAMILY, authkey=_write_authkey())
+    print(f"✓ Inference daemon ready in {time.perf_counter() - start:.1f}s on {engines.device} ({address})")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                break
+            except Exception as e:
+                print(f"Rejected connection: {e}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn, engines, listener), daemon=True).start()
+    except KeyboardInterrupt:
+        print("\nInference daemon stopped")
+    finally:
+        engines.ocr_cache.save()
+        listener.close()
+        _remove_runtime_files(address)
+
+
+def main():
+    args = sys.argv[1:]
+    if '--stop' in args:
+        client = DaemonClient.connect_if_running()
+        if client is None:
+            print("Inference daemon is not running")
+            return
+        try:
+            client.call('shutdown')
+        except DaemonError:
+            pass
+        print("Inference daemon stopped")
+    elif '--status' in args:
+        client = DaemonClient.connect_if_running()
+        if client is None:
+            print("Inference daemon is not running")
+        else:
+            info = client.info
+            print(f"Inference daemon running (pid {info['pid']}, {info['device']}, YOLO {'on' if info['yolo'] else 'off'})")
+            client.close()
+    else:
+        serve(load_yolo='--no-yolo' not in args)
+
+
+if __name__ == '__main__':
+    main()
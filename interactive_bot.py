@@ -2,10 +2,17 @@ import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
 from bot import ScreenBot
+from visualizer import VisualizationExporter
+from script_compiler import Instruction, Program, parse_command, program_cache
+from lookahead import Speculator
+from metrics import metrics
 import time
 import cv2
 import os
+import atexit
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 def print_help():
     print("""
@@ -24,13 +31,67 @@ Available commands:
   type <text>             - Type text
   press <key>             - Press a keyboard key (e.g., 'enter', 'space', 'esc')
   wait <seconds>          - Wait for specified number of seconds (e.g., 'wait 2', 'wait 1.5')
+  wait stable [x y w h] [max] - Wait until the screen (or a region) stops animating (default max: 5s)
+  waitfor text <text> [timeout] - Wait until text appears (default timeout: 10s)
+  waitfor object <class> [timeout] - Wait until an object class appears
   screenshot              - Save current screenshot
   visualize text          - Show all detected text with bounding boxes
   visualize objects       - Show all detected objects with bounding boxes
   visualize all           - Show both text and objects with bounding boxes
+  visualize format png|jpg [level] - Image format and PNG compression (0-9) / JPEG quality (0-100)
+  visualize stream text|objects|all [dir] - Save a numbered annotated frame after every script command
+  visualize stream stop   - Stop streaming and wait for pending frames
   region set <x> <y> <w> <h> - Set screen region (only detect in this area)
   region clear            - Clear region (detect on full screen)
   region show             - Show current region settings
+  capture backend <name>  - Switch screen capture backend (mss, pyautogui, auto)
+  capture stats           - Show grab latency of the current capture backend
+  capture bench [n]       - Compare grab latency of all capture backends (n grabs each)
+  capture thread start [fps] - Capture in the background and share frames between lookups
+  capture thread stop     - Stop the background capture thread
+  source live             - Read frames from the screen (default)
+  source replay <path> [fps] - Replay frames from a screenshot folder or video (inputs are simulated)
+  source show             - Show the current frame source
+  gate on|off             - Reuse OCR/YOLO results while the screen is unchanged (default: on)
+  gate threshold <value>  - Mean gray-level difference that counts as a change (default: 1.5)
+  gate stats              - Show change gate hit/miss counters
+  actions verify on|off   - Wait for the screen to react after clicks/key presses (default: on)
+  actions timeout <sec>   - Longest wait for a reaction before continuing (default: 0.7)
+  actions delay <kind> <sec> - Minimum pause after click|press|type|move actions
+  actions stats           - Show reaction counts and average reaction time
+  lookahead on|off        - Locate the next command's target during waits (default: on)
+  lookahead stats         - Show how often looked-up targets were used or discarded
+  pipeline waits on|off   - Capture the next frame while waitfor detection runs on the current one
+  pipeline watch text|objects [sec] - Print pipelined detections as they arrive (default: 10s)
+  pipeline stats          - Show frame/result counts and stage timings of the last pipeline
+  metrics                 - Show p50/p95/p99 latency of every stage (capture, OCR, YOLO, actions, waits)
+  metrics save [dir]      - Write metrics.json and metrics.prom (Prometheus text format) to dir (default: metrics)
+  metrics export [dir] [sec] - Rewrite the metrics files every sec seconds (default: 30)
+  metrics export stop     - Stop periodic export (writes the files one last time)
+  metrics reset           - Clear all recorded timings
+  ocr incremental on|off [w h] - Only re-read changed tiles of the screen (tile size w x h)
+  ocr stats               - Show incremental/parallel OCR pass counters
+  ocr parallel on|off [n] - Read large regions as tiles in n worker processes
+  ocr cache on|off        - Reuse recognized text boxes across runs (default: on)
+  ocr cache stats|save|clear - Show hit rate and time saved / write to disk / empty the cache
+  prior on|off            - Look where a text target was last seen before scanning the region
+  prior stats|clear       - Show fast path hit rate / forget last-seen locations
+  template list           - List button templates harvested from OCR hits
+  template add <text> [n] - Store the nth occurrence of text as a template
+  template remove <text>  - Delete a template
+  template clear          - Delete all templates
+  template on|off         - Try template matching before OCR (default: on)
+  template stats          - Show how often templates were accepted / validated / rejected
+  template save           - Write template use counts to disk now (also done on exit)
+  normalize <px>|off      - Rescale the region to a canonical long side before OCR
+  normalize bench [image] - Compare OCR latency/accuracy across canonical sizes
+  startup                 - Show import/model load times and which engines are loaded
+  daemon status           - Show whether inference runs in the inference daemon
+  backend torch|onnx|onnx-int8 - Run local models through PyTorch or ONNX Runtime (CPU)
+  yolo weights <file.pt>  - Use custom YOLO weights (e.g. trained on game buttons)
+  yolo size <px>          - Letterbox frames to px x px before YOLO (default: 640)
+  yolo info               - Show the loaded YOLO model and its classes
+  backend bench [image]   - Compare latency/accuracy of the inference backends
   vertical [repeat]       - Run built-in vertical sequence
   runfile <file> [repeat] - Execute commands from a custom file (e.g., 'runfile myfile.txt 5')
   exit/quit               - Exit the bot
@@ -55,406 +116,351 @@ Examples:
   > visualize all
 """)
 
-def visualize_text_detections(bot):
-    """Visualize all OCR text detections with bounding boxes"""
-    print("Scanning screen for text...")
-    # Use cropped region for detection, full screen for visualization
-    screen_img = bot.take_screenshot()
-    all_text = bot.get_all_ocr_text(screen_img)
+# Built-in vertical sequence (CLI 'vertical' command, benchmark.py)
+VERTICAL_SEQUENCE = """click text x20 2
+# IF_FAIL_THEN click text x5o 2
+click text ok 1 
+wait 3
+point text auto 1
+move +70 0
+click left
+move 0 -350
+click left
+wait 2
+click text close 1 
+wait 1
+click text cancel 1
+# STOP_ON_FAIL
+# LOOP_IF_SUCCESS 1"""
+
+# Renders, encodes and writes visualizations off the command thread
+exporter = VisualizationExporter()
+atexit.register(exporter.close)
+
+# Final write of periodically exported metrics
+atexit.register(metrics.stop_export)
+
+def capture_detections(bot, text: bool = True, objects: bool = True):
+    """
+    Capture one full-screen frame and run detection on the region view of it
     
-    if not all_text:
-        print("No text detected on screen")
-        return
+    Args:
+        bot: ScreenBot instance
+        text: Run OCR
+        objects: Run YOLO
     
-    # Get full screen for visualization
+    Returns:
+        (full_img, all_text, detections) with detections in screen coordinates
+    """
     full_img = bot.take_screenshot(full_screen=True)
-    vis_img = full_img.copy()
-    
-    # Draw region border if region is set
+    view = full_img
     if bot.screen_region is not None:
         x, y, width, height = bot.screen_region
-        cv2.rectangle(vis_img, (x, y), (x + width, y + height), (255, 255, 0), 3)
-    
-    # Draw bounding boxes and labels
-    for center_x, center_y, bbox, text, confidence in all_text:
-        # Draw bounding box polygon
-        bbox_points = np.array(bbox, dtype=np.int32)
-        cv2.polylines(vis_img, [bbox_points], True, (0, 255, 0), 2)
-        
-        # Draw center point
-        cv2.circle(vis_img, (center_x, center_y), 5, (0, 0, 255), -1)
-        
-        # Draw text label
-        label = f"{text} ({confidence:.2f})"
-        label_pos = (int(bbox[0][0]), int(bbox[0][1]) - 10)
-        cv2.putText(vis_img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-    
-    # Save visualization
-    filename = f"visualization_text_{int(time.time())}.png"
-    cv2.imwrite(filename, vis_img)
-    print(f"✓ Detected {len(all_text)} text elements")
-    print(f"✓ Visualization saved as: {filename}")
+        view = full_img[max(0, y):y + height, max(0, x):x + width]
     
-    return filename
+    all_text, detections = [], []
+    if text and objects:
+        # OCR and YOLO don't depend on each other - run YOLO alongside OCR
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(bot.find_objects_yolo, None, view, True)
+            all_text = bot.get_all_ocr_text(view)
+            detections = future.result()
+    elif text:
+        all_text = bot.get_all_ocr_text(view)
+    elif objects:
+        detections = bot.find_objects_yolo(screen_img=view, return_bbox=True)
+    return full_img, all_text, detections
 
-def visualize_object_detections(bot):
-    """Visualize all YOLO object detections with bounding boxes"""
-    print("Scanning screen for objects...")
-    # Use cropped region for detection, full screen for visualization
-    screen_img = bot.take_screenshot()
-    detections = bot.find_objects_yolo(screen_img=screen_img, return_bbox=True)
+def visualize_detections(bot, mode: str = 'all'):
+    """
+    Detect text and/or objects and save an annotated full-screen image
     
-    if not detections:
-        print("No objects detected on screen")
-        return
+    The frame is captured once; drawing and encoding happen on the exporter's worker.
     
-    # Get full screen for visualization
-    full_img = bot.take_screenshot(full_screen=True)
-    vis_img = full_img.copy()
+    Args:
+        bot: ScreenBot instance
+        mode: 'text', 'objects' or 'all'
     
-    # Draw region border if region is set
-    if bot.screen_region is not None:
-        x, y, width, height = bot.screen_region
-        cv2.rectangle(vis_img, (x, y), (x + width, y + height), (255, 255, 0), 3)
+    Returns:
+        Path of the image being written, or None if nothing was detected
+    """
+    what = {'text': "text", 'objects': "objects", 'all': "text and objects"}[mode]
+    print(f"Scanning screen for {what}...")
+    full_img, all_text, detections = capture_detections(bot, mode in ('text', 'all'), mode in ('objects', 'all'))
     
-    # Draw bounding boxes and labels
-    for center_x, center_y, class_name, confidence, (x1, y1, x2, y2) in detections:
-        # Draw bounding box rectangle
-        cv2.rectangle(vis_img, (x1, y1), (x2, y2), (255, 0, 0), 2)
-        
-        # Draw center point
-        cv2.circle(vis_img, (center_x, center_y), 5, (0, 0, 255), -1)
-        
-        # Draw label
-        label = f"{class_name} ({confidence:.2f})"
-        label_pos = (x1, y1 - 10)
-        cv2.putText(vis_img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+    if not all_text and not detections:
+        print(f"No {what} detected on screen")
+        return
     
-    # Save visualization
-    filename = f"visualization_objects_{int(time.time())}.png"
-    cv2.imwrite(filename, vis_img)
-    print(f"✓ Detected {len(detections)} objects")
+    filename = exporter.submit(full_img, bot.screen_region, all_text, detections,
+                               f"visualization_{mode}_{int(time.time())}")
+    if mode == 'text':
+        print(f"✓ Detected {len(all_text)} text elements")
+    elif mode == 'objects':
+        print(f"✓ Detected {len(detections)} objects")
+    else:
+        print(f"✓ Detected {len(all_text)} text elements and {len(detections)} objects")
     print(f"✓ Visualization saved as: {filename}")
+    if mode == 'all':
+        print(f"  - Green boxes: Text (OCR)")
+        print(f"  - Blue boxes: Objects (YOLO)")
+        print(f"  - Red dots: Click centers")
+        if bot.screen_region is not None:
+            print(f"  - Yellow border: Detection region")
     
     return filename
 
+def visualize_text_detections(bot):
+    """Visualize all OCR text detections with bounding boxes"""
+    return visualize_detections(bot, 'text')
+
+def visualize_object_detections(bot):
+    """Visualize all YOLO object detections with bounding boxes"""
+    return visualize_detections(bot, 'objects')
+
 def visualize_all_detections(bot):
     """Visualize both OCR text and YOLO objects with bounding boxes"""
-    print("Scanning screen for text and objects...")
-    # Use cropped region for detection, full screen for visualization
-    screen_img = bot.take_screenshot()
-    all_text = bot.get_all_ocr_text(screen_img)
-    detections = bot.find_objects_yolo(screen_img=screen_img, return_bbox=True)
+    return visualize_detections(bot, 'all')
+
+def stream_visualization(bot):
+    """
+    Queue the next annotated frame if a visualization stream is running
     
-    if not all_text and not detections:
-        print("No text or objects detected on screen")
+    Capture and detection run on the exporter's worker, so the script moves on to the
+    next command right away (frames are skipped while detection falls behind).
+    """
+    if not exporter.streaming:
         return
+    mode = exporter.stream_mode
     
-    # Get full screen for visualization
-    full_img = bot.take_screenshot(full_screen=True)
-    vis_img = full_img.copy()
+    def capture():
+        region = bot.screen_region
+        full_img, all_text, detections = capture_detections(bot, mode in ('text', 'all'), mode in ('objects', 'all'))
+        return full_img, region, all_text, detections
     
-    # Draw region border if region is set (yellow border)
-    if bot.screen_region is not None:
-        x, y, width, height = bot.screen_region
-        cv2.rectangle(vis_img, (x, y), (x + width, y + height), (255, 255, 0), 3)
-    
-    # Draw text bounding boxes (green)
-    for center_x, center_y, bbox, text, confidence in all_text:
-        bbox_points = np.array(bbox, dtype=np.int32)
-        cv2.polylines(vis_img, [bbox_points], True, (0, 255, 0), 2)
-        cv2.circle(vis_img, (center_x, center_y), 5, (0, 0, 255), -1)
-        label = f"{text} ({confidence:.2f})"
-        label_pos = (int(bbox[0][0]), int(bbox[0][1]) - 10)
-        cv2.putText(vis_img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-    
-    # Draw object bounding boxes (blue)
-    for center_x, center_y, class_name, confidence, (x1, y1, x2, y2) in detections:
-        cv2.rectangle(vis_img, (x1, y1), (x2, y2), (255, 0, 0), 2)
-        cv2.circle(vis_img, (center_x, center_y), 5, (0, 0, 255), -1)
-        label = f"{class_name} ({confidence:.2f})"
-        label_pos = (x1, y1 - 10)
-        cv2.putText(vis_img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-    
-    # Save visualization
-    filename = f"visualization_all_{int(time.time())}.png"
-    cv2.imwrite(filename, vis_img)
-    print(f"✓ Detected {len(all_text)} text elements and {len(detections)} objects")
-    print(f"✓ Visualization saved as: {filename}")
-    print(f"  - Green boxes: Text (OCR)")
-    print(f"  - Blue boxes: Objects (YOLO)")
-    print(f"  - Red dots: Click centers")
-    if bot.screen_region is not None:
-        print(f"  - Yellow border: Detection region")
-    
-    return filename
+    exporter.stream_capture(capture)
 
-def execute_single_command(bot, command: str, retry_count: int = 3, retry_delay: float = 1.5) -> bool:
+def _wait(bot, seconds: float) -> bool:
+    print(f"  ⏳ Waiting {seconds} seconds...")
+    with metrics.timer('sleep'):
+        time.sleep(seconds)
+    print(f"  ✓ Wait complete")
+    return True
+
+def _list_objects(bot) -> bool:
+    bot.list_available_objects()
+    return True
+
+def _click_button(bot, button: str) -> bool:
+    bot.click_current(button=button)
+    return True
+
+def _click_at(bot, x: int, y: int) -> bool:
+    bot.click(x, y)
+    return True
+
+def _type(bot, text: str) -> bool:
+    bot.type_text(text)
+    return True
+
+def _press(bot, key: str) -> bool:
+    bot.press_key(key)
+    return True
+
+def _move(bot, x_offset: int, y_offset: int) -> bool:
+    bot.move_rel(x_offset, y_offset)
+    return True
+
+# Compiled op -> handler(bot, *args) returning success
+INSTRUCTION_HANDLERS = {
+    'find_text': lambda bot, target: bot.locate_text(target) is not None,
+    'find_object': lambda bot, target: bool(bot.find_objects_yolo(target)),
+    'click_text': lambda bot, target, index: bot.find_and_click_text(target, index),
+    'click_object': lambda bot, target, index: bot.find_and_click_object(target, index),
+    'point_text': lambda bot, target, index: bot.find_and_point_text(target, index),
+    'point_object': lambda bot, target, index: bot.find_and_point_object(target, index),
+    'click_button': _click_button,
+    'click_at': _click_at,
+    'type': _type,
+    'press': _press,
+    'move': _move,
+    'list_objects': _list_objects,
+    'wait': _wait,
+    'wait_stable': lambda bot, region, max_seconds: bot.wait_until_stable(region, max_seconds),
+    'waitfor_text': lambda bot, target, timeout: bot.wait_for_text(target, timeout) is not None,
+    'waitfor_object': lambda bot, target, timeout: bot.wait_for_object(target, timeout) is not None,
+}
+
+RETRY_VERBS = {'find': 'Found', 'click': 'Clicked', 'point': 'Pointed'}
+
+# Looks up the next command's target while the script waits
+speculator = Speculator()
+
+def _use_lookahead(bot, instruction: Instruction, result) -> bool:
+    """Finish a find/click/point instruction with the target position looked up ahead of time"""
+    if instruction.op.endswith('_text'):
+        x, y = result
+    else:
+        index = instruction.args[1] if len(instruction.args) > 1 else 0
+        x, y = result[min(index, len(result) - 1)][:2]
+    print(f"  ✓ Target already located at ({x}, {y})")
+    if instruction.op.startswith('click'):
+        bot.click(x, y)
+    elif instruction.op.startswith('point'):
+        bot.move_to(x, y)
+    return True
+
+def _next_lookup(program: Program, index: int) -> Optional[Instruction]:
+    """Instruction that runs after the wait at index (skipping further waits)"""
+    index += 1
+    while index < len(program.steps) and program.steps[index].instruction.op == 'wait':
+        index += 1
+    return program.steps[index].instruction if index < len(program.steps) else None
+
+def execute_instruction(bot, instruction: Instruction, retry_count: int = 3, retry_delay: float = 1.5) -> bool:
     """
-    Execute a single command with retry logic
+    Execute a compiled instruction, retrying screen lookups that fail
     
     Args:
         bot: ScreenBot instance
-        command: Command string to execute
-        retry_count: Number of retry attempts (default: 3)
+        instruction: Instruction from script_compiler
+        retry_count: Number of attempts for find/click/point commands (default: 3)
         retry_delay: Delay between retries in seconds (default: 1.5)
     
     Returns:
-        True if command succeeded, False otherwise
+        True if the instruction succeeded, False otherwise
     """
-    parts = command.split()
-    if not parts:
+    handler = INSTRUCTION_HANDLERS.get(instruction.op)
+    if handler is None:
+        print(f"  ✗ {instruction.error or f'Unknown command: {instruction.source}'}")
         return False
     
-    cmd = parts[0].lower()
-    
-    for attempt in range(retry_count):
+    attempts = retry_count if instruction.retried else 1
+    for attempt in range(attempts):
         try:
-            if cmd == 'find' and len(parts) >= 3:
-                mode = parts[1].lower()
-                target = ' '.join(parts[2:])
-                
-                if mode == 'text':
-                    matches = bot.find_text_ocr(target)
-                    if matches:
-                        if attempt > 0:
-                            print(f"    ✓ Found on retry attempt {attempt + 1}")
-                        return True
-                
-                elif mode == 'object':
-                    detections = bot.find_objects_yolo(target)
-                    if detections:
-                        if attempt > 0:
-                            print(f"    ✓ Found on retry attempt {attempt + 1}")
-                        return True
-            
-            elif cmd == 'click':
-                if len(parts) == 2:
-                    # Click at current position
-                    button = parts[1].lower()
-                    if button in ['left', 'right']:
-                        bot.click_current(button=button)
-                        return True
-                    else:
-                        print(f"  ✗ Invalid button: {button}. Use 'left' or 'right'")
-                        return False
-                
-                elif len(parts) == 3:
-                    # Direct coordinates - no retry needed, always succeeds
-                    try:
-                        x, y = int(parts[1]), int(parts[2])
-                        bot.click(x, y)
-                        return True
-                    except ValueError:
-                        print(f"  ✗ Invalid coordinates: {parts[1]} {parts[2]}")
-                        return False
-                
-                elif len(parts) >= 3:
-                    mode = parts[1].lower()
-                    target = ' '.join(parts[2:-1]) if len(parts) > 3 else parts[2]
-                    index = int(parts[-1]) if len(parts) > 3 and parts[-1].isdigit() else 0
-                    
-                    if mode == 'text':
-                        success = bot.find_and_click_text(target, index)
-                        if success:
-                            if attempt > 0:
-                                print(f"    ✓ Clicked on retry attempt {attempt + 1}")
-                            return True
-                    
-                    elif mode == 'object':
-                        success = bot.find_and_click_object(target, index)
-                        if success:
-                            if attempt > 0:
-                                print(f"    ✓ Clicked on retry attempt {attempt + 1}")
-                            return True
-            
-            elif cmd == 'point':
-                if len(parts) >= 3:
-                    mode = parts[1].lower()
-                    target = ' '.join(parts[2:-1]) if len(parts) > 3 else parts[2]
-                    index = int(parts[-1]) if len(parts) > 3 and parts[-1].isdigit() else 0
-                    
-                    if mode == 'text':
-                        success = bot.find_and_point_text(target, index)
-                        if success:
-                            if attempt > 0:
-                                print(f"    ✓ Pointed on retry attempt {attempt + 1}")
-                            return True
-                    
-                    elif mode == 'object':
-                        success = bot.find_and_point_object(target, index)
-                        if success:
-                            if attempt > 0:
-                                print(f"    ✓ Pointed on retry attempt {attempt + 1}")
-                            return True
-            
-            elif cmd == 'type' and len(parts) >= 2:
-                text = ' '.join(parts[1:])
-                bot.type_text(text)
-                return True
-            
-            elif cmd == 'press' and len(parts) >= 2:
-                key = parts[1].lower()
-                bot.press_key(key)
-                return True
-            
-            elif cmd == 'move' and len(parts) == 3:
-                try:
-                    x_offset, y_offset = int(parts[1]), int(parts[2])
-                    bot.move_rel(x_offset, y_offset)
-                    return True
-                except ValueError:
-                    print(f"  ✗ Invalid offsets: {parts[1]} {parts[2]}")
-                    return False
-            
-            elif cmd == 'list' and len(parts) >= 2 and parts[1].lower() == 'objects':
-                bot.list_available_objects()
-                return True
-            
-            elif cmd == 'wait' and len(parts) >= 2:
-                # Wait command - doesn't need retries, just execute once
-                try:
-                    wait_time = float(parts[1])
-                    if attempt == 0:  # Only print once
-                        print(f"  ⏳ Waiting {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    if attempt == 0:
-                        print(f"  ✓ Wait complete")
-                    return True
-                except ValueError:
-                    if attempt == 0:
-                        print(f"  ✗ Invalid wait time: {parts[1]}")
-                    return False
-            
+            looked_up = speculator.take(bot, instruction) if instruction.op != 'wait' else None
+            if looked_up is not None:
+                metrics.count('lookahead_hits')
+                succeeded = _use_lookahead(bot, instruction, looked_up)
             else:
-                if attempt == 0:
-                    print(f"  ✗ Unknown command: {command}")
-                return False
-        
+                succeeded = handler(bot, *instruction.args)
+            if succeeded:
+                if attempt > 0:
+                    print(f"    ✓ {RETRY_VERBS.get(instruction.op.split('_')[0], 'Succeeded')} on retry attempt {attempt + 1}")
+                return True
         except Exception as e:
-            if attempt == retry_count - 1:
+            if attempt == attempts - 1:
                 print(f"  ✗ Error: {e}")
-            # Continue to retry on exceptions too
-    
+        
         # Retry with delay (except on last attempt)
-        if attempt < retry_count - 1:
+        if attempt < attempts - 1:
             print(f"    ⏳ Retrying in {retry_delay}s... (attempt {attempt + 2}/{retry_count})")
-            time.sleep(retry_delay)
+            speculator.start(bot, instruction)
+            metrics.count('retries')
+            with metrics.timer('retry_sleep'):
+                time.sleep(retry_delay)
     
     return False
 
-def execute_command_strings(bot, command_string: str, retry_count: int = 3, retry_delay: float = 1.5):
-    """Execute commands from a string (same format as file) with retry logic and advanced flow control"""
-    raw_lines = command_string.strip().split('\n')
+def execute_single_command(bot, command: str, retry_count: int = 3, retry_delay: float = 1.5) -> bool:
+    """
+    Execute a single command with retry logic
     
-    commands_with_directives = []
-    current_command_info = {'command': None, 'if_fail_then': None, 'loop_if_success': None, 'stop_on_fail': False}
+    Args:
+        bot: ScreenBot instance
+        command: Command string to execute
+        retry_count: Number of retry attempts (default: 3)
+        retry_delay: Delay between retries in seconds (default: 1.5)
     
-    for line_num, line in enumerate(raw_lines, 1):
-        stripped_line = line.strip()
-        
-        if not stripped_line:
-            continue
-        
-        if stripped_line.startswith('#'):
-            # This is a directive
-            directive_content = stripped_line[1:].strip()  # Remove '#' and any leading whitespace
-            if not directive_content:  # Skip if just '#'
-                continue
-            
-            directive_parts = directive_content.split(' ', 1)
-            directive_name = directive_parts[0].upper()
-            directive_value = directive_parts[1] if len(directive_parts) > 1 else None
+    Returns:
+        True if command succeeded, False otherwise
+    """
+    if not command.split():
+        return False
+    return execute_instruction(bot, parse_command(command), retry_count, retry_delay)
 
-            if current_command_info['command'] is None:
-                print(f"Warning: Directive '{stripped_line}' on line {line_num} has no preceding command. Skipping.")
-                continue
-            
-            if directive_name == 'IF_FAIL_THEN':
-                current_command_info['if_fail_then'] = directive_value
-            elif directive_name == 'LOOP_IF_SUCCESS':
-                try:
-                    current_command_info['loop_if_success'] = int(directive_value)
-                except (ValueError, TypeError):
-                    print(f"Warning: Invalid line number for LOOP_IF_SUCCESS on line {line_num}. Skipping.")
-            elif directive_name == 'STOP_ON_FAIL':
-                current_command_info['stop_on_fail'] = True
-            else:
-                print(f"Warning: Unknown directive '{directive_name}' on line {line_num}. Skipping.")
-        else:
-            # This is a command
-            if current_command_info['command'] is not None:
-                # Save the previous command and its directives
-                commands_with_directives.append(current_command_info)
-            # Start a new command info block
-            current_command_info = {'command': stripped_line, 'if_fail_then': None, 'loop_if_success': None, 'stop_on_fail': False, 'original_line': line_num}
+def execute_program(bot, program: Program, retry_count: int = 3, retry_delay: float = 1.5,
+                    max_commands: Optional[int] = None):
+    """
+    Execute a compiled script with retry logic and advanced flow control
     
-    # Add the last command if it exists
-    if current_command_info['command'] is not None:
-        commands_with_directives.append(current_command_info)
-
-    if not commands_with_directives:
+    Args:
+        max_commands: Stop after this many commands (bounds LOOP_IF_SUCCESS loops, e.g. in benchmarks)
+    """
+    if not program.steps:
         print("No commands found in the command string.")
         return False
-
+    
+    # Load exactly the engines this script needs before the first command runs
+    bot.load_engines(ocr='ocr' in program.engines, yolo='yolo' in program.engines)
+    
     current_command_idx = 0
     success_count = 0
     total_commands_attempted = 0
     
-    while current_command_idx < len(commands_with_directives):
-        cmd_info = commands_with_directives[current_command_idx]
-        command = cmd_info['command']
-        original_line = cmd_info['original_line']
+    while current_command_idx < len(program.steps):
+        if max_commands is not None and total_commands_attempted >= max_commands:
+            print(f"\nStopping after {max_commands} commands.")
+            break
+        step = program.steps[current_command_idx]
         
         total_commands_attempted += 1
-        print(f"\n[{original_line}] Executing: {command}")
+        print(f"\n[{step.line}] Executing: {step.instruction.source}")
         
-        command_succeeded = execute_single_command(bot, command, retry_count, retry_delay)
+        if step.instruction.op == 'wait' and not exporter.streaming:
+            # Locate the next command's target while waiting (not while streaming frames,
+            # whose detection already runs in the background after every command)
+            speculator.start(bot, _next_lookup(program, current_command_idx))
+        command_start = time.perf_counter()
+        command_succeeded = execute_instruction(bot, step.instruction, retry_count, retry_delay)
+        metrics.observe(f'command_{step.instruction.op}', time.perf_counter() - command_start)
+        metrics.count('commands')
+        if not command_succeeded:
+            metrics.count('command_failures')
+        stream_visualization(bot)
         
         if command_succeeded:
             success_count += 1
-            if cmd_info['loop_if_success'] is not None:
-                target_line = cmd_info['loop_if_success']
-                # Find the index of the command at the target line number
-                found_idx = -1
-                for i, info in enumerate(commands_with_directives):
-                    if info['original_line'] == target_line:
-                        found_idx = i
-                        break
-                
-                if found_idx != -1:
-                    print(f"  ✓ Command succeeded. Looping to line {target_line}. (New index: {found_idx})")
-                    current_command_idx = found_idx
+            if step.loop_line is not None:
+                if step.loop_target is not None:
+                    print(f"  ✓ Command succeeded. Looping to line {step.loop_line}. (New index: {step.loop_target})")
+                    metrics.count('script_iterations')
+                    current_command_idx = step.loop_target
                     continue # Restart the while loop from the new index
-                else:
-                    print(f"  ✗ LOOP_IF_SUCCESS target line {target_line} not found. Continuing to next command.")
-                    current_command_idx += 1
-            else:
-                current_command_idx += 1 # Move to the next command normally
+                print(f"  ✗ LOOP_IF_SUCCESS target line {step.loop_line} not found. Continuing to next command.")
+            current_command_idx += 1 # Move to the next command normally
         else:
-            print(f"  ✗ Command failed after {retry_count} attempts: {command}")
+            print(f"  ✗ Command failed after {retry_count if step.instruction.retried else 1} attempt(s): {step.instruction.source}")
             
-            if cmd_info['if_fail_then'] is not None:
-                alternative_command = cmd_info['if_fail_then']
-                print(f"  Trying alternative command: {alternative_command}")
-                alt_succeeded = execute_single_command(bot, alternative_command, retry_count, retry_delay)
-                if alt_succeeded:
+            if step.fallback is not None:
+                print(f"  Trying alternative command: {step.fallback.source}")
+                if execute_instruction(bot, step.fallback, retry_count, retry_delay):
                     print(f"  ✓ Alternative command succeeded.")
                     success_count += 1 # Count alternative command as success
                 else:
                     print(f"  ✗ Alternative command also failed.")
             
-            if cmd_info['stop_on_fail']:
+            if step.stop_on_fail:
                 print("  STOP_ON_FAIL directive encountered. Stopping preset execution.")
                 break
             
             current_command_idx += 1 # Move to the next command even if failed (unless stopped)
+    else:
+        metrics.count('script_iterations')
     
+    speculator.cancel()
     print("\n" + "-" * 50)
     print(f"Preset execution complete: {success_count}/{total_commands_attempted} commands succeeded (including alternatives).")
     return True
 
-def execute_command_file(bot, filename: str, retry_count: int = 3, retry_delay: float = 1.5):
+def execute_command_strings(bot, command_string: str, retry_count: int = 3, retry_delay: float = 1.5,
+                            max_commands: Optional[int] = None):
+    """Execute commands from a string (same format as file) with retry logic and advanced flow control"""
+    return execute_program(bot, program_cache.compile_string(command_string), retry_count, retry_delay,
+                           max_commands)
+
+def execute_command_file(bot, filename: str, retry_count: int = 3, retry_delay: float = 1.5,
+                         max_commands: Optional[int] = None):
     """Execute commands from a preset file with retry logic and advanced flow control"""
     if not os.path.exists(filename):
         print(f"Error: File '{filename}' not found")
@@ -464,16 +470,16 @@ def execute_command_file(bot, filename: str, retry_count: int = 3, retry_delay:
     print(f"Retry settings: {retry_count} attempts, {retry_delay}s delay")
     print("-" * 50)
     
-    with open(filename, 'r') as f:
-        command_string = f.read()
-    
-    return execute_command_strings(bot, command_string, retry_count, retry_delay)
+    # Compiled once; recompiled only when the file changes
+    return execute_program(bot, program_cache.compile_file(filename), retry_count, retry_delay, max_commands)
 
 def main():
     print("Screen Automation Bot - Interactive Mode")
     print("Type 'help' for commands, 'exit' to quit\n")
     
+    start = time.perf_counter()
     bot = ScreenBot()
+    print(f"Bot ready in {time.perf_counter() - start:.2f}s (models load on first use, 'startup' for details)")
     
     while True:
         try:
@@ -591,6 +597,9 @@ def main():
                 key = parts[1].lower()
                 bot.press_key(key)
             
+            elif cmd == 'wait' and len(parts) >= 2 and parts[1].lower() == 'stable':
+                execute_single_command(bot, command)
+            
             elif cmd == 'wait' and len(parts) >= 2:
                 try:
                     wait_time = float(parts[1])
@@ -600,6 +609,12 @@ def main():
                 except ValueError:
                     print(f"Invalid wait time: {parts[1]}")
             
+            elif cmd == 'waitfor':
+                if len(parts) < 3:
+                    print("Usage: waitfor <text|object> <target> [timeout]")
+                else:
+                    execute_single_command(bot, command)
+            
             elif cmd == 'screenshot':
                 img = bot.take_screenshot()
                 filename = f"screenshot_{int(time.time())}.png"
@@ -608,17 +623,33 @@ def main():
             
             elif cmd == 'visualize':
                 if len(parts) < 2:
-                    print("Usage: visualize <text|objects|all>")
+                    print("Usage: visualize <text|objects|all|format|stream>")
                 else:
                     mode = parts[1].lower()
-                    if mode == 'text':
-                        visualize_text_detections(bot)
-                    elif mode == 'objects':
-                        visualize_object_detections(bot)
-                    elif mode == 'all':
-                        visualize_all_detections(bot)
+                    if mode in ['text', 'objects', 'all']:
+                        visualize_detections(bot, mode)
+                    elif mode == 'format' and len(parts) >= 3:
+                        try:
+                            exporter.set_format(parts[2], int(parts[3]) if len(parts) >= 4 else None)
+                            print(f"Visualization format: {exporter.image_format} (level {exporter.level})")
+                        except ValueError as e:
+                            print(f"Error: {e}")
+                    elif mode == 'stream' and len(parts) >= 3:
+                        stream_mode = parts[2].lower()
+                        if stream_mode == 'stop':
+                            frames = exporter.stop_stream()
+                            exporter.flush()
+                            stats = exporter.stats()
+                            print(f"✓ Stream stopped: {frames} frame(s) in {exporter.stream_directory} "
+                                  f"(avg {stats['avg_kb']:.0f} KB, {stats['avg_encode_ms']:.0f} ms to render/encode, "
+                                  f"{stats['skipped']} skipped while detection was busy)")
+                        elif stream_mode in ['text', 'objects', 'all']:
+                            exporter.start_stream(stream_mode, parts[3] if len(parts) >= 4 else None)
+                            print(f"Streaming {stream_mode} visualizations to {exporter.stream_directory}")
+                        else:
+                            print("Usage: visualize stream <text|objects|all [dir]|stop>")
                     else:
-                        print(f"Unknown visualize mode: {mode}. Use 'text', 'objects', or 'all'")
+                        print(f"Unknown visualize mode: {mode}. Use 'text', 'objects', 'all', 'format' or 'stream'")
             
             elif cmd == 'region':
                 if len(parts) < 2:
@@ -645,6 +676,406 @@ def main():
                     else:
                         print(f"Unknown region command: {subcmd}")
             
+            elif cmd == 'capture':
+                if len(parts) < 2:
+                    print("Usage: capture <backend|stats|bench>")
+                    print("  capture backend <mss|pyautogui|auto> - Switch capture backend")
+                    print("  capture stats - Show grab latency of the current backend")
+                    print("  capture bench [n] - Compare all backends on the current region")
+                    print("  capture thread <start [fps]|stop> - Shared background capture")
+                else:
+                    subcmd = parts[1].lower()
+                    if subcmd == 'backend' and len(parts) >= 3:
+                        try:
+                            bot.set_capture_backend(parts[2].lower())
+                        except Exception as e:
+                            print(f"Error: {e}")
+                    elif subcmd == 'stats':
+                        stats = bot.capture_stats()
+                        print(f"Backend: {stats['backend']} - {stats['grabs']} grabs")
+                        print(f"  last {stats['last_ms']:.1f} ms, avg {stats['avg_ms']:.1f} ms, "
+                              f"min {stats['min_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+                    elif subcmd == 'bench':
+                        grabs = 20
+                        if len(parts) >= 3:
+                            try:
+                                grabs = int(parts[2])
+                            except ValueError:
+                                print(f"Invalid grab count: {parts[2]}. Using default (20)")
+                        print(f"Benchmarking capture backends ({grabs} grabs each)...")
+                        for stats in bot.benchmark_capture(grabs):
+                            print(f"  {stats['backend']}: avg {stats['avg_ms']:.1f} ms, "
+                                  f"min {stats['min_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+                    elif subcmd == 'thread' and len(parts) >= 3:
+                        action = parts[2].lower()
+                        if action == 'start':
+                            try:
+                                fps = float(parts[3]) if len(parts) >= 4 else 15.0
+                                bot.start_capture_thread(fps)
+                            except ValueError:
+                                print(f"Invalid fps: {parts[3]}")
+                        elif action == 'stop':
+                            bot.stop_capture_thread()
+                        else:
+                            print(f"Unknown capture thread command: {action}")
+                    else:
+                        print(f"Unknown capture command: {subcmd}")
+            
+            elif cmd == 'ocr':
+                if len(parts) < 2:
+                    print("Usage: ocr <incremental|parallel|cache|stats>")
+                else:
+                    subcmd = parts[1].lower()
+                    if subcmd == 'incremental' and len(parts) >= 3:
+                        try:
+                            tile_size = (int(parts[3]), int(parts[4])) if len(parts) >= 5 else (160, 96)
+                            bot.set_incremental_ocr(parts[2].lower() == 'on', tile_size)
+                        except ValueError:
+                            print("Error: Tile size values must be integers")
+                    elif subcmd == 'parallel' and len(parts) >= 3:
+                        try:
+                            workers = int(parts[3]) if len(parts) >= 4 else None
+                            bot.set_parallel_ocr(parts[2].lower() == 'on', workers)
+                        except ValueError:
+                            print("Error: Worker count must be an integer")
+                    elif subcmd == 'cache' and len(parts) >= 3:
+                        action = parts[2].lower()
+                        if action in ['on', 'off']:
+                            bot.set_ocr_cache(action == 'on')
+                        elif bot.ocr_cache is None:
+                            print("OCR cache is off")
+                        elif action == 'stats':
+                            stats = bot.ocr_cache.stats()
+                            print(f"  {stats['entries']}/{stats['max_entries']} entries, {stats['hits']} hits, "
+                                  f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+                            print(f"  ~{stats['time_saved']:.1f}s of recognition saved, {stats['evictions']} evictions")
+                            if bot.daemon is not None:
+                                print("  (text read through the inference daemon is cached in the daemon)")
+                        elif action == 'save':
+                            bot.ocr_cache.save()
+                            print(f"OCR cache saved to {bot.ocr_cache.path}")
+                        elif action == 'clear':
+                            bot.ocr_cache.clear()
+                            print("OCR cache cleared")
+                        else:
+                            print(f"Unknown ocr cache command: {action}")
+                    elif subcmd == 'stats':
+                        if bot.incremental_ocr is None:
+                            print("Incremental OCR is off")
+                        else:
+                            stats = bot.incremental_ocr.stats()
+                            print(f"  {stats['full_passes']} full, {stats['partial_passes']} partial, "
+                                  f"{stats['clean_passes']} unchanged passes - "
+                                  f"{stats['dirty_tile_fraction']:.0%} of tiles re-read")
+                        if bot.parallel_ocr is None:
+                            print("Parallel OCR is off")
+                        else:
+                            stats = bot.parallel_ocr.stats()
+                            print(f"  Parallel: {stats['workers']} workers, {stats['passes']} passes, "
+                                  f"{stats['tiles_per_pass']:.1f} tiles/pass, "
+                                  f"last {stats['last_ms']:.0f} ms, avg {stats['avg_ms']:.0f} ms")
+                    else:
+                        print(f"Unknown ocr command: {subcmd}")
+            
+            elif cmd == 'startup':
+                print("Startup timings:")
+                for stage, seconds in bot.startup_report().items():
+                    print(f"  {stage:<24} {seconds * 1000:8.1f} ms")
+                loaded = bot.engines_loaded()
+                print(f"Engines loaded: OCR {'yes' if loaded['ocr'] else 'no'}, YOLO {'yes' if loaded['yolo'] else 'no'}")
+            
+            elif cmd == 'yolo':
+                subcmd = parts[1].lower() if len(parts) >= 2 else 'info'
+                if subcmd == 'weights' and len(parts) >= 3:
+                    weights = ' '.join(parts[2:])
+                    if not os.path.exists(weights):
+                        print(f"Error: Weights file '{weights}' not found")
+                    else:
+                        bot.set_yolo_model(weights=weights)
+                elif subcmd == 'size' and len(parts) >= 3:
+                    try:
+                        bot.set_yolo_model(imgsz=int(parts[2]))
+                    except ValueError as e:
+                        print(f"Error: {e}")
+                elif subcmd == 'info':
+                    engine = bot.yolo_model
+                    if engine is None:
+                        print("YOLO model not available!")
+                    else:
+                        print(f"YOLO: {engine.describe() if hasattr(engine, 'describe') else 'inference daemon'}")
+                        print(f"Classes: {', '.join(engine.names[i] for i in sorted(engine.names))}")
+                else:
+                    print("Usage: yolo <weights <file.pt>|size <px>|info>")
+            
+            elif cmd == 'backend':
+                if len(parts) < 2:
+                    print(f"Current inference backend: {bot.inference_backend}")
+                    print("Usage: backend <torch|onnx|onnx-int8|bench [image]>")
+                elif parts[1].lower() == 'bench':
+                    if len(parts) >= 3:
+                        screen_img = cv2.imread(parts[2], cv2.IMREAD_COLOR)
+                        if screen_img is None:
+                            print(f"Error: Could not read image '{parts[2]}'")
+                            continue
+                    else:
+                        screen_img = bot.take_screenshot()
+                    from onnx_backend import compare_backends
+                    print("Benchmarking inference backends on CPU (first run exports ONNX models)...")
+                    try:
+                        for row in compare_backends(screen_img, conf=bot.confidence_threshold):
+                            line = f"  {row['backend']:<10} OCR {row['ocr_ms']:7.1f} ms ({row['ocr_accuracy']:.0%} agree)"
+                            if 'yolo_ms' in row:
+                                line += f", YOLO {row['yolo_ms']:6.1f} ms ({row['yolo_accuracy']:.0%} agree)"
+                            print(line)
+                    except Exception as e:
+                        print(f"Error: {e}")
+                else:
+                    try:
+                        bot.set_inference_backend(parts[1].lower())
+                    except ValueError as e:
+                        print(f"Error: {e}")
+            
+            elif cmd == 'daemon':
+                if bot.daemon is None:
+                    print("Not using the inference daemon (start it with 'python inference_daemon.py')")
+                else:
+                    info = bot.daemon.info
+                    print(f"Using inference daemon (pid {info['pid']}, {info['device']}, "
+                          f"YOLO {'on' if info['yolo'] else 'off'})")
+            
+            elif cmd == 'normalize':
+                if len(parts) < 2:
+                    print("Usage: normalize <long_side|off|bench [image]>")
+                elif parts[1].lower() == 'off':
+                    bot.set_canonical_size(None)
+                elif parts[1].lower() == 'bench':
+                    screen_img = None
+                    if len(parts) >= 3:
+                        screen_img = cv2.imread(parts[2], cv2.IMREAD_COLOR)
+                        if screen_img is None:
+                            print(f"Error: Could not read image '{parts[2]}'")
+                            continue
+                    print("Benchmarking canonical sizes (OCR, caches bypassed)...")
+                    for row in bot.benchmark_normalization(screen_img):
+                        print(f"  long side {row['long_side']:>5}px (x{row['scale']:.2f}): "
+                              f"{row['median_ms']:7.1f} ms, {row['texts']} texts, {row['accuracy']:.0%} of native found")
+                else:
+                    try:
+                        bot.set_canonical_size(int(parts[1]))
+                    except ValueError as e:
+                        print(f"Invalid size '{parts[1]}': {e}")
+            
+            elif cmd == 'template':
+                if len(parts) < 2:
+                    print("Usage: template <list|add|remove|clear|on|off|stats|save>")
+                else:
+                    subcmd = parts[1].lower()
+                    if subcmd == 'list':
+                        names = bot.templates.names()
+                        if not names:
+                            print("No templates stored")
+                        for name in names:
+                            info = bot.templates.info(name)
+                            print(f"  {name}: {info['size'][0]}x{info['size'][1]}, used {info.get('uses', 0)} times")
+                    elif subcmd == 'add' and len(parts) >= 3:
+                        target = ' '.join(parts[2:-1]) if len(parts) > 3 and parts[-1].isdigit() else ' '.join(parts[2:])
+                        index = int(parts[-1]) if len(parts) > 3 and parts[-1].isdigit() else 0
+                        bot.add_template(target, index)
+                    elif subcmd == 'remove' and len(parts) >= 3:
+                        target = ' '.join(parts[2:])
+                        if bot.templates.remove(target):
+                            print(f"Template '{target}' removed")
+                        else:
+                            print(f"No template for '{target}'")
+                    elif subcmd == 'clear':
+                        bot.templates.clear()
+                        print("All templates removed")
+                    elif subcmd in ['on', 'off']:
+                        bot.use_templates = subcmd == 'on'
+                        print(f"Template matching {'enabled' if bot.use_templates else 'disabled'}")
+                    elif subcmd == 'save':
+                        bot.templates.save()
+                        print(f"Templates saved to {bot.templates.directory}")
+                    elif subcmd == 'stats':
+                        stats = bot.templates.stats()
+                        print(f"  {stats['templates']} templates - {stats['accepted']} accepted, "
+                              f"{stats['validated']} validated by OCR, {stats['rejected']} rejected")
+                    else:
+                        print(f"Unknown template command: {subcmd}")
+            
+            elif cmd == 'prior':
+                if len(parts) < 2:
+                    print("Usage: prior <on|off|stats|clear>")
+                else:
+                    subcmd = parts[1].lower()
+                    if subcmd in ['on', 'off']:
+                        bot.use_location_priors = subcmd == 'on'
+                        print(f"Last-seen location search {'enabled' if bot.use_location_priors else 'disabled'}")
+                    elif subcmd == 'stats':
+                        stats = bot.location_prior_stats()
+                        print(f"  {stats['targets']} targets remembered, fast path hit {stats['hits']} times, "
+                              f"missed {stats['misses']} times ({stats['hit_rate']:.0%} hit rate)")
+                    elif subcmd == 'clear':
+                        bot.clear_location_priors()
+                    else:
+                        print(f"Unknown prior command: {subcmd}")
+            
+            elif cmd == 'gate':
+                if len(parts) < 2:
+                    print("Usage: gate <on|off|threshold|stats>")
+                else:
+                    subcmd = parts[1].lower()
+                    if subcmd in ['on', 'off']:
+                        bot.set_change_gating(subcmd == 'on')
+                    elif subcmd == 'threshold' and len(parts) >= 3:
+                        try:
+                            bot.set_change_threshold(float(parts[2]))
+                        except ValueError:
+                            print(f"Invalid threshold: {parts[2]}")
+                    elif subcmd == 'stats':
+                        for engine, stats in bot.change_gate_stats().items():
+                            print(f"  {engine}: {stats['hits']} reused, {stats['misses']} detected "
+                                  f"({stats['hit_rate']:.0%} hit rate, threshold {stats['threshold']}, "
+                                  f"{'on' if stats['enabled'] else 'off'})")
+                    else:
+                        print(f"Unknown gate command: {subcmd}")
+            
+            elif cmd == 'actions':
+                if len(parts) < 2:
+                    print("Usage: actions <verify|timeout|delay|stats>")
+                else:
+                    subcmd = parts[1].lower()
+                    if subcmd == 'verify' and len(parts) >= 3 and parts[2].lower() in ['on', 'off']:
+                        bot.verify_actions = parts[2].lower() == 'on'
+                        print(f"Reaction check after actions {'enabled' if bot.verify_actions else 'disabled'}")
+                    elif subcmd == 'timeout' and len(parts) >= 3:
+                        try:
+                            bot.reaction_timeout = max(0.0, float(parts[2]))
+                            print(f"Reaction timeout set to {bot.reaction_timeout:g}s")
+                        except ValueError:
+                            print(f"Invalid timeout: {parts[2]}")
+                    elif subcmd == 'delay' and len(parts) >= 4 and parts[2].lower() in bot.action_delays:
+                        try:
+                            bot.action_delays[parts[2].lower()] = max(0.0, float(parts[3]))
+                            print(f"Minimum delay after {parts[2].lower()} set to {float(parts[3]):g}s")
+                        except ValueError:
+                            print(f"Invalid delay: {parts[3]}")
+                    elif subcmd == 'stats':
+                        stats = bot.action_stats()
+                        print(f"  {stats['verified']} actions checked: {stats['reacted']} reacted "
+                              f"(avg {stats['avg_reaction_ms']:.0f}ms), {stats['timeouts']} timed out "
+                              f"(verify {'on' if stats['verify'] else 'off'}, timeout {stats['timeout']:g}s)")
+                        print("  Minimum delays: " + ", ".join(f"{k} {v:g}s" for k, v in bot.action_delays.items()))
+                    else:
+                        print(f"Unknown actions command: {subcmd}")
+            
+            elif cmd == 'lookahead':
+                subcmd = parts[1].lower() if len(parts) >= 2 else 'stats'
+                if subcmd in ['on', 'off']:
+                    speculator.enabled = subcmd == 'on'
+                    print(f"Lookahead during waits {'enabled' if speculator.enabled else 'disabled'}")
+                elif subcmd == 'stats':
+                    stats = speculator.stats()
+                    print(f"  {stats['started']} lookups started, {stats['hits']} used, {stats['stale']} discarded "
+                          f"(screen changed), {stats['misses']} not found ahead ({stats['hit_rate']:.0%} used, "
+                          f"{stats['saved_s']:.1f}s of detection saved)")
+                else:
+                    print(f"Unknown lookahead command: {subcmd}")
+            
+            elif cmd == 'pipeline':
+                subcmd = parts[1].lower() if len(parts) >= 2 else 'stats'
+                if subcmd == 'waits' and len(parts) >= 3 and parts[2].lower() in ['on', 'off']:
+                    bot.pipelined_waits = parts[2].lower() == 'on'
+                    print(f"Pipelined waitfor {'enabled' if bot.pipelined_waits else 'disabled'}")
+                elif subcmd == 'watch' and len(parts) >= 3 and parts[2].lower() in ['text', 'objects']:
+                    try:
+                        seconds = float(parts[3]) if len(parts) >= 4 else 10.0
+                    except ValueError:
+                        seconds = 10.0
+                    print(f"Watching {parts[2].lower()} for {seconds:g}s (Ctrl+C to stop)...")
+                    end = time.perf_counter() + seconds
+                    try:
+                        with bot.detection_stream(parts[2].lower()) as stream:
+                            while time.perf_counter() < end:
+                                detection = stream.next(timeout=max(0.0, end - time.perf_counter()))
+                                if detection is None:
+                                    continue
+                                labels = [item[3] if parts[2].lower() == 'text' else item[2] for item in detection.result]
+                                print(f"  #{detection.seq} ({detection.infer_ms:.0f}ms, {detection.age * 1000:.0f}ms old): "
+                                      f"{', '.join(map(str, labels)) or '-'}")
+                    except KeyboardInterrupt:
+                        pass
+                elif subcmd == 'stats':
+                    if bot.last_pipeline is None:
+                        print("  No pipeline has run yet")
+                    else:
+                        stats = bot.last_pipeline.stats()
+                        print(f"  {stats['captured']} frames captured ({stats['skipped']} skipped unchanged, "
+                              f"{stats['frames_dropped']} dropped), {stats['detected']} detections "
+                              f"({stats['results_dropped']} dropped), {stats['errors']} errors")
+                        print(f"  avg capture {stats['avg_capture_ms']:.1f}ms, avg inference {stats['avg_infer_ms']:.1f}ms")
+                else:
+                    print(f"Unknown pipeline command: {subcmd}")
+            
+            elif cmd == 'metrics':
+                subcmd = parts[1].lower() if len(parts) >= 2 else 'show'
+                if subcmd == 'show':
+                    snapshot = metrics.snapshot()
+                    if not snapshot['stages']:
+                        print("  No timings recorded yet")
+                    for stage, summary in snapshot['stages'].items():
+                        print(f"  {stage:<22} n={summary['count']:<6} mean {summary['mean_ms']:8.1f}ms  "
+                              f"p50 {summary['p50_ms']:8.1f}ms  p95 {summary['p95_ms']:8.1f}ms  "
+                              f"p99 {summary['p99_ms']:8.1f}ms  total {summary['total_s']:.1f}s")
+                    for event, value in snapshot['counters'].items():
+                        print(f"  {event}: {value}")
+                elif subcmd == 'save':
+                    paths = metrics.write(parts[2] if len(parts) >= 3 else 'metrics')
+                    print(f"✓ Metrics written to {', '.join(paths)}")
+                elif subcmd == 'export' and len(parts) >= 3 and parts[2].lower() == 'stop':
+                    if metrics.exporting:
+                        metrics.stop_export()
+                        print(f"✓ Periodic metrics export stopped ({metrics.exports} writes)")
+                    else:
+                        print("Metrics export is not running")
+                elif subcmd == 'export':
+                    directory = parts[2] if len(parts) >= 3 else 'metrics'
+                    try:
+                        interval = float(parts[3]) if len(parts) >= 4 else 30.0
+                        if not interval > 0:  # Also rejects nan
+                            raise ValueError("interval must be positive")
+                    except ValueError:
+                        print(f"Invalid interval: {parts[3]} (seconds, greater than 0)")
+                        continue
+                    metrics.start_export(directory, interval)
+                    print(f"✓ Writing metrics to {directory}/ every {interval:g}s")
+                elif subcmd == 'reset':
+                    metrics.reset()
+                    print("Metrics cleared")
+                else:
+                    print(f"Unknown metrics command: {subcmd}")
+            
+            elif cmd == 'source':
+                if len(parts) < 2:
+                    print("Usage: source <live|replay|show>")
+                    print("  source live - Read frames from the screen")
+                    print("  source replay <path> [fps] - Replay a screenshot folder or video file")
+                    print("  source show - Show the current frame source")
+                else:
+                    subcmd = parts[1].lower()
+                    try:
+                        if subcmd == 'live':
+                            bot.use_live_source()
+                        elif subcmd == 'replay' and len(parts) >= 3:
+                            fps = float(parts[3]) if len(parts) >= 4 else None
+                            bot.use_replay_source(parts[2], fps=fps)
+                        elif subcmd == 'show':
+                            print(f"Frame source: {bot.frame_source.describe()}")
+                        else:
+                            print(f"Unknown source command: {subcmd}")
+                    except Exception as e:
+                        print(f"Error: {e}")
+            
             elif cmd == 'vertical':
                 repeat_count = 1
                 if len(parts) >= 2:
@@ -661,29 +1092,12 @@ def main():
                 print("Retry settings: 3 attempts, 1.5s delay")
                 print("-" * 50)
                 
-                # Built-in vertical sequence
-                vertical_commands = """click text x20 2
-# IF_FAIL_THEN click text x5o 2
-click text ok 1 
-wait 3
-point text auto 1
-move +70 0
-click left
-move 0 -350
-click left
-wait 2
-click text close 1 
-wait 1
-click text cancel 1
-# STOP_ON_FAIL
-# LOOP_IF_SUCCESS 1"""
-                
                 for iteration in range(repeat_count):
                     if repeat_count > 1:
                         print(f"\n{'='*50}")
                         print(f"ITERATION {iteration + 1} of {repeat_count}")
                         print(f"{'='*50}\n")
-                    execute_command_strings(bot, vertical_commands)
+                    execute_command_strings(bot, VERTICAL_SEQUENCE)
                     if iteration < repeat_count - 1:
                         print(f"\n⏳ Waiting 1 second before next iteration...\n")
                         time.sleep(1)
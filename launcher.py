@@ -9,7 +9,9 @@ def print_menu():
     print("="*40)
     print("1. GUI Mode (Graphical Interface)")
     print("2. CLI Mode (Command Line Interface)")
-    print("3. Exit")
+    print("3. Start Inference Daemon (keeps models loaded between runs)")
+    print("4. Stop Inference Daemon")
+    print("5. Exit")
     print("="*40)
 
 def main():
@@ -17,7 +19,7 @@ def main():
     while True:
         print_menu()
         try:
-            choice = input("Select an option (1-3): ").strip()
+            choice = input("Select an option (1-5): ").strip()
 
             if choice == "1":
                 print("\nLaunching GUI Mode...")
@@ -44,11 +46,25 @@ def main():
                 break  # Exit after CLI finishes
 
             elif choice == "3":
+                print("\nStarting inference daemon in the background...")
+                # Detached so it keeps running after the launcher exits
+                kwargs = {}
+                if sys.platform == 'win32':
+                    kwargs['creationflags'] = subprocess.CREATE_NEW_CONSOLE
+                else:
+                    kwargs['start_new_session'] = True
+                subprocess.Popen([sys.executable, "inference_daemon.py"], **kwargs)
+                print("✓ Daemon starting - GUI and CLI will use it once its models are loaded")
+
+            elif choice == "4":
+                subprocess.run([sys.executable, "inference_daemon.py", "--stop"])
+
+            elif choice == "5":
                 print("\nGoodbye!")
                 sys.exit(0)
 
             else:
-                print("\n❌ Invalid choice. Please select 1, 2, or 3.")
+                print("\n❌ Invalid choice. Please select 1-5.")
 
         except KeyboardInterrupt:
             print("\n\n⚠️  Interrupted by user. Goodbye!")
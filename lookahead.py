@@ -0,0 +1,134 @@
+"""
+Speculative detection of the next command's target during idle time
+
+While a script sits in a `wait` (or between retries), a background thread runs
+the next find/click/point lookup on the latest frames, re-running it whenever
+the screen visibly changes. When the command starts, the result is only used
+if a fresh frame still matches the frame it was detected on.
+"""
+import threading
+import time
+from typing import Optional
+
+from script_compiler import Instruction
+
+# Ops whose lookup can run ahead of time
+SPECULATED_OPS = {'find_text', 'click_text', 'point_text', 'find_object', 'click_object', 'point_object'}
+
+
+def _lookup(bot, instruction: Instruction, screen_img):
+    """
+    Run the screen lookup of an instruction on a frame (no input is sent)
+
+    Last-seen locations and templates are left alone: the frame may be mid-fade and
+    the result may still be discarded by take().
+    """
+    target = instruction.args[0]
+    if instruction.op.endswith('_text'):
+        index = instruction.args[1] if len(instruction.args) > 1 else 0
+        return bot.locate_text(target, index, screen_img, learn=False)
+    return bot.find_objects_yolo(target, screen_img) or None
+
+
+class Speculator:
+    """Background lookup of one upcoming instruction, validated against a fresh frame before use"""
+
+    def __init__(self):
+        self.enabled = True
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._instruction: Optional[Instruction] = None
+        self._result = None  # (signature, region, result, seconds) of the latest lookup
+        self.started = 0
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self.saved_time = 0.0
+
+    def start(self, bot, instruction: Optional[Instruction]):
+        """
+        Start looking up instruction's target in the background (no-op for other ops)
+
+        Args:
+            bot: ScreenBot instance
+            instruction: The instruction that will run next
+        """
+        if not self.enabled or instruction is None or instruction.op not in SPECULATED_OPS:
+            return
+        if self._instruction is instruction and self._thread is not None:
+            return  # Already looking (e.g. several waits in a row)
+        self.cancel()
+        self._instruction = instruction
+        self._result = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(bot, instruction), daemon=True)
+        self._thread.start()
+        self.started += 1
+
+    def _run(self, bot, instruction: Instruction):
+        last_sig = None
+        while not self._stop.is_set():
+            region = bot.screen_region
+            with bot.borrow_frame(max_age=bot.wait_poll_interval) as screen_img:
+                sig = bot.change_detector.signature(screen_img)
+                # Only look again once the screen visibly changed (e.g. a fade finished)
+                if bot.change_detector.changed(last_sig, sig):
+                    last_sig = sig
+                    start = time.perf_counter()
+                    try:
+                        result = _lookup(bot, instruction, screen_img)
+                    except Exception as e:
+                        print(f"    (lookahead failed: {e})")
+                        return
+                    self._result = (sig, region, result, time.perf_counter() - start)
+            self._stop.wait(bot.wait_poll_interval)
+
+    def cancel(self):
+        """Stop the background lookup, letting a detection in progress finish"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def take(self, bot, instruction: Instruction):
+        """
+        Result looked up ahead for instruction, if it is still valid
+
+        Any other background lookup is stopped, so it never runs alongside the instruction.
+
+        Returns:
+            The lookup result (screen position for text, detections for objects), or None
+            when nothing was looked up, the target wasn't found, or the screen has changed
+        """
+        self.cancel()
+        if self._instruction is not instruction:
+            self._instruction = None
+            return None
+        self._instruction = None
+        stored, self._result = self._result, None
+        if stored is None or not stored[2]:
+            self.misses += 1
+            return None
+
+        sig, region, result, elapsed = stored
+        with bot.borrow_frame(max_age=bot.wait_poll_interval) as screen_img:
+            current = bot.change_detector.signature(screen_img)
+        if region != bot.screen_region or bot.change_detector.changed(sig, current):
+            self.stale += 1
+            print("    (lookahead result discarded - screen changed)")
+            return None
+        self.hits += 1
+        self.saved_time += elapsed
+        return result
+
+    def stats(self) -> dict:
+        used = self.hits + self.stale + self.misses
+        return {
+            'enabled': self.enabled,
+            'started': self.started,
+            'hits': self.hits,
+            'stale': self.stale,
+            'misses': self.misses,
+            'hit_rate': self.hits / used if used else 0.0,
+            'saved_s': self.saved_time,
+        }
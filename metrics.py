@@ -0,0 +1,207 @@
+"""
+Per-stage latency metrics
+
+Every instrumented stage (capture, OCR, YOLO, input actions, sleeps, ...) feeds a
+histogram with fixed exponential buckets, so recording is O(1) and memory does
+not grow during long runs. Snapshots report count / mean / p50 / p95 / p99 per
+stage and can be written as JSON and as a Prometheus text-format file, once or
+periodically from a background thread.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Bucket upper bounds in seconds: 0.1 ms ... ~100 s, growing by 1.2x (percentiles within ~10%)
+BUCKET_BOUNDS: List[float] = [0.0001 * 1.2 ** i for i in range(77)]
+PROMETHEUS_PREFIX = 'story_skipper'
+
+
+class Histogram:
+    """Latency histogram with fixed exponential buckets"""
+
+    def __init__(self, bounds: List[float] = BUCKET_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket = above the largest bound
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100), interpolated inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(value, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'total_s': self.total,
+            'mean_ms': self.total * 1000 / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p95_ms': self.percentile(95) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+
+class MetricsRegistry:
+    """Named stage histograms and event counters, shared by the bot and the executor"""
+
+    def __init__(self):
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self.started = time.time()
+        self._export_thread: Optional[threading.Thread] = None
+        self._export_stop = threading.Event()
+        self.export_directory: Optional[str] = None
+        self.export_interval = 0.0
+        self.exports = 0
+
+    def observe(self, stage: str, seconds: float):
+        """Record one duration of a stage"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time the with block as one observation of stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count(self, name: str, amount: int = 1):
+        """Increment an event counter (retries, failures, ...)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """Summaries of all stages and counters"""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime_s': time.time() - self.started,
+                'stages': {stage: h.summary() for stage, h in sorted(self._histograms.items())},
+                'counters': dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (histogram per stage plus counters)"""
+        name = f"{PROMETHEUS_PREFIX}_stage_duration_seconds"
+        lines = [f"# HELP {name} Time spent per pipeline stage",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            counters = sorted(self._counters.items())
+        name = f"{PROMETHEUS_PREFIX}_events_total"
+        lines += [f"# HELP {name} Counted events (retries, failures, ...)",
+                  f"# TYPE {name} counter"]
+        lines += [f'{name}{{event="{event}"}} {value}' for event, value in counters]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory: str = 'metrics') -> List[str]:
+        """
+        Write metrics.json and metrics.prom (replaced atomically, so readers never see a partial file)
+
+        Returns:
+            Paths written
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for filename, content in (('metrics.json', self.to_json()), ('metrics.prom', self.to_prometheus())):
+            path = os.path.join(directory, filename)
+            with open(path + '.tmp', 'w') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+            paths.append(path)
+        self.exports += 1
+        return paths
+
+    def start_export(self, directory: str = 'metrics', interval: float = 30.0):
+        """
+        Write the metrics files every interval seconds until stop_export()
+
+        Args:
+            directory: Output folder
+            interval: Seconds between writes (must be positive)
+        """
+        if not interval > 0:
+            raise ValueError("Metrics export interval must be positive")
+        self.stop_export()
+        self.export_directory = directory
+        self.export_interval = interval
+        self._export_stop.clear()
+
+        def run():
+            while not self._export_stop.wait(interval):
+                try:
+                    self.write(directory)
+                except OSError as e:
+                    print(f"✗ Could not write metrics: {e}")
+
+        self._export_thread = threading.Thread(target=run, daemon=True, name="MetricsExport")
+        self._export_thread.start()
+
+    def stop_export(self):
+        """Stop periodic export, writing the files one last time"""
+        if self._export_thread is None:
+            return
+        self._export_stop.set()
+        self._export_thread.join()
+        self._export_thread = None
+        self.write(self.export_directory)
+
+    @property
+    def exporting(self) -> bool:
+        return self._export_thread is not None
+
+
+# Shared by the bot, the CLI and the GUI
+metrics = MetricsRegistry()
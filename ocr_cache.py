@@ -0,0 +1,218 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ocr_cache.json')
+
+
+def reformat_input(image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (image, grayscale) pair as easyocr.utils.reformat_input builds it for arrays
+
+    Done here so callers don't have to import easyocr (and with it torch) just to
+    prepare the input, e.g. when the reader is a daemon proxy.
+    """
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), image
+    if image.shape[2] == 1:
+        grey = np.squeeze(image, axis=2)
+        return cv2.cvtColor(grey, cv2.COLOR_GRAY2BGR), grey
+    if image.shape[2] == 4:
+        image = image[:, :, :3]
+    return image, cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+class OCRResultCache:
+    """
+    Content-addressed cache of OCR recognition results
+
+    Keys are hashes of the cropped text-box pixels, values are (text, confidence).
+    Entries are evicted least-recently-used once max_entries is exceeded, and the
+    cache is persisted to a JSON file so it survives restarts.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH, max_entries: int = 20000,
+                 save_every: int = 200):
+        """
+        Args:
+            path: JSON file to load from / save to (None = memory only)
+            max_entries: Maximum number of cached text boxes
+            save_every: Save automatically after this many new entries
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.recognition_time = 0.0  # Time spent recognizing cache misses
+        self.load()
+
+    @staticmethod
+    def key(crop: np.ndarray) -> str:
+        """Hash of a cropped text box (shape is part of the key)"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(crop.shape).encode())
+        digest.update(np.ascontiguousarray(crop).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, text: str, confidence: float):
+        with self._lock:
+            self._entries[key] = (text, float(confidence))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._unsaved += 1
+            self._dirty = True
+            should_save = self.save_every and self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    def record_recognition_time(self, seconds: float):
+        with self._lock:
+            self.recognition_time += seconds
+
+    def readtext(self, reader, image: np.ndarray,
+                 observe: Optional[Callable[[str, float], None]] = None) -> List[Tuple]:
+        """
+        readtext() that only recognizes text boxes whose pixels are not cached yet
+
+        Args:
+            reader: easyocr.Reader (or anything with its detect / recognize methods)
+            image: Image as passed to readtext
+            observe: Optional observe(stage, seconds) callback for 'ocr_detect' / 'ocr_recognize'
+
+        Returns:
+            EasyOCR results [(bbox, text, confidence)]
+        """
+        img, img_cv_grey = reformat_input(image)
+        start = time.perf_counter()
+        horizontal_list, free_list = reader.detect(img)
+        if observe is not None:
+            observe('ocr_detect', time.perf_counter() - start)
+        horizontal_list, free_list = horizontal_list[0], free_list[0]
+        max_y, max_x = img_cv_grey.shape
+
+        results = [None] * (len(horizontal_list) + len(free_list))
+        miss_horizontal, miss_free, miss_slots = [], [], []
+
+        for slot, box in enumerate(horizontal_list):
+            x_min, x_max = max(0, int(box[0])), min(int(box[1]), max_x)
+            y_min, y_max = max(0, int(box[2])), min(int(box[3]), max_y)
+            key = self.key(img_cv_grey[y_min:y_max, x_min:x_max])
+            cached = self.get(key)
+            if cached is not None:
+                bbox = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+                results[slot] = (bbox, cached[0], cached[1])
+            else:
+                miss_horizontal.append(box)
+                miss_slots.append((slot, key))
+
+        miss_free_slots = []
+        for offset, poly in enumerate(free_list):
+            slot = len(horizontal_list) + offset
+            xs = [p[0] for p in poly]
+            ys = [p[1] for p in poly]
+            x_min, x_max = max(0, int(min(xs))), min(int(max(xs)) + 1, max_x)
+            y_min, y_max = max(0, int(min(ys))), min(int(max(ys)) + 1, max_y)
+            key = self.key(img_cv_grey[y_min:y_max, x_min:x_max])
+            cached = self.get(key)
+            if cached is not None:
+                results[slot] = (poly, cached[0], cached[1])
+            else:
+                miss_free.append(poly)
+                miss_free_slots.append((slot, key))
+        miss_slots.extend(miss_free_slots)  # recognize() returns horizontal boxes first, then free ones
+
+        if miss_slots:
+            start = time.perf_counter()
+            fresh = reader.recognize(img_cv_grey, horizontal_list=miss_horizontal, free_list=miss_free)
+            elapsed = time.perf_counter() - start
+            self.record_recognition_time(elapsed)
+            if observe is not None:
+                observe('ocr_recognize', elapsed)
+
+            if len(fresh) != len(miss_slots):
+                # Unexpected result layout - don't cache anything we can't attribute to a box
+                return [r for r in results if r is not None] + list(fresh)
+            for (slot, key), result in zip(miss_slots, fresh):
+                results[slot] = result
+                self.put(key, result[1], result[2])
+
+        return [r for r in results if r is not None]
+
+    def load(self):
+        """Load entries from disk (missing or corrupt files start an empty cache)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                for key, (text, confidence) in data.get('entries', {}).items():
+                    self._entries[key] = (text, float(confidence))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        except Exception as e:
+            print(f"Warning: Could not load OCR cache '{self.path}': {e}")
+
+    def save(self):
+        """Write entries to disk if they changed (oldest first, so LRU order survives a restart)"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return  # Don't overwrite entries another process (e.g. the daemon) saved meanwhile
+            data = {'version': 1, 'entries': dict(self._entries)}
+            self._unsaved = 0
+            self._dirty = False
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Warning: Could not save OCR cache '{self.path}': {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._unsaved = 0
+            self._dirty = True
+        self.save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_recognition = self.recognition_time / self.misses if self.misses else 0.0
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'time_saved': self.hits * avg_recognition,
+            }
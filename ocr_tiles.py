@@ -0,0 +1,208 @@
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+Rect = Tuple[int, int, int, int]  # (x1, y1, x2, y2), exclusive end
+
+
+def split_tiles(width: int, height: int, tile_w: int, tile_h: int) -> List[Rect]:
+    """Split an image into a grid of tiles (edge tiles may be smaller)"""
+    tiles = []
+    for y in range(0, height, tile_h):
+        for x in range(0, width, tile_w):
+            tiles.append((x, y, min(x + tile_w, width), min(y + tile_h, height)))
+    return tiles
+
+
+def split_overlapping_tiles(width: int, height: int, tile_w: int, tile_h: int, overlap: int) -> List[Rect]:
+    """Split an image into tiles that overlap their neighbours by `overlap` pixels"""
+    step_x = max(1, tile_w - overlap)
+    step_y = max(1, tile_h - overlap)
+    xs = list(range(0, max(width - overlap, 1), step_x))
+    ys = list(range(0, max(height - overlap, 1), step_y))
+    return [(x, y, min(x + tile_w, width), min(y + tile_h, height)) for y in ys for x in xs]
+
+
+def bbox_rect(bbox) -> Rect:
+    """Axis-aligned rectangle around an EasyOCR 4-point box"""
+    xs = [p[0] for p in bbox]
+    ys = [p[1] for p in bbox]
+    return (int(min(xs)), int(min(ys)), int(max(xs)) + 1, int(max(ys)) + 1)
+
+
+def rects_intersect(a: Rect, b: Rect) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def rect_union(a: Rect, b: Rect) -> Rect:
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def rect_iou(a: Rect, b: Rect) -> float:
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+def merge_rects(rects: List[Rect]) -> List[Rect]:
+    """Merge intersecting rectangles until none overlap"""
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        while rects:
+            current = rects.pop()
+            i = 0
+            while i < len(rects):
+                if rects_intersect(current, rects[i]):
+                    current = rect_union(current, rects.pop(i))
+                    merged = True
+                else:
+                    i += 1
+            result.append(current)
+        rects = result
+    return rects
+
+
+def offset_results(results: List[Tuple], dx: int, dy: int) -> List[Tuple]:
+    """Shift EasyOCR results from crop coordinates to full image coordinates"""
+    return [([[p[0] + dx, p[1] + dy] for p in bbox], text, confidence)
+            for bbox, text, confidence in results]
+
+
+class IncrementalOCR:
+    """
+    Dirty-tile OCR: only re-read the parts of the region that changed
+
+    The region is split into tiles and each tile is compared with the previous
+    frame. Changed tiles are grouped into rectangles, padded, and grown to fully
+    contain any cached text box they touch (so boxes crossing tile borders are
+    re-read whole). Recognition runs only on those rectangles; cached results
+    for clean areas are kept.
+    """
+
+    def __init__(self, read_fn: Callable[[np.ndarray], List[Tuple]], tile_size: Tuple[int, int] = (160, 96),
+                 overlap: int = 12, pixel_threshold: int = 24, min_changed_pixels: int = 12,
+                 max_dirty_fraction: float = 0.6):
+        """
+        Args:
+            read_fn: OCR function taking an RGB image and returning EasyOCR-style results
+            tile_size: (width, height) of a tile
+            overlap: Padding added around dirty areas before re-reading them
+            pixel_threshold: Gray-level difference for a pixel to count as changed
+            min_changed_pixels: Changed pixels needed for a tile to be dirty
+            max_dirty_fraction: Re-read the whole region when more than this fraction of tiles is dirty
+        """
+        self.read_fn = read_fn
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_dirty_fraction = max_dirty_fraction
+        self.full_passes = 0
+        self.partial_passes = 0
+        self.clean_passes = 0
+        self.tiles_total = 0
+        self.tiles_dirty = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame (next read is a full pass)"""
+        self._key = None
+        self._prev_gray: Optional[np.ndarray] = None
+        self._results: List[Tuple] = []
+
+    def _dirty_tiles(self, gray: np.ndarray) -> Tuple[List[Rect], int]:
+        diff = cv2.absdiff(gray, self._prev_gray)
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 1, cv2.THRESH_BINARY)
+        height, width = gray.shape
+        tiles = split_tiles(width, height, *self.tile_size)
+        dirty = [t for t in tiles if cv2.countNonZero(mask[t[1]:t[3], t[0]:t[2]]) >= self.min_changed_pixels]
+        self.tiles_total += len(tiles)
+        self.tiles_dirty += len(dirty)
+        return dirty, len(tiles)
+
+    def _dirty_rects(self, dirty: List[Rect], width: int, height: int) -> List[Rect]:
+        pad = self.overlap
+        rects = [(max(0, x1 - pad), max(0, y1 - pad), min(width, x2 + pad), min(height, y2 + pad))
+                 for x1, y1, x2, y2 in dirty]
+        rects = merge_rects(rects)
+
+        # Grow rectangles until they fully contain every cached box they touch
+        cached_rects = [bbox_rect(bbox) for bbox, _, _ in self._results]
+        grown = True
+        while grown:
+            grown = False
+            for i, rect in enumerate(rects):
+                for box in cached_rects:
+                    if rects_intersect(rect, box):
+                        union = rect_union(rect, box)
+                        union = (max(0, union[0]), max(0, union[1]), min(width, union[2]), min(height, union[3]))
+                        if union != rect:
+                            rects[i] = rect = union
+                            grown = True
+            if grown:
+                rects = merge_rects(rects)
+        return rects
+
+    def read(self, rgb_img: np.ndarray, key=None,
+             read_fn: Optional[Callable[[np.ndarray], List[Tuple]]] = None) -> List[Tuple]:
+        """
+        OCR an RGB image, re-reading only what changed since the previous call with the same key
+
+        Args:
+            rgb_img: RGB image of the region
+            key: Identifies the region; a different key forces a full pass
+            read_fn: Optional OCR function used for this call instead of the default one
+
+        Returns:
+            EasyOCR-style results [(bbox, text, confidence)] in image coordinates
+        """
+        gray = cv2.cvtColor(rgb_img, cv2.COLOR_RGB2GRAY)
+        height, width = gray.shape
+
+        read_fn = read_fn or self.read_fn
+
+        if self._prev_gray is None or self._prev_gray.shape != gray.shape or key != self._key:
+            return self._full_pass(rgb_img, gray, key, read_fn)
+
+        dirty, tile_count = self._dirty_tiles(gray)
+        if not dirty:
+            # Keep comparing against the frame the results came from so slow drift still shows up
+            self.clean_passes += 1
+            return list(self._results)
+        if len(dirty) > self.max_dirty_fraction * tile_count:
+            return self._full_pass(rgb_img, gray, key, read_fn)
+
+        rects = self._dirty_rects(dirty, width, height)
+        kept = [r for r in self._results if not any(rects_intersect(bbox_rect(r[0]), rect) for rect in rects)]
+        fresh = []
+        for x1, y1, x2, y2 in rects:
+            fresh.extend(offset_results(read_fn(np.ascontiguousarray(rgb_img[y1:y2, x1:x2])), x1, y1))
+
+        self.partial_passes += 1
+        self._prev_gray = gray
+        self._results = kept + fresh
+        return list(self._results)
+
+    def _full_pass(self, rgb_img: np.ndarray, gray: np.ndarray, key, read_fn) -> List[Tuple]:
+        self.full_passes += 1
+        self._key = key
+        self._prev_gray = gray
+        self._results = list(read_fn(rgb_img))
+        return list(self._results)
+
+    def stats(self) -> dict:
+        return {
+            'full_passes': self.full_passes,
+            'partial_passes': self.partial_passes,
+            'clean_passes': self.clean_passes,
+            'dirty_tile_fraction': self.tiles_dirty / self.tiles_total if self.tiles_total else 0.0,
+        }
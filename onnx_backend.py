@@ -0,0 +1,265 @@
+"""
+ONNX Runtime CPU backend for the EasyOCR detector/recognizer and YOLO
+
+Models are exported from the PyTorch weights on first use into onnx_models/,
+optionally quantized to int8, and run through ONNX Runtime. EasyOCR keeps
+doing its own pre/post-processing; only the two networks are swapped for
+ONNX Runtime sessions.
+"""
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'onnx_models')
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError:
+        raise RuntimeError("onnxruntime is not installed (pip install onnxruntime)")
+    return onnxruntime
+
+
+def _session(path: str):
+    ort = _require_onnxruntime()
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+
+def _quantize(src: str, dst: str):
+    _require_onnxruntime()
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    print(f"Quantizing {os.path.basename(src)} to int8...")
+    quantize_dynamic(src, dst, weight_type=QuantType.QUInt8)
+
+
+def _paths(name: str, quantized: bool) -> Tuple[str, str]:
+    fp32 = os.path.join(MODEL_DIR, f"{name}.onnx")
+    return fp32, os.path.join(MODEL_DIR, f"{name}_int8.onnx") if quantized else fp32
+
+
+# ---------------------------------------------------------------- EasyOCR
+
+def _recognizer_for_export(model):
+    """Wrap the recognizer so the exported graph only takes the image (its `text` input is unused)"""
+    import torch
+
+    class RecognizerExport(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, image):
+            return self.inner(image, None)
+
+    return RecognizerExport(model)
+
+
+def export_easyocr(quantized: bool = False, force: bool = False) -> Tuple[str, str]:
+    """
+    Export the EasyOCR detector and recognizer to ONNX (once)
+
+    Args:
+        quantized: Also produce int8 dynamically quantized copies
+        force: Re-export even if the files exist
+
+    Returns:
+        (detector_path, recognizer_path) of the requested precision
+    """
+    det_fp32, det_path = _paths('easyocr_detector', quantized)
+    rec_fp32, rec_path = _paths('easyocr_recognizer', quantized)
+
+    if force or not (os.path.exists(det_fp32) and os.path.exists(rec_fp32)):
+        import torch
+        import easyocr
+
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        print("Exporting EasyOCR models to ONNX (one-time)...")
+        # The CPU reader quantizes the recognizer with torch by default, which can't be exported
+        reader = easyocr.Reader(['en'], gpu=False, quantize=False, verbose=False)
+
+        detector = getattr(reader.detector, 'module', reader.detector).eval()
+        torch.onnx.export(
+            detector, torch.zeros(1, 3, 640, 640), det_fp32, opset_version=12,
+            input_names=['input'], output_names=['y', 'feature'],
+            dynamic_axes={'input': {0: 'batch', 2: 'height', 3: 'width'},
+                          'y': {0: 'batch', 1: 'out_height', 2: 'out_width'},
+                          'feature': {0: 'batch', 2: 'out_height', 3: 'out_width'}})
+
+        recognizer = _recognizer_for_export(getattr(reader.recognizer, 'module', reader.recognizer)).eval()
+        torch.onnx.export(
+            recognizer, torch.zeros(1, 1, 64, 256), rec_fp32, opset_version=12,
+            input_names=['image'], output_names=['preds'],
+            dynamic_axes={'image': {0: 'batch', 3: 'width'}, 'preds': {0: 'batch', 1: 'steps'}})
+
+    if quantized:
+        if force or not os.path.exists(det_path):
+            _quantize(det_fp32, det_path)
+        if force or not os.path.exists(rec_path):
+            _quantize(rec_fp32, rec_path)
+    return det_path, rec_path
+
+
+class OnnxDetector:
+    """Drop-in replacement for the CRAFT torch module inside easyocr.Reader"""
+
+    def __init__(self, path: str):
+        self.session = _session(path)
+
+    def eval(self):
+        return self
+
+    def __call__(self, x):
+        import torch
+        y, feature = self.session.run(None, {'input': x.cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(y), torch.from_numpy(feature)
+
+
+class OnnxRecognizer:
+    """Drop-in replacement for the recognition torch module inside easyocr.Reader"""
+
+    def __init__(self, path: str):
+        self.session = _session(path)
+
+    def eval(self):
+        return self
+
+    def __call__(self, image, text=None):
+        import torch
+        preds, = self.session.run(None, {'image': image.cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(preds)
+
+
+def attach_to_reader(reader, quantized: bool = False):
+    """
+    Swap the detector and recognizer networks of an easyocr.Reader for ONNX Runtime sessions
+
+    Args:
+        reader: easyocr.Reader created on CPU
+        quantized: Use the int8 models
+    """
+    det_path, rec_path = export_easyocr(quantized)
+    reader.detector = OnnxDetector(det_path)
+    reader.recognizer = OnnxRecognizer(rec_path)
+    reader.device = 'cpu'
+    return reader
+
+
+# ---------------------------------------------------------------- YOLO
+
+def export_yolo(weights: str = 'yolov8n.pt', quantized: bool = False, imgsz: int = 640,
+                force: bool = False) -> str:
+    """
+    Export YOLO weights to ONNX (once) through ultralytics
+
+    Returns:
+        Path of the ONNX model of the requested precision
+    """
+    name = f"{os.path.splitext(os.path.basename(weights))[0]}_{imgsz}"
+    fp32, path = _paths(name, quantized)
+    if force or not os.path.exists(fp32):
+        from ultralytics import YOLO
+        os.makedirs(MODEL_DIR, exist_ok=True)
+        print(f"Exporting {weights} to ONNX (one-time)...")
+        exported = YOLO(weights).export(format='onnx', imgsz=imgsz, dynamic=False)
+        os.replace(exported, fp32)
+    if quantized and (force or not os.path.exists(path)):
+        _quantize(fp32, path)
+    return path
+
+
+def load_yolo(weights: str = 'yolov8n.pt', quantized: bool = False, imgsz: int = 640):
+    """Load a YOLO model that runs through ONNX Runtime (fixed imgsz x imgsz input)"""
+    from ultralytics import YOLO
+    return YOLO(export_yolo(weights, quantized, imgsz), task='detect')
+
+
+# ---------------------------------------------------------------- comparison
+
+def _text_agreement(reference: List[Tuple], results: List[Tuple], tolerance: int = 15) -> float:
+    """Share of reference texts found again (same text, center within tolerance)"""
+    def centers(items):
+        return [(text.lower(), sum(p[0] for p in bbox) / len(bbox), sum(p[1] for p in bbox) / len(bbox))
+                for bbox, text, _ in items]
+
+    ref, found = centers(reference), centers(results)
+    if not ref:
+        return 1.0
+    matched = sum(1 for t, x, y in ref
+                  if any(t == ft and abs(x - fx) <= tolerance and abs(y - fy) <= tolerance for ft, fx, fy in found))
+    return matched / len(ref)
+
+
+def _box_agreement(reference: np.ndarray, results: np.ndarray, iou_threshold: float = 0.5) -> float:
+    """Share of reference detections found again (same class, IoU above threshold)"""
+    from ocr_tiles import rect_iou
+    if len(reference) == 0:
+        return 1.0
+    matched = 0
+    for ref in reference:
+        for res in results:
+            if int(res[5]) == int(ref[5]) and rect_iou(tuple(ref[:4]), tuple(res[:4])) >= iou_threshold:
+                matched += 1
+                break
+    return matched / len(reference)
+
+
+def compare_backends(bgr_img: np.ndarray, backends: Tuple[str, ...] = BACKENDS, repeats: int = 5,
+                     conf: float = 0.5, include_yolo: bool = True) -> List[Dict]:
+    """
+    Compare latency and accuracy of the inference backends on one image (CPU only)
+
+    Accuracy is measured against the torch backend's output.
+
+    Args:
+        bgr_img: Region image
+        backends: Backends to compare (the first one is the reference)
+        repeats: Timed runs per backend (median is reported)
+        conf: YOLO confidence threshold
+        include_yolo: Also benchmark YOLO
+
+    Returns:
+        List of {'backend', 'ocr_ms', 'ocr_accuracy', 'yolo_ms', 'yolo_accuracy'} dicts
+    """
+    import cv2
+    import easyocr
+
+    rgb_img = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2RGB)
+    rows = []
+    ocr_reference, yolo_reference = None, None
+
+    def median_ms(fn) -> Tuple[float, object]:
+        result = fn()  # warm-up
+        timings = []
+        for _ in range(max(1, repeats)):
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2] * 1000, result
+
+    for backend in backends:
+        row = {'backend': backend}
+        reader = easyocr.Reader(['en'], gpu=False, verbose=False)
+        if backend != 'torch':
+            attach_to_reader(reader, quantized=backend == 'onnx-int8')
+        row['ocr_ms'], ocr_results = median_ms(lambda: reader.readtext(rgb_img))
+        ocr_reference = ocr_results if ocr_reference is None else ocr_reference
+        row['ocr_accuracy'] = _text_agreement(ocr_reference, ocr_results)
+
+        if include_yolo:
+            from yolo_engine import YoloEngine
+            if backend == 'torch':
+                engine = YoloEngine(device='cpu')
+            else:
+                engine = YoloEngine(model=load_yolo(quantized=backend == 'onnx-int8'))
+            row['yolo_ms'], yolo_results = median_ms(lambda: engine.infer(bgr_img, conf=conf))
+            yolo_reference = yolo_results if yolo_reference is None else yolo_reference
+            row['yolo_accuracy'] = _box_agreement(yolo_reference, yolo_results)
+        rows.append(row)
+    return rows
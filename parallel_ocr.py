@@ -0,0 +1,192 @@
+"""
+Tile-parallel OCR across a pool of worker processes
+
+The region is split into overlapping tiles; every worker process holds its own
+EasyOCR reader (CPU, one torch thread) and reads whole tiles. Boxes found twice
+in the overlap between neighbouring tiles are deduplicated afterwards.
+"""
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ocr_tiles import Rect, bbox_rect, offset_results, rect_iou, split_overlapping_tiles
+
+# Per-process reader, created by _init_worker
+_reader = None
+
+
+def _init_worker(languages: List[str], inference_backend: str):
+    global _reader
+    os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
+    import torch
+    import easyocr
+
+    # The pool provides the parallelism - keep each worker on one core
+    torch.set_num_threads(1)
+    _reader = easyocr.Reader(languages, gpu=False, verbose=False)
+    if inference_backend != 'torch':
+        from onnx_backend import attach_to_reader
+        attach_to_reader(_reader, quantized=inference_backend == 'onnx-int8')
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _read_tile(tile_img: np.ndarray, offset: Tuple[int, int]) -> List[Tuple]:
+    return offset_results(_reader.readtext(tile_img), offset[0], offset[1])
+
+
+def _containment(a: Rect, b: Rect) -> float:
+    """Share of the smaller rectangle covered by the intersection"""
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return ix * iy / float(smaller) if smaller > 0 else 0.0
+
+
+def dedupe_results(tagged: List[Tuple[Tuple, bool]], iou_threshold: float = 0.5,
+                   containment_threshold: float = 0.8) -> List[Tuple]:
+    """
+    Drop text boxes that were read twice across tile seams
+
+    Two boxes are duplicates when their IoU is above iou_threshold or one lies
+    mostly inside the other (text cut in half by a seam). The box that doesn't
+    touch a seam wins, then the larger box, then the more confident one.
+
+    Args:
+        tagged: (result, touches_seam) pairs with results in image coordinates
+
+    Returns:
+        Deduplicated EasyOCR results in reading order (top to bottom, left to right)
+    """
+    def rank(item):
+        (bbox, _, confidence), touches_seam = item
+        rect = bbox_rect(bbox)
+        return (not touches_seam, (rect[2] - rect[0]) * (rect[3] - rect[1]), confidence)
+
+    kept: List[Tuple[Tuple, Rect]] = []
+    for result, _ in sorted(tagged, key=rank, reverse=True):
+        rect = bbox_rect(result[0])
+        if any(rect_iou(rect, other) >= iou_threshold or _containment(rect, other) >= containment_threshold
+               for _, other in kept):
+            continue
+        kept.append((result, rect))
+    kept.sort(key=lambda item: (item[1][1], item[1][0]))
+    return [result for result, _ in kept]
+
+
+class ParallelOCR:
+    """Pool of OCR worker processes reading overlapping tiles of large regions"""
+
+    def __init__(self, workers: Optional[int] = None, tile_size: Optional[Tuple[int, int]] = None,
+                 overlap: int = 64, languages: Optional[List[str]] = None, inference_backend: str = 'torch',
+                 min_tile: int = 256):
+        """
+        Args:
+            workers: Number of worker processes (default: half the CPU cores)
+            tile_size: (width, height) of a tile (default: derived from the image size and worker count)
+            overlap: Pixels shared by neighbouring tiles (must exceed the tallest text line)
+            languages: EasyOCR languages
+            inference_backend: 'torch', 'onnx' or 'onnx-int8' for the workers' readers
+            min_tile: Smallest derived tile side; images that can't be split into tiles this
+                      large are left to the local reader
+        """
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.min_tile = min_tile
+        self._grid_cache: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        # Spawned workers don't inherit the parent's threads, locks or torch state
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(languages or ['en'], inference_backend),
+                                         mp_context=multiprocessing.get_context('spawn'))
+        self.passes = 0
+        self.tiles_read = 0
+        self.last_ms = 0.0
+        self.total_time = 0.0
+
+    def warmup(self):
+        """Start all worker processes and load their readers now instead of on the first scan"""
+        start = time.perf_counter()
+        pids = set(f.result() for f in [self._pool.submit(_ping) for _ in range(self.workers)])
+        print(f"✓ {len(pids)} OCR worker(s) ready in {time.perf_counter() - start:.1f}s")
+
+    def tile_size_for(self, width: int, height: int) -> Tuple[int, int]:
+        """
+        Tile size for an image of this size
+
+        Without a fixed tile_size, picks the columns x rows grid that keeps every worker
+        busy with the least work per worker (tile area times the number of rounds),
+        skipping grids whose tiles would be smaller than min_tile.
+        """
+        if self.tile_size is not None:
+            return self.tile_size
+        size = self._grid_cache.get((width, height))
+        if size is None:
+            best = None
+            for cols in range(1, self.workers + 1):
+                rows = -(-self.workers // cols)
+                tile_w = -(-(width + (cols - 1) * self.overlap) // cols)
+                tile_h = -(-(height + (rows - 1) * self.overlap) // rows)
+                if (cols > 1 and tile_w < self.min_tile) or (rows > 1 and tile_h < self.min_tile):
+                    continue
+                rounds = -(-cols * rows // self.workers)
+                cost = (rounds * tile_w * tile_h, cols * rows * tile_w * tile_h)
+                if best is None or cost < best[0]:
+                    best = (cost, (tile_w, tile_h))
+            size = self._grid_cache[(width, height)] = best[1] if best else (width, height)
+        return size
+
+    def worth_splitting(self, shape: Tuple[int, ...]) -> bool:
+        """True if an image of this shape spans more than one tile"""
+        tile_w, tile_h = self.tile_size_for(shape[1], shape[0])
+        return shape[1] > tile_w or shape[0] > tile_h
+
+    def read(self, rgb_img: np.ndarray) -> List[Tuple]:
+        """
+        OCR an RGB image tile by tile in the worker pool
+
+        Returns:
+            EasyOCR results [(bbox, text, confidence)] in rgb_img coordinates
+        """
+        start = time.perf_counter()
+        height, width = rgb_img.shape[:2]
+        tile_w, tile_h = self.tile_size_for(width, height)
+        tiles = split_overlapping_tiles(width, height, tile_w, tile_h, self.overlap)
+        futures = [(tile, self._pool.submit(_read_tile, np.ascontiguousarray(rgb_img[tile[1]:tile[3], tile[0]:tile[2]]),
+                                            (tile[0], tile[1])))
+                   for tile in tiles]
+
+        tagged = []
+        for (x1, y1, x2, y2), future in futures:
+            # Seams are tile edges that are not image edges
+            seams = (x1 > 0, y1 > 0, x2 < width, y2 < height)
+            for result in future.result():
+                rect = bbox_rect(result[0])
+                touches = ((seams[0] and rect[0] <= x1 + 2) or (seams[1] and rect[1] <= y1 + 2)
+                           or (seams[2] and rect[2] >= x2 - 2) or (seams[3] and rect[3] >= y2 - 2))
+                tagged.append((result, touches))
+
+        results = dedupe_results(tagged)
+        self.passes += 1
+        self.tiles_read += len(tiles)
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.total_time += self.last_ms / 1000
+        return results
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'passes': self.passes,
+            'tiles_per_pass': self.tiles_read / self.passes if self.passes else 0.0,
+            'last_ms': self.last_ms,
+            'avg_ms': self.total_time * 1000 / self.passes if self.passes else 0.0,
+        }
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,267 @@
+"""
+Compiler for command scripts (runfile / vertical)
+
+A script is compiled once into a Program: a list of Steps, each holding a
+parsed Instruction, its IF_FAIL_THEN fallback, and its LOOP_IF_SUCCESS target
+already resolved to a step index. Compiled programs are cached by file path +
+mtime (files) or by text (inline scripts), so repeated runs skip parsing.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Ops that find something on screen and are retried when it isn't there yet
+RETRIED_OPS = {'find_text', 'find_object', 'click_text', 'click_object', 'point_text', 'point_object'}
+
+# Detection engine each op needs
+OP_ENGINES = {
+    'find_text': 'ocr', 'click_text': 'ocr', 'point_text': 'ocr',
+    'find_object': 'yolo', 'click_object': 'yolo', 'point_object': 'yolo', 'list_objects': 'yolo',
+    'waitfor_text': 'ocr', 'waitfor_object': 'yolo',
+}
+
+DEFAULT_WAITFOR_TIMEOUT = 10.0
+DEFAULT_STABLE_TIMEOUT = 5.0
+
+
+class Instruction:
+    """One parsed command: an op name plus typed arguments"""
+
+    def __init__(self, op: str, args: Tuple = (), source: str = '', error: Optional[str] = None):
+        """
+        Args:
+            op: Operation ('click_text', 'wait', ...; 'invalid'/'unknown' for bad commands)
+            args: Parsed arguments of the op
+            source: Original command text
+            error: Message printed when an invalid command is executed
+        """
+        self.op = op
+        self.args = args
+        self.source = source
+        self.error = error
+
+    @property
+    def retried(self) -> bool:
+        return self.op in RETRIED_OPS
+
+    @property
+    def engine(self) -> Optional[str]:
+        return OP_ENGINES.get(self.op)
+
+    def __repr__(self):
+        return f"Instruction({self.op}, {self.args!r})"
+
+
+def _target_and_index(parts: List[str]) -> Tuple[str, int]:
+    """Split '<mode> <target words...> [index]' arguments"""
+    if len(parts) > 3 and parts[-1].isdigit():
+        return ' '.join(parts[2:-1]), int(parts[-1])
+    return ' '.join(parts[2:]), 0
+
+
+def parse_command(command: str) -> Instruction:
+    """Parse one command line into an Instruction"""
+    parts = command.split()
+    if not parts:
+        return Instruction('unknown', source=command)
+    cmd = parts[0].lower()
+
+    if cmd == 'find' and len(parts) >= 3 and parts[1].lower() in ['text', 'object']:
+        return Instruction(f"find_{parts[1].lower()}", (' '.join(parts[2:]),), command)
+
+    if cmd in ['click', 'point'] and len(parts) >= 3 and parts[1].lower() in ['text', 'object']:
+        target, index = _target_and_index(parts)
+        return Instruction(f"{cmd}_{parts[1].lower()}", (target, index), command)
+
+    if cmd == 'click' and len(parts) == 2:
+        button = parts[1].lower()
+        if button not in ['left', 'right']:
+            return Instruction('invalid', source=command, error=f"Invalid button: {button}. Use 'left' or 'right'")
+        return Instruction('click_button', (button,), command)
+
+    if cmd == 'click' and len(parts) == 3:
+        try:
+            return Instruction('click_at', (int(parts[1]), int(parts[2])), command)
+        except ValueError:
+            return Instruction('invalid', source=command, error=f"Invalid coordinates: {parts[1]} {parts[2]}")
+
+    if cmd == 'type' and len(parts) >= 2:
+        return Instruction('type', (' '.join(parts[1:]),), command)
+
+    if cmd == 'press' and len(parts) >= 2:
+        return Instruction('press', (parts[1].lower(),), command)
+
+    if cmd == 'move' and len(parts) == 3:
+        try:
+            return Instruction('move', (int(parts[1]), int(parts[2])), command)
+        except ValueError:
+            return Instruction('invalid', source=command, error=f"Invalid offsets: {parts[1]} {parts[2]}")
+
+    if cmd == 'list' and len(parts) >= 2 and parts[1].lower() == 'objects':
+        return Instruction('list_objects', (), command)
+
+    if cmd == 'waitfor' and len(parts) >= 3 and parts[1].lower() in ['text', 'object']:
+        timeout = DEFAULT_WAITFOR_TIMEOUT
+        words = parts[2:]
+        if len(words) > 1:
+            try:
+                timeout = float(words[-1])
+                words = words[:-1]
+            except ValueError:
+                pass
+        return Instruction(f"waitfor_{parts[1].lower()}", (' '.join(words), timeout), command)
+
+    if cmd == 'wait' and len(parts) >= 2 and parts[1].lower() == 'stable':
+        # wait stable [x y w h] [max_seconds]
+        try:
+            numbers = [float(p) for p in parts[2:]]
+        except ValueError:
+            return Instruction('invalid', source=command, error="Usage: wait stable [x y w h] [max_seconds]")
+        if len(numbers) not in (0, 1, 4, 5):
+            return Instruction('invalid', source=command, error="Usage: wait stable [x y w h] [max_seconds]")
+        region = tuple(int(n) for n in numbers[:4]) if len(numbers) >= 4 else None
+        max_seconds = numbers[-1] if len(numbers) in (1, 5) else DEFAULT_STABLE_TIMEOUT
+        return Instruction('wait_stable', (region, max_seconds), command)
+
+    if cmd == 'wait' and len(parts) >= 2:
+        try:
+            return Instruction('wait', (float(parts[1]),), command)
+        except ValueError:
+            return Instruction('invalid', source=command, error=f"Invalid wait time: {parts[1]}")
+
+    return Instruction('unknown', source=command, error=f"Unknown command: {command}")
+
+
+class Step:
+    """A script command with its directives resolved"""
+
+    def __init__(self, instruction: Instruction, line: int):
+        self.instruction = instruction
+        self.line = line
+        self.fallback: Optional[Instruction] = None  # IF_FAIL_THEN
+        self.loop_line: Optional[int] = None         # LOOP_IF_SUCCESS as written
+        self.loop_target: Optional[int] = None       # ... resolved to a step index (None = not found)
+        self.stop_on_fail = False                    # STOP_ON_FAIL
+
+
+class Program:
+    """Compiled script"""
+
+    def __init__(self, steps: List[Step], source: str = '<string>'):
+        self.steps = steps
+        self.source = source
+        self.engines: Set[str] = set()
+        for step in steps:
+            for instruction in (step.instruction, step.fallback):
+                if instruction is not None and instruction.engine:
+                    self.engines.add(instruction.engine)
+
+    def __len__(self):
+        return len(self.steps)
+
+
+def compile_script(command_string: str, source: str = '<string>') -> Program:
+    """
+    Compile a script (commands plus '#' directive lines) into a Program
+
+    Directive problems are reported once here instead of on every run.
+    """
+    steps: List[Step] = []
+    current: Optional[Step] = None
+
+    for line_num, line in enumerate(command_string.strip().split('\n'), 1):
+        stripped_line = line.strip()
+        if not stripped_line:
+            continue
+
+        if not stripped_line.startswith('#'):
+            current = Step(parse_command(stripped_line), line_num)
+            steps.append(current)
+            continue
+
+        # This is a directive
+        directive_content = stripped_line[1:].strip()  # Remove '#' and any leading whitespace
+        if not directive_content:  # Skip if just '#'
+            continue
+        directive_parts = directive_content.split(' ', 1)
+        directive_name = directive_parts[0].upper()
+        directive_value = directive_parts[1] if len(directive_parts) > 1 else None
+
+        if current is None:
+            print(f"Warning: Directive '{stripped_line}' on line {line_num} has no preceding command. Skipping.")
+            continue
+
+        if directive_name == 'IF_FAIL_THEN':
+            current.fallback = parse_command(directive_value) if directive_value else None
+        elif directive_name == 'LOOP_IF_SUCCESS':
+            try:
+                current.loop_line = int(directive_value)
+            except (ValueError, TypeError):
+                print(f"Warning: Invalid line number for LOOP_IF_SUCCESS on line {line_num}. Skipping.")
+        elif directive_name == 'STOP_ON_FAIL':
+            current.stop_on_fail = True
+        else:
+            print(f"Warning: Unknown directive '{directive_name}' on line {line_num}. Skipping.")
+
+    # Jump table: line number -> step index
+    line_to_index = {step.line: i for i, step in enumerate(steps)}
+    for step in steps:
+        if step.loop_line is not None:
+            step.loop_target = line_to_index.get(step.loop_line)
+            if step.loop_target is None:
+                print(f"Warning: LOOP_IF_SUCCESS target line {step.loop_line} (line {step.line}) is not a command.")
+
+    return Program(steps, source)
+
+
+class ProgramCache:
+    """Compiled programs keyed by file path + mtime, or by script text"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._programs: "OrderedDict[tuple, Program]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get_or_compile(self, key: tuple, compile_fn) -> Program:
+        with self._lock:
+            program = self._programs.get(key)
+            if program is not None:
+                self._programs.move_to_end(key)
+                self.hits += 1
+                return program
+            self.misses += 1
+        program = compile_fn()
+        with self._lock:
+            self._programs[key] = program
+            while len(self._programs) > self.max_entries:
+                self._programs.popitem(last=False)
+        return program
+
+    def compile_file(self, filename: str) -> Program:
+        """Compile a script file, reusing the cached Program while the file is unchanged"""
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+
+        def compile_fn():
+            with open(path, 'r') as f:
+                return compile_script(f.read(), source=filename)
+
+        return self._get_or_compile(('file', path, stat.st_mtime_ns, stat.st_size), compile_fn)
+
+    def compile_string(self, command_string: str) -> Program:
+        """Compile an inline script, reusing the cached Program for identical text"""
+        return self._get_or_compile(('text', command_string), lambda: compile_script(command_string))
+
+    def clear(self):
+        with self._lock:
+            self._programs.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'programs': len(self._programs), 'hits': self.hits, 'misses': self.misses}
+
+
+# Shared by the CLI and the GUI
+program_cache = ProgramCache()
@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+Rect = Tuple[int, int, int, int]  # (x1, y1, x2, y2)
+
+
+def _file_name(name: str) -> str:
+    safe = re.sub(r'[^a-z0-9_-]+', '_', name.lower()).strip('_') or 'template'
+    return f"{safe}_{hashlib.md5(name.encode('utf-8')).hexdigest()[:8]}.png"
+
+
+class TemplateLibrary:
+    """
+    On-disk library of button images harvested from OCR hits
+
+    Lookups use multi-scale template matching: a coarse search on a pyrDown'd
+    (half resolution) copy of the image over all scales, then a refinement at
+    full resolution in a small window around the coarse hit.
+    """
+
+    def __init__(self, directory: str = DEFAULT_TEMPLATE_DIR, accept_score: float = 0.92,
+                 marginal_score: float = 0.75, scales: Tuple[float, ...] = (0.8, 0.9, 1.0, 1.1, 1.25)):
+        """
+        Args:
+            directory: Folder holding template PNGs and index.json
+            accept_score: Match score accepted without OCR validation
+            marginal_score: Lowest score that is still worth validating with OCR
+            scales: Template scale factors tried in the coarse search
+        """
+        self.directory = directory
+        self.accept_score = accept_score
+        self.marginal_score = marginal_score
+        self.scales = scales
+        self._lock = threading.Lock()
+        self._index: Dict[str, dict] = {}
+        self._images: Dict[str, np.ndarray] = {}
+        self.accepted = 0
+        self.validated = 0
+        self.rejected = 0
+        self._load()
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, 'index.json')
+
+    def _load(self):
+        if not os.path.exists(self._index_path):
+            return
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load template index '{self._index_path}': {e}")
+            self._index = {}
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._index_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=2, ensure_ascii=False)
+
+    def _image(self, name: str) -> Optional[np.ndarray]:
+        img = self._images.get(name)
+        if img is None and name in self._index:
+            img = cv2.imread(os.path.join(self.directory, self._index[name]['file']), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                self._images[name] = img
+        return img
+
+    def has(self, name: str) -> bool:
+        return name.lower() in self._index
+
+    def names(self) -> List[str]:
+        return sorted(self._index)
+
+    def info(self, name: str) -> Optional[dict]:
+        return self._index.get(name.lower())
+
+    def harvest(self, name: str, screen_img: np.ndarray, rect: Rect, margin: int = 2) -> bool:
+        """
+        Store the image inside rect as the template for name
+
+        Args:
+            name: Target text the template stands for
+            screen_img: BGR image the rect refers to
+            rect: (x1, y1, x2, y2) in screen_img coordinates
+            margin: Extra pixels kept around the rect
+
+        Returns:
+            True if the template was stored
+        """
+        name = name.lower()
+        height, width = screen_img.shape[:2]
+        x1 = max(0, rect[0] - margin)
+        y1 = max(0, rect[1] - margin)
+        x2 = min(width, rect[2] + margin)
+        y2 = min(height, rect[3] + margin)
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            return False
+
+        crop = cv2.cvtColor(np.ascontiguousarray(screen_img[y1:y2, x1:x2]), cv2.COLOR_BGR2GRAY)
+        with self._lock:
+            file_name = self._index.get(name, {}).get('file') or _file_name(name)
+            os.makedirs(self.directory, exist_ok=True)
+            if not cv2.imwrite(os.path.join(self.directory, file_name), crop):
+                return False
+            self._index[name] = {'file': file_name, 'size': [x2 - x1, y2 - y1], 'uses': 0}
+            self._images[name] = crop
+            self._save_index()
+        print(f"Template stored for '{name}' ({x2 - x1}x{y2 - y1})")
+        return True
+
+    def remove(self, name: str) -> bool:
+        name = name.lower()
+        with self._lock:
+            entry = self._index.pop(name, None)
+            self._images.pop(name, None)
+            if entry is None:
+                return False
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except OSError:
+                pass
+            self._save_index()
+        return True
+
+    def clear(self):
+        for name in list(self._index):
+            self.remove(name)
+
+    @staticmethod
+    def _best_match(image: np.ndarray, template: np.ndarray) -> Tuple[float, Tuple[int, int]]:
+        if template.shape[0] > image.shape[0] or template.shape[1] > image.shape[1] \
+                or template.shape[0] < 4 or template.shape[1] < 4:
+            return (-1.0, (0, 0))
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        return (float(score), location)
+
+    def match(self, name: str, screen_img: np.ndarray, search_rect: Optional[Rect] = None) -> Optional[Tuple[Rect, float]]:
+        """
+        Find the template for name in screen_img
+
+        Args:
+            name: Target text
+            screen_img: BGR (or gray) image to search
+            search_rect: Optional (x1, y1, x2, y2) window of screen_img to search in
+
+        Returns:
+            ((x1, y1, x2, y2), score) in screen_img coordinates, or None if no template exists
+        """
+        name = name.lower()
+        with self._lock:
+            template = self._image(name)
+        if template is None:
+            return None
+
+        gray = screen_img if screen_img.ndim == 2 else cv2.cvtColor(screen_img, cv2.COLOR_BGR2GRAY)
+        offset_x, offset_y = 0, 0
+        if search_rect is not None:
+            height, width = gray.shape
+            offset_x, offset_y = max(0, search_rect[0]), max(0, search_rect[1])
+            gray = gray[offset_y:min(height, search_rect[3]), offset_x:min(width, search_rect[2])]
+
+        # Coarse: half resolution, all scales
+        small = cv2.pyrDown(gray)
+        best_score, best_scale, best_loc = -1.0, 1.0, (0, 0)
+        for scale in self.scales:
+            tw = int(round(template.shape[1] * scale * 0.5))
+            th = int(round(template.shape[0] * scale * 0.5))
+            if tw < 4 or th < 4:
+                continue
+            score, loc = self._best_match(small, cv2.resize(template, (tw, th), interpolation=cv2.INTER_AREA))
+            if score > best_score:
+                best_score, best_scale, best_loc = score, scale, loc
+
+        # Fine: full resolution around the coarse hit, best scale and its neighbours
+        scales = sorted({best_scale * f for f in (0.95, 1.0, 1.05)})
+        refined_score, refined_rect = best_score, None
+        for scale in scales:
+            tw = int(round(template.shape[1] * scale))
+            th = int(round(template.shape[0] * scale))
+            pad_x, pad_y = max(6, tw // 4), max(6, th // 4)
+            x1 = max(0, best_loc[0] * 2 - pad_x)
+            y1 = max(0, best_loc[1] * 2 - pad_y)
+            x2 = min(gray.shape[1], best_loc[0] * 2 + tw + pad_x)
+            y2 = min(gray.shape[0], best_loc[1] * 2 + th + pad_y)
+            resized = template if scale == 1.0 else cv2.resize(template, (tw, th), interpolation=cv2.INTER_LINEAR)
+            score, loc = self._best_match(gray[y1:y2, x1:x2], resized)
+            if refined_rect is None or score > refined_score:
+                refined_score = score
+                refined_rect = (x1 + loc[0], y1 + loc[1], x1 + loc[0] + tw, y1 + loc[1] + th)
+
+        if refined_rect is None or refined_score < 0:
+            return None
+        rect = (refined_rect[0] + offset_x, refined_rect[1] + offset_y,
+                refined_rect[2] + offset_x, refined_rect[3] + offset_y)
+        return (rect, refined_score)
+
+    def record_use(self, name: str):
+        with self._lock:
+            entry = self._index.get(name.lower())
+            if entry is not None:
+                entry['uses'] = entry.get('uses', 0) + 1
+
+    def save(self):
+        with self._lock:
+            if self._index:
+                self._save_index()
+
+    def stats(self) -> dict:
+        return {
+            'templates': len(self._index),
+            'accepted': self.accepted,
+            'validated': self.validated,
+            'rejected': self.rejected,
+        }
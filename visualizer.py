@@ -0,0 +1,249 @@
+"""
+Detection overlays rendered and encoded off the calling thread
+
+Callers capture one full frame, run detection on a crop view of it, and hand
+the frame plus detections to a VisualizationExporter. Drawing, PNG/JPEG
+encoding and the file write happen on the exporter's worker thread.
+"""
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+IMAGE_FORMATS = ('png', 'jpg')
+DEFAULT_LEVELS = {'png': 3, 'jpg': 90}  # PNG compression 0-9, JPEG quality 0-100
+
+
+def render_detections(img: np.ndarray, region: Optional[Tuple[int, int, int, int]],
+                      texts: List[Tuple], objects: List[Tuple]) -> np.ndarray:
+    """
+    Draw detections onto a full-screen image (in place)
+
+    Args:
+        img: Full-screen BGR image (screen coordinates)
+        region: Detection region (x, y, w, h) drawn as a yellow border, or None
+        texts: get_all_ocr_text() results (green boxes)
+        objects: find_objects_yolo(return_bbox=True) results (blue boxes)
+    """
+    font_scale = 0.5 if texts and objects else 0.6
+
+    # Draw region border if region is set (yellow border)
+    if region is not None:
+        x, y, width, height = region
+        cv2.rectangle(img, (x, y), (x + width, y + height), (255, 255, 0), 3)
+
+    # Draw text bounding boxes (green)
+    for center_x, center_y, bbox, text, confidence in texts:
+        bbox_points = np.array(bbox, dtype=np.int32)
+        cv2.polylines(img, [bbox_points], True, (0, 255, 0), 2)
+        cv2.circle(img, (center_x, center_y), 5, (0, 0, 255), -1)
+        label = f"{text} ({confidence:.2f})"
+        label_pos = (int(bbox[0][0]), int(bbox[0][1]) - 10)
+        cv2.putText(img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 255, 0), 2)
+
+    # Draw object bounding boxes (blue)
+    for center_x, center_y, class_name, confidence, (x1, y1, x2, y2) in objects:
+        cv2.rectangle(img, (x1, y1), (x2, y2), (255, 0, 0), 2)
+        cv2.circle(img, (center_x, center_y), 5, (0, 0, 255), -1)
+        label = f"{class_name} ({confidence:.2f})"
+        label_pos = (x1, y1 - 10)
+        cv2.putText(img, label, label_pos, cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 0, 0), 2)
+    return img
+
+
+def encode_image(img: np.ndarray, image_format: str, level: int) -> bytes:
+    """Encode an image as PNG (level = compression 0-9) or JPEG (level = quality 0-100)"""
+    if image_format == 'png':
+        params = [cv2.IMWRITE_PNG_COMPRESSION, int(level)]
+    else:
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(level)]
+    ok, data = cv2.imencode(f'.{image_format}', img, params)
+    if not ok:
+        raise RuntimeError(f"Could not encode image as {image_format}")
+    return data.tobytes()
+
+
+class VisualizationExporter:
+    """
+    Worker thread that renders, encodes and writes annotated frames
+
+    Frames are queued with submit(); the queue is bounded so a slow disk
+    applies back-pressure instead of growing memory. A stream writes a
+    numbered sequence (prefix_00001.jpg, ...) of frames during a run; its
+    frames are captured and detected on the worker too (stream_capture).
+    """
+
+    def __init__(self, directory: str = '.', image_format: str = 'png', level: Optional[int] = None,
+                 max_pending: int = 8):
+        """
+        Args:
+            directory: Folder single visualizations are written to
+            image_format: 'png' or 'jpg'
+            level: PNG compression (0-9) or JPEG quality (0-100); None = format default
+            max_pending: Frames that may wait for the worker before submit() blocks
+        """
+        self.directory = directory
+        self.image_format = 'png'
+        self.level = DEFAULT_LEVELS['png']
+        self.set_format(image_format, level)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stream_mode: Optional[str] = None
+        self.stream_directory = None
+        self.stream_prefix = 'frame'
+        self.stream_index = 0
+        self._capture_pending = False
+        self.skipped = 0
+        self.written = 0
+        self.failed = 0
+        self.bytes_written = 0
+        self.encode_time = 0.0
+
+    def set_format(self, image_format: str, level: Optional[int] = None):
+        image_format = 'jpg' if image_format.lower() in ('jpg', 'jpeg') else image_format.lower()
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format '{image_format}'. Use png or jpg")
+        limit = 9 if image_format == 'png' else 100
+        if level is not None and not 0 <= level <= limit:
+            raise ValueError(f"{image_format} level must be between 0 and {limit}")
+        self.image_format = image_format
+        self.level = DEFAULT_LEVELS[image_format] if level is None else level
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                path, img, region, texts, objects, image_format, level = job
+                if callable(img):
+                    try:
+                        img, region, texts, objects = img()
+                    finally:
+                        self._capture_pending = False
+                start = time.perf_counter()
+                data = encode_image(render_detections(img, region, texts, objects), image_format, level)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                self.encode_time += time.perf_counter() - start
+                self.written += 1
+                self.bytes_written += len(data)
+            except Exception as e:
+                self.failed += 1
+                print(f"✗ Could not write visualization: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, full_img: np.ndarray, region: Optional[Tuple[int, int, int, int]],
+               texts: List[Tuple], objects: List[Tuple], name: str, directory: Optional[str] = None) -> str:
+        """
+        Queue a frame for rendering and writing (the exporter takes ownership of full_img)
+
+        Args:
+            full_img: Full-screen BGR frame; drawn on in place by the worker (or a callable
+                      returning (full_img, region, texts, objects), run on the worker)
+            region: Detection region (x, y, w, h) or None
+            texts: OCR detections in screen coordinates
+            objects: YOLO detections in screen coordinates
+            name: File name without extension
+            directory: Output folder (defaults to the exporter's directory)
+
+        Returns:
+            Path the image will be written to
+        """
+        directory = directory or self.directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.{self.image_format}")
+        self._ensure_worker()
+        self._queue.put((path, full_img, region, texts, objects, self.image_format, self.level))
+        return path
+
+    def start_stream(self, mode: str, directory: Optional[str] = None, prefix: str = 'frame'):
+        """
+        Start streaming annotated frames
+
+        Args:
+            mode: 'text', 'objects' or 'all' - which detections to draw
+            directory: Folder for the numbered frames (default: visualization_stream_<time>)
+            prefix: File name prefix of the frames
+        """
+        self.stream_mode = mode
+        self.stream_directory = directory or os.path.join(self.directory, f"visualization_stream_{int(time.time())}")
+        self.stream_prefix = prefix
+        self.stream_index = 0
+
+    def stop_stream(self) -> int:
+        """Stop streaming; returns the number of frames queued"""
+        self.stream_mode = None
+        return self.stream_index
+
+    @property
+    def streaming(self) -> bool:
+        return self.stream_mode is not None
+
+    def stream_frame(self, full_img: np.ndarray, region: Optional[Tuple[int, int, int, int]],
+                     texts: List[Tuple], objects: List[Tuple]) -> str:
+        """Queue the next numbered frame of the stream"""
+        self.stream_index += 1
+        return self.submit(full_img, region, texts, objects, f"{self.stream_prefix}_{self.stream_index:05d}",
+                           directory=self.stream_directory)
+
+    def stream_capture(self, capture: Callable[[], Tuple[np.ndarray, Optional[Tuple[int, int, int, int]], List[Tuple], List[Tuple]]]) -> Optional[str]:
+        """
+        Queue the next numbered frame, captured and detected by the worker thread
+
+        The caller doesn't wait for capture or detection. While the previous captured
+        frame is still waiting, the new one is skipped instead of queued.
+
+        Args:
+            capture: Callable returning (full_img, region, texts, objects)
+
+        Returns:
+            Path the frame will be written to, or None if it was skipped
+        """
+        with self._lock:
+            if self._capture_pending:
+                self.skipped += 1
+                return None
+            self._capture_pending = True
+        self.stream_index += 1
+        return self.submit(capture, None, [], [], f"{self.stream_prefix}_{self.stream_index:05d}",
+                           directory=self.stream_directory)
+
+    def flush(self):
+        """Wait until every queued frame has been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            'format': self.image_format,
+            'level': self.level,
+            'written': self.written,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'pending': self.pending(),
+            'avg_kb': self.bytes_written / 1024 / self.written if self.written else 0.0,
+            'avg_encode_ms': self.encode_time * 1000 / self.written if self.written else 0.0,
+        }
+
+    def close(self):
+        """Finish queued frames and stop the worker"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
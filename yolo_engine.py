@@ -0,0 +1,123 @@
+"""
+YOLO inference engine with a fixed input size
+
+Wraps an ultralytics model so every frame is letterboxed into one reused
+imgsz x imgsz buffer, class filtering happens inside NMS (class indices are
+resolved once from the model's names), and all boxes of a frame come back in
+a single (N, 6) [x1, y1, x2, y2, confidence, class_id] array.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+DEFAULT_WEIGHTS = 'yolov8n.pt'  # nano model for speed
+PAD_VALUE = 114  # Same gray ultralytics pads with
+
+
+def resolve_classes(names: Dict[int, str], query: str) -> List[int]:
+    """Indices of all classes whose name contains query (case-insensitive)"""
+    query = query.lower()
+    return sorted(int(i) for i, name in names.items() if query in name.lower())
+
+
+class YoloEngine:
+    """Letterboxing, class-restricted YOLO inference around an ultralytics model"""
+
+    def __init__(self, weights: str = DEFAULT_WEIGHTS, device: str = 'cpu', imgsz: int = 640,
+                 model=None, warmup: bool = True):
+        """
+        Args:
+            weights: Path to .pt (or exported .onnx) weights
+            device: 'cuda' or 'cpu'
+            imgsz: Square input size every frame is letterboxed to
+            model: Already loaded ultralytics model (weights is then only used as a label)
+            warmup: Run one dummy inference now so the first real frame isn't slow
+        """
+        if model is None:
+            from ultralytics import YOLO
+            model = YOLO(weights)
+            if device == 'cuda':
+                model.to(device)
+        self.model = model
+        self.weights = weights
+        self.device = device
+        self.imgsz = imgsz
+        self.names = {int(k): v for k, v in model.names.items()}
+        self._class_cache: Dict[str, List[int]] = {}
+        self._buffer = np.full((imgsz, imgsz, 3), PAD_VALUE, dtype=np.uint8)
+        self._layout: Optional[Tuple[int, int, int, int]] = None  # (new_w, new_h, pad_x, pad_y)
+        self._lock = threading.Lock()
+        self.warmup_ms = 0.0
+        if warmup:
+            self.warmup()
+
+    def class_indices(self, query: str) -> List[int]:
+        """Class indices matching query, resolved once per query"""
+        key = query.lower()
+        indices = self._class_cache.get(key)
+        if indices is None:
+            indices = self._class_cache[key] = resolve_classes(self.names, key)
+        return indices
+
+    def warmup(self):
+        start = time.perf_counter()
+        with self._lock:
+            self._predict(self._buffer, conf=0.5, classes=None)
+        self.warmup_ms = (time.perf_counter() - start) * 1000
+
+    def _letterbox(self, img: np.ndarray) -> Tuple[float, int, int]:
+        """Resize img into the reused input buffer, returning (ratio, pad_x, pad_y)"""
+        height, width = img.shape[:2]
+        ratio = min(self.imgsz / float(height), self.imgsz / float(width))
+        new_w = max(1, int(round(width * ratio)))
+        new_h = max(1, int(round(height * ratio)))
+        pad_x = (self.imgsz - new_w) // 2
+        pad_y = (self.imgsz - new_h) // 2
+
+        # Padding only needs repainting when the layout changes
+        if self._layout != (new_w, new_h, pad_x, pad_y):
+            self._buffer[...] = PAD_VALUE
+            self._layout = (new_w, new_h, pad_x, pad_y)
+        interior = self._buffer[pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+        if (new_w, new_h) == (width, height):
+            interior[...] = img[..., :3]
+        else:
+            interpolation = cv2.INTER_AREA if ratio < 1.0 else cv2.INTER_LINEAR
+            cv2.resize(img[..., :3], (new_w, new_h), dst=interior, interpolation=interpolation)
+        return ratio, pad_x, pad_y
+
+    def _predict(self, img: np.ndarray, conf: float, classes: Optional[List[int]]) -> np.ndarray:
+        results = self.model(img, imgsz=self.imgsz, conf=conf, classes=classes, device=self.device,
+                             half=self.device == 'cuda', verbose=False)
+        # One image in, one result out - all boxes in a single device-to-host transfer
+        return results[0].boxes.data.cpu().numpy()
+
+    def infer(self, img: np.ndarray, conf: float = 0.5, classes: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Detect objects in a BGR image
+
+        Args:
+            img: BGR image of any size
+            conf: Confidence threshold
+            classes: Only keep these class indices (None = all classes)
+
+        Returns:
+            (N, 6) float array [x1, y1, x2, y2, confidence, class_id] in img coordinates
+        """
+        if classes is not None and len(classes) == 0:
+            return np.zeros((0, 6), dtype=np.float32)
+        height, width = img.shape[:2]
+        with self._lock:
+            ratio, pad_x, pad_y = self._letterbox(img)
+            rows = self._predict(self._buffer, conf, classes)
+        if len(rows):
+            rows = rows.astype(np.float32, copy=True)
+            rows[:, [0, 2]] = np.clip((rows[:, [0, 2]] - pad_x) / ratio, 0, width)
+            rows[:, [1, 3]] = np.clip((rows[:, [1, 3]] - pad_y) / ratio, 0, height)
+        return rows
+
+    def describe(self) -> str:
+        return f"{self.weights} @ {self.imgsz}px on {self.device}, {len(self.names)} classes"